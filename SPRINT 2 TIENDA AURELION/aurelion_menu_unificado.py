@@ -5,13 +5,28 @@
 AURELION MENÚ UNIFICADO
 Combina el menú interactivo de documentación con el análisis de datos
 Proyecto Tienda Aurelion - Demo 2
+
+Todo el menú corre sobre un único bucle de eventos (asyncio.run al iniciar).
+La entrada del teclado se lee en un hilo lector aparte, así el bucle sigue
+libre mientras se espera al usuario, y las tareas largas (análisis
+estadístico, gráficos completos, presentación) corren en segundo plano:
+desde el menú se puede ver su progreso y cancelarlas.
 """
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import asyncio
-import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from busqueda_documentacion import IndiceDocumentacion, imprimir_resultados
+from categorizacion import categorizar_productos
+from cubo_ventas import obtener_cubo
+from datos import cargar_tablas
+from estadisticas import ServicioEstadisticas
 
 # ==========================================================
 # DOCUMENTACIÓN DEL PROYECTO
@@ -99,6 +114,9 @@ MEJORAS SUGERIDAS:
     }
 }
 
+# Índice de búsqueda de la documentación (se arma una sola vez al iniciar)
+indice_documentacion = IndiceDocumentacion(textos_documentacion)
+
 def obtener_contenido_completo():
     """Obtiene todo el contenido de la documentación como texto plano"""
     contenido = ""
@@ -110,43 +128,17 @@ def obtener_contenido_completo():
 # FUNCIONES DE ANÁLISIS DE DATOS
 # ==========================================================
 
+# Resultados del análisis estadístico, calculados una vez por versión de los datos
+estadisticas_ventas = ServicioEstadisticas()
+
 def cargar_datos():
     """Carga los datos desde los archivos CSV"""
     try:
-        productos = pd.read_csv('productos_demo2.csv')
-        clientes = pd.read_csv('clientes_demo2.csv')
-        ventas = pd.read_csv('detalle_ventas_demo2.csv')
-        
-        # Función para categorizar productos
-        def categorizar_producto(nombre):
-            nombre_lower = nombre.lower()
-            if any(palabra in nombre_lower for palabra in ['cerveza', 'fernet', 'gin', 'ron', 'vodka', 'whisky', 'vino', 'sidra', 'licor']):
-                return 'Bebidas con Alcohol'
-            if any(palabra in nombre_lower for palabra in ['coca cola', 'pepsi', 'sprite', 'fanta', 'agua mineral', 'jugo', 'energética', 'yerba mate', 'café', 'té']):
-                return 'Bebidas sin Alcohol'
-            if any(palabra in nombre_lower for palabra in ['leche', 'yogur', 'queso', 'manteca']):
-                return 'Lácteos y Derivados'
-            if any(palabra in nombre_lower for palabra in ['congelado', 'hamburguesa', 'empanada', 'pizza', 'precocido']):
-                return 'Congelados y Precocinados'
-            if any(palabra in nombre_lower for palabra in ['pan lactal', 'medialuna', 'bizcocho', 'galletita']):
-                return 'Panadería y Repostería'
-            if any(palabra in nombre_lower for palabra in ['mermelada', 'dulce de leche', 'miel']):
-                return 'Untables, Mermeladas y Dulces'
-            if any(palabra in nombre_lower for palabra in ['papas fritas', 'maní', 'mix de frutos secos', 'chocolate', 'barrita', 'caramelo', 'chicle', 'chupetín', 'alfajor', 'turrón']):
-                return 'Golosinas, Snacks y Panificados'
-            if any(palabra in nombre_lower for palabra in ['detergente', 'lavandina', 'desengrasante', 'limpiavidrios', 'suavizante', 'esponja', 'trapo', 'servilleta', 'papel higiénico']):
-                return 'Limpieza del Hogar'
-            if any(palabra in nombre_lower for palabra in ['shampoo', 'jabón', 'crema dental', 'cepillo', 'hilo dental', 'desodorante', 'toallas húmedas', 'mascarilla']):
-                return 'Higiene Personal'
-            if any(palabra in nombre_lower for palabra in ['arroz', 'fideo', 'lenteja', 'garbanzo', 'poroto', 'harina', 'azúcar', 'sal', 'aceite', 'vinagre', 'salsa de tomate', 'caldo', 'sopa instantánea', 'avena', 'granola', 'aceituna', 'stevia']):
-                return 'Almacén y Despensa'
-            if any(palabra in nombre_lower for palabra in ['helado']):
-                return 'Otros Alimentos'
-            return 'Otros Alimentos'
+        productos, clientes, ventas = cargar_tablas()
         
         # Aplicar categorización si no existe
         if 'categoria' not in productos.columns or productos['categoria'].isna().any():
-            productos['categoria'] = productos['nombre_producto'].apply(categorizar_producto)
+            productos['categoria'] = categorizar_productos(productos['nombre_producto'])
         
         # Preparar ventas con client_id y fecha
         np.random.seed(42)
@@ -179,82 +171,127 @@ def mostrar_datos(productos, clientes, ventas):
     print(f"\nTotal de ventas: {len(ventas)}")
     print(f"Importe total: ${ventas['importe'].sum():,.2f}")
 
-def analisis_estadistico(productos, clientes, ventas):
-    """Realiza análisis estadístico de los datos"""
-    print("\n" + "="*60)
-    print("ANÁLISIS ESTADÍSTICO")
-    print("="*60)
+def informe_estadistico(productos, clientes, ventas, progreso=None):
+    """Texto del análisis estadístico de los datos (se puede calcular en segundo plano)
+
+    Los resultados vienen del servicio de estadísticas: solo se calculan
+    la primera vez o si cambiaron los datos.
+    """
+    resultados = estadisticas_ventas.obtener(productos, ventas, progreso)
+    lineas = ["\n" + "="*60, "ANÁLISIS ESTADÍSTICO", "="*60]
     
-    print("\n--- ESTADÍSTICAS DESCRIPTIVAS DE VENTAS ---")
-    print(ventas[['cantidad', 'precio_unitario', 'importe']].describe())
+    lineas.append("\n--- ESTADÍSTICAS DESCRIPTIVAS DE VENTAS ---")
+    lineas.append(str(resultados['descriptivas']))
     
-    print("\n--- ESTADÍSTICAS DE PRODUCTOS ---")
-    print(f"Precio promedio: ${productos['precio_unitario'].mean():,.2f}")
-    print(f"Precio mínimo: ${productos['precio_unitario'].min():,.2f}")
-    print(f"Precio máximo: ${productos['precio_unitario'].max():,.2f}")
+    lineas.append("\n--- ESTADÍSTICAS DE PRODUCTOS ---")
+    lineas.append(f"Precio promedio: ${resultados['precios']['promedio']:,.2f}")
+    lineas.append(f"Precio mínimo: ${resultados['precios']['minimo']:,.2f}")
+    lineas.append(f"Precio máximo: ${resultados['precios']['maximo']:,.2f}")
     
-    print("\n--- ANÁLISIS POR CATEGORÍA ---")
-    ventas_con_cat = ventas.merge(productos[['id_producto', 'categoria']], on='id_producto', how='left')
-    ventas_por_categoria = ventas_con_cat.groupby('categoria')['importe'].agg(['sum', 'mean', 'count'])
-    ventas_por_categoria.columns = ['Total', 'Promedio', 'Cantidad_Ventas']
-    print(ventas_por_categoria.sort_values('Total', ascending=False))
+    lineas.append("\n--- ANÁLISIS POR CATEGORÍA ---")
+    lineas.append(str(resultados['categorias']))
     
     # Detección de outliers
-    Q1 = ventas['importe'].quantile(0.25)
-    Q3 = ventas['importe'].quantile(0.75)
-    IQR = Q3 - Q1
-    outliers = ventas[(ventas['importe'] < Q1 - 1.5 * IQR) | (ventas['importe'] > Q3 + 1.5 * IQR)]
-    print(f"\n--- OUTLIERS DETECTADOS ---")
-    print(f"Total de outliers: {len(outliers)} ({len(outliers)/len(ventas)*100:.2f}%)")
+    outliers = resultados['outliers']
+    lineas.append(f"\n--- OUTLIERS DETECTADOS ---")
+    lineas.append(f"Total de outliers: {outliers} ({outliers/resultados['ventas']*100:.2f}%)")
+    return "\n".join(lineas)
+
+def analisis_estadistico(productos, clientes, ventas):
+    """Realiza análisis estadístico de los datos"""
+    print(informe_estadistico(productos, clientes, ventas))
+
+def _guardar_grafico(fig, ax, titulo, eje_x, eje_y, archivo, grilla='both'):
+    """Títulos, grilla y guardado comunes a los gráficos básicos"""
+    ax.set_title(titulo, fontsize=14, fontweight='bold')
+    ax.set_xlabel(eje_x, fontsize=12)
+    ax.set_ylabel(eje_y, fontsize=12)
+    ax.grid(axis=grilla, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(archivo, dpi=150, bbox_inches='tight')
+    print(f"✓ Gráfico guardado: {archivo}")
 
 def mostrar_graficos(productos, clientes, ventas):
-    """Muestra gráficos básicos de análisis"""
+    """Muestra gráficos básicos de análisis
+
+    Se dibuja sobre figuras Agg propias (sin el estado global de pyplot) y
+    con el mismo bloqueo que los gráficos completos, que pueden estar
+    generándose a la vez en el hilo de trabajo.
+    """
+    from ejecutar_graficos import BLOQUEO_MATPLOTLIB
+    
     print("\n" + "="*60)
     print("GENERANDO GRÁFICOS...")
     print("="*60)
     
-    # Gráfico 1: Distribución de precios
-    plt.figure(figsize=(10, 6))
-    plt.hist(productos['precio_unitario'], bins=20, edgecolor='black', alpha=0.7)
-    plt.title('Distribución de Precios de Productos', fontsize=14, fontweight='bold')
-    plt.xlabel('Precio ($)', fontsize=12)
-    plt.ylabel('Frecuencia', fontsize=12)
-    plt.grid(axis='y', alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('grafico_distribucion_precios.png', dpi=150, bbox_inches='tight')
-    print("✓ Gráfico guardado: grafico_distribucion_precios.png")
-    plt.close()
-    
-    # Gráfico 2: Ventas por categoría
-    ventas_con_cat = ventas.merge(productos[['id_producto', 'categoria']], on='id_producto', how='left')
-    ventas_por_cat = ventas_con_cat.groupby('categoria')['importe'].sum().sort_values(ascending=False)
+    ventas_por_cat = obtener_cubo(productos, ventas).totales('categoria').sort_values(ascending=False)
     
-    plt.figure(figsize=(12, 6))
-    ventas_por_cat.plot(kind='bar', color='steelblue', edgecolor='navy', alpha=0.7)
-    plt.title('Ventas Totales por Categoría', fontsize=14, fontweight='bold')
-    plt.xlabel('Categoría', fontsize=12)
-    plt.ylabel('Ventas ($)', fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-    plt.grid(axis='y', alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('grafico_ventas_por_categoria.png', dpi=150, bbox_inches='tight')
-    print("✓ Gráfico guardado: grafico_ventas_por_categoria.png")
-    plt.close()
-    
-    # Gráfico 3: Correlación precio vs cantidad
-    plt.figure(figsize=(10, 6))
-    plt.scatter(ventas['precio_unitario'], ventas['cantidad'], alpha=0.6, s=50)
-    plt.title('Correlación Precio vs Cantidad Vendida', fontsize=14, fontweight='bold')
-    plt.xlabel('Precio Unitario ($)', fontsize=12)
-    plt.ylabel('Cantidad', fontsize=12)
-    plt.grid(alpha=0.3)
-    plt.tight_layout()
-    plt.savefig('grafico_correlacion_precio_cantidad.png', dpi=150, bbox_inches='tight')
-    print("✓ Gráfico guardado: grafico_correlacion_precio_cantidad.png")
-    plt.close()
+    with BLOQUEO_MATPLOTLIB:
+        # Gráfico 1: Distribución de precios
+        fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.hist(productos['precio_unitario'], bins=20, edgecolor='black', alpha=0.7)
+        _guardar_grafico(fig, ax, 'Distribución de Precios de Productos', 'Precio ($)', 'Frecuencia',
+                         'grafico_distribucion_precios.png', grilla='y')
+        
+        # Gráfico 2: Ventas por categoría
+        fig = Figure(figsize=(12, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ventas_por_cat.plot(kind='bar', color='steelblue', edgecolor='navy', alpha=0.7, ax=ax)
+        ax.tick_params(axis='x', labelrotation=45)
+        for etiqueta in ax.get_xticklabels():
+            etiqueta.set_horizontalalignment('right')
+        _guardar_grafico(fig, ax, 'Ventas Totales por Categoría', 'Categoría', 'Ventas ($)',
+                         'grafico_ventas_por_categoria.png', grilla='y')
+        
+        # Gráfico 3: Correlación precio vs cantidad
+        fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.scatter(ventas['precio_unitario'], ventas['cantidad'], alpha=0.6, s=50)
+        _guardar_grafico(fig, ax, 'Correlación Precio vs Cantidad Vendida', 'Precio Unitario ($)', 'Cantidad',
+                         'grafico_correlacion_precio_cantidad.png')
     
     print("\n✅ Todos los gráficos generados exitosamente")
 
+# ==========================================================
+# ENTRADA ASÍNCRONA
+# ==========================================================
+
+# Un único hilo lector (daemon: no impide salir si quedó esperando una línea)
+_solicitudes_entrada = queue.Queue()
+_hilo_lector = None
+
+def _resolver_entrada(futuro, linea, error):
+    if futuro.done():
+        return
+    if error is not None:
+        futuro.set_exception(error)
+    else:
+        futuro.set_result(linea)
+
+def _leer_entradas():
+    while True:
+        mensaje, bucle, futuro = _solicitudes_entrada.get()
+        try:
+            linea, error = input(mensaje), None
+        except EOFError as e:
+            linea, error = None, e
+        bucle.call_soon_threadsafe(_resolver_entrada, futuro, linea, error)
+
+async def leer_entrada(mensaje=""):
+    """input() sin bloquear el bucle de eventos: la línea se lee en el hilo lector"""
+    global _hilo_lector
+    if _hilo_lector is None:
+        _hilo_lector = threading.Thread(target=_leer_entradas, name='aurelion-entrada', daemon=True)
+        _hilo_lector.start()
+    bucle = asyncio.get_running_loop()
+    futuro = bucle.create_future()
+    _solicitudes_entrada.put((mensaje, bucle, futuro))
+    return await futuro
+
 # ==========================================================
 # MENÚ DE DOCUMENTACIÓN (ASÍNCRONO)
 # ==========================================================
@@ -298,15 +335,10 @@ async def procesar_opcion_documentacion(opcion, seccion_actual=None):
     elif opcion == 6:
         return None  # Volver al menú principal
     elif opcion == 7:  # Búsqueda
-        palabra = input("Ingrese palabra clave para buscar: ").lower()
-        contenido_completo = obtener_contenido_completo().lower()
-        if palabra in contenido_completo:
-            print(f"\nPalabra '{palabra}' encontrada. Resultados:\n")
-            for num, seccion in textos_documentacion.items():
-                if palabra in seccion["contenido"].lower():
-                    print(f"  • Sección {num}: {seccion['titulo']}")
-        else:
-            print(f"Palabra '{palabra}' no encontrada.")
+        consulta = (await leer_entrada("Ingrese palabras clave (varias = todas; use OR para alternativas): ")).strip()
+        # Reindexa solo las secciones agregadas o modificadas desde la última búsqueda
+        indice_documentacion.sincronizar(textos_documentacion)
+        imprimir_resultados(consulta, indice_documentacion.buscar(consulta))
         return seccion_actual
     elif opcion == 8:  # Exportar
         if seccion_actual and seccion_actual in textos_documentacion:
@@ -327,17 +359,125 @@ async def menu_documentacion():
     while True:
         await mostrar_menu_documentacion()
         try:
-            opcion = int(input("\nSeleccione una opción: "))
+            opcion = int(await leer_entrada("\nSeleccione una opción: "))
             seccion_actual = await procesar_opcion_documentacion(opcion, seccion_actual)
             if seccion_actual is None:
                 break
-            input("\nPresione Enter para continuar...")
+            await leer_entrada("\nPresione Enter para continuar...")
         except ValueError:
             print("Entrada inválida. Ingrese un número.")
         except KeyboardInterrupt:
             print("\n\nSaliendo...")
             break
 
+# ==========================================================
+# TAREAS EN SEGUNDO PLANO
+# ==========================================================
+
+class TareaCancelada(Exception):
+    """El usuario canceló la tarea desde el menú"""
+
+# Un único hilo de trabajo: las tareas se ejecutan en orden (la presentación
+# que se pide después de los gráficos usa las imágenes ya generadas)
+_ejecutor = None
+_tareas = []
+
+def _funcion_progreso(tarea):
+    """Callback progreso(hechos, total, mensaje) para la función de la tarea
+
+    Guarda el avance y, si el usuario pidió cancelar, lanza TareaCancelada
+    en el hilo de trabajo en el siguiente punto de control.
+    """
+    def progreso(hechos, total, mensaje=''):
+        if tarea['cancelar'].is_set():
+            raise TareaCancelada()
+        tarea['progreso'] = (hechos, total, mensaje)
+    return progreso
+
+async def _esperar_tarea(tarea, al_terminar):
+    try:
+        resultado = await asyncio.wrap_future(tarea['futuro'])
+    except (TareaCancelada, asyncio.CancelledError):
+        tarea['estado'] = 'cancelada'
+        print(f"\n🛑 {tarea['nombre']}: cancelada")
+    except Exception as e:
+        tarea['estado'] = 'error'
+        print(f"\n❌ {tarea['nombre']}: error - {e}")
+    else:
+        tarea['estado'] = 'terminada'
+        if al_terminar is not None:
+            al_terminar(resultado)
+        else:
+            print(f"\n✅ {tarea['nombre']}: terminado ({resultado})")
+
+def ejecutar_tarea(nombre, funcion, *args, segundo_plano=True, al_terminar=None, **kwargs):
+    """Ejecuta funcion(*args, **kwargs), opcionalmente como tarea en segundo plano
+
+    En segundo plano la función corre en el hilo de trabajo y recibe
+    progreso=callback; la tarea queda registrada para ver su avance o
+    cancelarla desde el menú. Debe llamarse desde el bucle de eventos.
+    """
+    global _ejecutor
+    if not segundo_plano:
+        resultado = funcion(*args, **kwargs)
+        if al_terminar is not None:
+            al_terminar(resultado)
+        return resultado
+    
+    if _ejecutor is None:
+        _ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aurelion')
+    tarea = {'numero': len(_tareas) + 1, 'nombre': nombre, 'estado': 'en curso',
+             'progreso': None, 'cancelar': threading.Event()}
+    tarea['futuro'] = _ejecutor.submit(funcion, *args, progreso=_funcion_progreso(tarea), **kwargs)
+    tarea['tarea'] = asyncio.ensure_future(_esperar_tarea(tarea, al_terminar))
+    _tareas.append(tarea)
+    print(f"⏳ {nombre}: tarea #{tarea['numero']} en segundo plano, puede seguir usando el menú")
+    return tarea
+
+def tareas_pendientes():
+    return [tarea for tarea in _tareas if not tarea['tarea'].done()]
+
+def cancelar_tarea(tarea):
+    """Pedir la cancelación: si no empezó se descarta, si está corriendo se detiene en el próximo punto de control"""
+    tarea['cancelar'].set()
+    tarea['futuro'].cancel()
+
+def mostrar_tareas():
+    """Lista de tareas con su estado y progreso"""
+    if not _tareas:
+        print("No se inició ninguna tarea en segundo plano.")
+        return
+    for tarea in _tareas:
+        linea = f"  #{tarea['numero']} {tarea['nombre']}: {tarea['estado']}"
+        if tarea['estado'] == 'en curso':
+            if tarea['futuro'].running() and tarea['progreso']:
+                hechos, total, mensaje = tarea['progreso']
+                linea += f" - {hechos}/{total}"
+                if total:
+                    linea += f" ({hechos / total:.0%})"
+                linea += f" {mensaje}"
+            elif not tarea['futuro'].running():
+                linea += " - en espera"
+            if tarea['cancelar'].is_set():
+                linea += " - cancelando..."
+        print(linea)
+
+async def menu_tareas():
+    """Ver el progreso de las tareas y, opcionalmente, cancelar una"""
+    print("\n" + "="*60)
+    print("TAREAS EN SEGUNDO PLANO")
+    print("="*60)
+    mostrar_tareas()
+    pendientes = {str(tarea['numero']): tarea for tarea in tareas_pendientes()}
+    if not pendientes:
+        return
+    numero = (await leer_entrada("\nNúmero de tarea a cancelar (Enter para volver): ")).strip().lstrip('#')
+    if numero in pendientes:
+        cancelar_tarea(pendientes[numero])
+        print(f"Cancelación solicitada para la tarea #{numero}")
+    elif numero:
+        print("No hay una tarea en curso con ese número.")
+
 # ==========================================================
 # MENÚ PRINCIPAL
 # ==========================================================
@@ -351,66 +491,85 @@ def mostrar_menu_principal():
     print("2. Realizar análisis estadístico")
     print("3. Mostrar gráficos")
     print("4. Documentación del proyecto")
-    print("5. Generar gráficos completos (ejecutar_graficos.py)")
+    print("5. Generar gráficos completos")
     print("6. Generar presentación HTML del proyecto")
-    print("7. Salir")
+    print("7. Ver / cancelar tareas en segundo plano")
+    print("8. Salir")
     print("="*60)
 
-def menu_principal():
-    """Menú principal del programa"""
+async def menu_principal(segundo_plano=True):
+    """Menú principal del programa (corre en el bucle de eventos de asyncio.run)
+
+    Con segundo_plano=True el análisis estadístico, los gráficos completos
+    y la presentación se ejecutan como tareas de fondo y el menú sigue
+    respondiendo.
+    """
     productos, clientes, ventas = cargar_datos()
     
     if productos is None:
         print("Error: No se pudieron cargar los datos. Verifique que los archivos CSV existan.")
         return
     
-    while True:
-        mostrar_menu_principal()
-        try:
-            opcion = input("\nSeleccione una opción: ").strip()
-            
-            if opcion == '1':
-                mostrar_datos(productos, clientes, ventas)
-                input("\nPresione Enter para continuar...")
-            elif opcion == '2':
-                analisis_estadistico(productos, clientes, ventas)
-                input("\nPresione Enter para continuar...")
-            elif opcion == '3':
-                mostrar_graficos(productos, clientes, ventas)
-                input("\nPresione Enter para continuar...")
-            elif opcion == '4':
-                asyncio.run(menu_documentacion())
-            elif opcion == '5':
-                print("\n" + "="*60)
-                print("GENERANDO GRÁFICOS COMPLETOS...")
-                print("="*60)
-                if os.path.exists('ejecutar_graficos.py'):
-                    os.system('python ejecutar_graficos.py')
-                else:
-                    print("Error: No se encontró el archivo ejecutar_graficos.py")
-                input("\nPresione Enter para continuar...")
-            elif opcion == '6':
-                print("\n" + "="*60)
-                print("GENERANDO PRESENTACIÓN HTML...")
-                print("="*60)
-                if os.path.exists('generar_presentacion.py'):
-                    os.system('python generar_presentacion.py')
-                    print("\n✅ Presentación generada: presentacion_aurelion.html")
-                    print("💡 Abre el archivo en tu navegador para ver la presentación")
+    # Precalcular las estadísticas al cargar: el análisis (opción 2) sale de la caché
+    ejecutar_tarea("Precálculo de estadísticas", estadisticas_ventas.obtener, productos, ventas,
+                   segundo_plano=segundo_plano, al_terminar=lambda resultados: None)
+    
+    try:
+        while True:
+            mostrar_menu_principal()
+            try:
+                opcion = (await leer_entrada("\nSeleccione una opción: ")).strip()
+                
+                if opcion == '1':
+                    mostrar_datos(productos, clientes, ventas)
+                    await leer_entrada("\nPresione Enter para continuar...")
+                elif opcion == '2':
+                    ejecutar_tarea("Análisis estadístico", informe_estadistico, productos, clientes, ventas,
+                                   segundo_plano=segundo_plano, al_terminar=print)
+                    await leer_entrada("\nPresione Enter para continuar...")
+                elif opcion == '3':
+                    mostrar_graficos(productos, clientes, ventas)
+                    await leer_entrada("\nPresione Enter para continuar...")
+                elif opcion == '4':
+                    await menu_documentacion()
+                elif opcion == '5':
+                    print("\n" + "="*60)
+                    print("GENERANDO GRÁFICOS COMPLETOS...")
+                    print("="*60)
+                    from ejecutar_graficos import generar_graficos
+                    ejecutar_tarea("Gráficos completos", generar_graficos, productos, clientes, ventas,
+                                   segundo_plano=segundo_plano, mostrar_progreso=not segundo_plano)
+                    await leer_entrada("\nPresione Enter para continuar...")
+                elif opcion == '6':
+                    print("\n" + "="*60)
+                    print("GENERANDO PRESENTACIÓN HTML...")
+                    print("="*60)
+                    from generar_presentacion import generar_html_presentacion
+                    ejecutar_tarea("Presentación HTML", generar_html_presentacion, productos, clientes, ventas,
+                                   segundo_plano=segundo_plano, mostrar_progreso=not segundo_plano)
+                    print("💡 Abre presentacion_aurelion.html en tu navegador para ver la presentación")
+                    await leer_entrada("\nPresione Enter para continuar...")
+                elif opcion == '7':
+                    await menu_tareas()
+                elif opcion == '8':
+                    break
                 else:
-                    print("Error: No se encontró el archivo generar_presentacion.py")
-                input("\nPresione Enter para continuar...")
-            elif opcion == '7':
-                print("\n¡Gracias por usar Aurelion Demo 2! ¡Hasta pronto!")
+                    print("Opción inválida. Intente nuevamente.")
+            except EOFError:
                 break
-            else:
-                print("Opción inválida. Intente nuevamente.")
-        except KeyboardInterrupt:
-            print("\n\nSaliendo del programa...")
-            break
-        except Exception as e:
-            print(f"Error: {e}")
-            input("\nPresione Enter para continuar...")
+            except Exception as e:
+                print(f"Error: {e}")
+                await leer_entrada("\nPresione Enter para continuar...")
+        
+        pendientes = tareas_pendientes()
+        if pendientes:
+            print("⏳ Esperando a que terminen las tareas en segundo plano...")
+            await asyncio.gather(*(tarea['tarea'] for tarea in pendientes))
+        print("\n¡Gracias por usar Aurelion Demo 2! ¡Hasta pronto!")
+    finally:
+        # Ctrl+C: no dejar tareas corriendo al salir
+        for tarea in tareas_pendientes():
+            cancelar_tarea(tarea)
 
 # ==========================================================
 # PUNTO DE ENTRADA
@@ -421,5 +580,7 @@ if __name__ == "__main__":
     print("BIENVENIDO A AURELION DEMO 2")
     print("Sistema de Gestión y Análisis de Tienda")
     print("="*60)
-    menu_principal()
-
+    try:
+        asyncio.run(menu_principal())
+    except KeyboardInterrupt:
+        print("\n\nSaliendo del programa...")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BÚSQUEDA EN LA DOCUMENTACIÓN
+Índice invertido sobre las secciones de textos_documentacion
+Proyecto Tienda Aurelion - Demo 2
+
+El índice se arma una sola vez: cada palabra (sin tildes y en minúsculas,
+así "categoria" encuentra "categoría") apunta a las secciones donde aparece
+y a sus posiciones en el texto original. Las consultas no recorren el texto:
+
+- varias palabras se combinan con Y (todas deben aparecer);
+- "OR" / "O" / "|" separa alternativas: "ventas clientes OR precios"
+  ("O" e "Y" son operadores solo en mayúsculas: en minúsculas son
+  palabras comunes y se buscan como cualquier otra);
+- cada palabra coincide también como prefijo ("categ" encuentra
+  "categorías"); las coincidencias exactas puntúan más;
+- los resultados se ordenan por relevancia (tf-idf, con más peso en el
+  título) y muestran un fragmento alrededor de la primera coincidencia.
+
+Agregar o modificar secciones solo reindexa esas secciones (sincronizar).
+"""
+
+import bisect
+import math
+import re
+import unicodedata
+
+# Palabras de la consulta que separan alternativas o unen términos: "or" y
+# "and" en cualquier forma; "O" e "Y" solo en mayúsculas
+OPERADORES_O = {'or', '|'}
+OPERADORES_Y = {'and', '&'}
+OPERADORES_MAYUSCULA = {'O': OPERADORES_O, 'Y': OPERADORES_Y}
+
+PESO_TITULO = 2.0
+PESO_PREFIJO = 0.5
+ANCHO_FRAGMENTO = 60
+
+_PALABRA = re.compile(r'\w+')
+
+
+def normalizar(texto):
+    """Texto en minúsculas y sin tildes ni diéresis"""
+    descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def _operador(termino):
+    """Conjunto de operadores al que pertenece el término, o None si es una palabra"""
+    if termino in OPERADORES_MAYUSCULA:
+        return OPERADORES_MAYUSCULA[termino]
+    for operadores in (OPERADORES_O, OPERADORES_Y):
+        if termino.casefold() in operadores:
+            return operadores
+    return None
+
+
+def tokenizar(texto):
+    """Palabras normalizadas del texto con su posición (inicio, fin) en el original"""
+    return [(normalizar(m.group()), m.start(), m.end()) for m in _PALABRA.finditer(texto)]
+
+
+class IndiceDocumentacion:
+    """Índice invertido de secciones de documentación"""
+
+    def __init__(self, secciones=None):
+        # palabra -> {clave de sección: [(inicio, fin), ...]}
+        self.apariciones = {}
+        self.secciones = {}
+        self._vocabulario = []
+        if secciones:
+            self.sincronizar(secciones)
+
+    def agregar(self, clave, titulo, contenido):
+        """Indexar (o reindexar) una sección"""
+        if clave in self.secciones:
+            self.quitar(clave)
+        texto = f"{titulo}\n{contenido}"
+        self.secciones[clave] = {'titulo': titulo, 'contenido': contenido, 'texto': texto, 'largo_titulo': len(titulo)}
+        for palabra, inicio, fin in tokenizar(texto):
+            if palabra not in self.apariciones:
+                self.apariciones[palabra] = {}
+                bisect.insort(self._vocabulario, palabra)
+            self.apariciones[palabra].setdefault(clave, []).append((inicio, fin))
+
+    def quitar(self, clave):
+        """Sacar una sección del índice"""
+        seccion = self.secciones.pop(clave)
+        for palabra in {palabra for palabra, _, _ in tokenizar(seccion['texto'])}:
+            del self.apariciones[palabra][clave]
+            if not self.apariciones[palabra]:
+                del self.apariciones[palabra]
+                del self._vocabulario[bisect.bisect_left(self._vocabulario, palabra)]
+
+    def sincronizar(self, secciones):
+        """Reindexar solo las secciones nuevas o modificadas y quitar las eliminadas"""
+        for clave in [clave for clave in self.secciones if clave not in secciones]:
+            self.quitar(clave)
+        for clave, seccion in secciones.items():
+            actual = self.secciones.get(clave)
+            if actual is None or (actual['titulo'], actual['contenido']) != (seccion['titulo'], seccion['contenido']):
+                self.agregar(clave, seccion['titulo'], seccion['contenido'])
+        return self
+
+    def _coincidencias(self, termino):
+        """{palabra del índice: peso} para un término (exacta o por prefijo)"""
+        coincidencias = {}
+        i = bisect.bisect_left(self._vocabulario, termino)
+        while i < len(self._vocabulario) and self._vocabulario[i].startswith(termino):
+            palabra = self._vocabulario[i]
+            coincidencias[palabra] = 1.0 if palabra == termino else PESO_PREFIJO
+            i += 1
+        return coincidencias
+
+    def _puntaje(self, clave, coincidencias):
+        """Relevancia tf-idf de una sección para las palabras que coincidieron"""
+        largo_titulo = self.secciones[clave]['largo_titulo']
+        puntaje = 0.0
+        for palabra, peso in coincidencias.items():
+            posiciones = self.apariciones[palabra].get(clave, ())
+            if not posiciones:
+                continue
+            idf = math.log(1 + len(self.secciones) / len(self.apariciones[palabra]))
+            frecuencia = sum(PESO_TITULO if inicio < largo_titulo else 1.0 for inicio, _ in posiciones)
+            puntaje += peso * frecuencia * idf
+        return puntaje
+
+    def _fragmento(self, clave, coincidencias):
+        """Texto alrededor de la primera coincidencia en el contenido, con la palabra marcada"""
+        seccion = self.secciones[clave]
+        posiciones = sorted(pos for palabra in coincidencias
+                            for pos in self.apariciones[palabra].get(clave, ())
+                            if pos[0] > seccion['largo_titulo'])
+        if not posiciones:
+            return ''
+        inicio, fin = posiciones[0]
+        texto = seccion['texto']
+        desde, hasta = max(seccion['largo_titulo'] + 1, inicio - ANCHO_FRAGMENTO), fin + ANCHO_FRAGMENTO
+        fragmento = f"{texto[desde:inicio]}«{texto[inicio:fin]}»{texto[fin:hasta]}"
+        fragmento = ' '.join(fragmento.split())
+        return ('…' if desde > seccion['largo_titulo'] + 1 else '') + fragmento + ('…' if hasta < len(texto) else '')
+
+    def buscar(self, consulta, limite=10):
+        """Secciones que cumplen la consulta, de mayor a menor relevancia
+
+        Devuelve una lista de dicts con clave, titulo, puntaje y fragmento.
+        """
+        # Alternativas (separadas por OR) de términos que deben aparecer todos
+        alternativas = [[]]
+        for termino in consulta.split():
+            operador = _operador(termino)
+            if operador is OPERADORES_O:
+                alternativas.append([])
+            elif operador is None:
+                alternativas[-1].extend(palabra for palabra, _, _ in tokenizar(termino))
+
+        encontradas = {}
+        for terminos in filter(None, alternativas):
+            coincidencias = [self._coincidencias(termino) for termino in terminos]
+            claves = None
+            for coincidencia in coincidencias:
+                con_termino = {clave for palabra in coincidencia for clave in self.apariciones[palabra]}
+                claves = con_termino if claves is None else claves & con_termino
+            todas = {palabra: peso for coincidencia in coincidencias for palabra, peso in coincidencia.items()}
+            for clave in claves:
+                puntaje = self._puntaje(clave, todas)
+                if clave not in encontradas or puntaje > encontradas[clave][0]:
+                    encontradas[clave] = (puntaje, todas)
+
+        orden = sorted(encontradas.items(), key=lambda item: -item[1][0])[:limite]
+        return [{'clave': clave, 'titulo': self.secciones[clave]['titulo'], 'puntaje': puntaje,
+                 'fragmento': self._fragmento(clave, todas)}
+                for clave, (puntaje, todas) in orden]
+
+
+def imprimir_resultados(consulta, resultados):
+    """Mostrar los resultados de una búsqueda en el menú"""
+    if not resultados:
+        print(f"No se encontraron resultados para '{consulta}'.")
+        return
+    print(f"\n{len(resultados)} resultado(s) para '{consulta}':\n")
+    for resultado in resultados:
+        print(f"  • Sección {resultado['clave']}: {resultado['titulo']}")
+        if resultado['fragmento']:
+            print(f"      {resultado['fragmento']}")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CACHÉ DE GRÁFICOS RENDERIZADOS
+Evita volver a dibujar (y a codificar en base64) gráficos que no cambiaron
+Proyecto Tienda Aurelion - Demo 2
+
+Cada gráfico tiene una huella: un hash de sus datos agregados de entrada y
+de los parámetros de dibujo. El manifiesto (.cache_datos/graficos.json)
+guarda, por archivo de salida, la huella con la que se generó y el tamaño,
+la fecha de modificación y el hash del PNG resultante. Si la huella coincide
+y el PNG sigue intacto, el gráfico no se vuelve a dibujar.
+
+La presentación usa la misma caché para la versión base64 de cada imagen:
+se codifica una sola vez por contenido del PNG, por bloques, y se copia al
+HTML también por bloques (sin cargar la imagen completa en memoria).
+"""
+
+import base64
+import glob
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from datos import CARPETA_CACHE
+
+MANIFIESTO = 'graficos.json'
+
+# Bloque de lectura para codificar en base64 (múltiplo de 3: sin relleno intermedio)
+BLOQUE_BASE64 = 3 * (1 << 16)
+
+
+def _actualizar_hash(h, valor):
+    """Agregar al hash un valor (tablas, arreglos, listas, dicts o escalares)"""
+    if isinstance(valor, pd.DataFrame):
+        h.update(repr((list(valor.columns), list(valor.dtypes.astype(str)))).encode())
+        h.update(pd.util.hash_pandas_object(valor, index=True).to_numpy().tobytes())
+    elif isinstance(valor, pd.Series):
+        _actualizar_hash(h, valor.to_frame())
+    elif isinstance(valor, np.ndarray):
+        h.update(f"{valor.dtype.str}{valor.shape}".encode())
+        h.update(np.ascontiguousarray(valor).tobytes())
+    elif isinstance(valor, dict):
+        for clave in sorted(valor):
+            h.update(repr(clave).encode())
+            _actualizar_hash(h, valor[clave])
+    elif isinstance(valor, (list, tuple)):
+        h.update(f"{type(valor).__name__}{len(valor)}".encode())
+        for item in valor:
+            _actualizar_hash(h, item)
+    else:
+        h.update(repr(valor).encode())
+
+
+def huella(*partes):
+    """Hash SHA-256 de los datos de entrada y parámetros de un gráfico"""
+    h = hashlib.sha256()
+    for parte in partes:
+        _actualizar_hash(h, parte)
+    return h.hexdigest()
+
+
+def _hash_archivo(ruta, bloque=1 << 20):
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for parte in iter(lambda: f.read(bloque), b''):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def _ruta_manifiesto(archivo):
+    return os.path.join(os.path.dirname(os.path.abspath(archivo)), CARPETA_CACHE, MANIFIESTO)
+
+
+def cargar_manifiesto(archivo):
+    """Manifiesto de la carpeta donde está (o estará) el archivo"""
+    ruta = _ruta_manifiesto(archivo)
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def guardar_manifiesto(archivo, manifiesto):
+    ruta = _ruta_manifiesto(archivo)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2)
+
+
+def _intacto(entrada, archivo):
+    """El archivo existe y no cambió desde que se registró en el manifiesto"""
+    if not entrada or not os.path.exists(archivo):
+        return False
+    estado = os.stat(archivo)
+    return entrada.get('mtime_ns') == estado.st_mtime_ns and entrada.get('tamano') == estado.st_size
+
+
+def vigente(manifiesto, archivo, huella_actual):
+    """El gráfico ya fue generado con esta huella y el PNG sigue intacto"""
+    entrada = manifiesto.get(os.path.basename(archivo))
+    return _intacto(entrada, archivo) and entrada.get('huella') == huella_actual
+
+
+def registrar(manifiesto, archivo, huella_actual):
+    """Anotar en el manifiesto un gráfico recién generado"""
+    estado = os.stat(archivo)
+    manifiesto[os.path.basename(archivo)] = {
+        'huella': huella_actual,
+        'mtime_ns': estado.st_mtime_ns,
+        'tamano': estado.st_size,
+        'sha256': _hash_archivo(archivo),
+    }
+
+
+def hash_imagen(archivo):
+    """Hash SHA-256 del contenido de la imagen, tomado del manifiesto si sigue intacta"""
+    manifiesto = cargar_manifiesto(archivo)
+    nombre = os.path.basename(archivo)
+    entrada = manifiesto.get(nombre)
+    if not _intacto(entrada, archivo):
+        # Imagen que no generó el pipeline (o modificada a mano): se registra sin huella
+        estado = os.stat(archivo)
+        entrada = {'mtime_ns': estado.st_mtime_ns, 'tamano': estado.st_size, 'sha256': _hash_archivo(archivo)}
+        manifiesto[nombre] = entrada
+        guardar_manifiesto(archivo, manifiesto)
+    return entrada['sha256']
+
+
+def _ruta_base64(archivo):
+    """Ruta de la versión base64 en caché de la imagen, codificándola si hace falta
+
+    La versión base64 se guarda en la carpeta de caché con el hash del PNG
+    en el nombre, así que solo se vuelve a codificar si la imagen cambió.
+    """
+    nombre = os.path.basename(archivo)
+    carpeta = os.path.dirname(_ruta_manifiesto(archivo))
+    ruta_b64 = os.path.join(carpeta, f"{nombre}.{hash_imagen(archivo)[:16]}.b64")
+    if not os.path.exists(ruta_b64):
+        # Descartar las codificaciones de versiones anteriores de la misma imagen
+        for anterior in glob.glob(os.path.join(glob.escape(carpeta), glob.escape(nombre) + '.*.b64')):
+            os.remove(anterior)
+        with open(archivo, 'rb') as origen, open(ruta_b64 + '.tmp', 'wb') as destino:
+            for bloque in iter(lambda: origen.read(BLOQUE_BASE64), b''):
+                destino.write(base64.b64encode(bloque))
+        os.replace(ruta_b64 + '.tmp', ruta_b64)
+    return ruta_b64
+
+
+def _prefijo_data_uri(archivo):
+    ext = os.path.splitext(archivo)[1][1:].lower()
+    return f"data:image/{ext};base64,"
+
+
+def imagen_data_uri(archivo):
+    """Imagen como data URI base64, reutilizando la codificación en caché"""
+    with open(_ruta_base64(archivo), encoding='ascii') as f:
+        return _prefijo_data_uri(archivo) + f.read()
+
+
+def escribir_data_uri(archivo, salida):
+    """Escribir la data URI de la imagen en un archivo de texto abierto, por bloques"""
+    salida.write(_prefijo_data_uri(archivo))
+    with open(_ruta_base64(archivo), encoding='ascii') as f:
+        shutil.copyfileobj(f, salida, BLOQUE_BASE64)
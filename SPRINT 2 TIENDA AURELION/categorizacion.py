@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CATEGORIZACIÓN DE PRODUCTOS
+Motor compartido para asignar la categoría de un producto según su nombre
+Proyecto Tienda Aurelion - Demo 2
+
+Todas las palabras clave se compilan una sola vez en una única expresión
+regular: una alternativa por categoría, en orden de prioridad, cada una con
+un lookahead que busca sus palabras en todo el nombre y un grupo con nombre
+vacío que indica qué categoría coincidió. Como las alternativas se prueban
+en orden desde el inicio, gana la primera categoría con alguna palabra en
+el nombre (la misma prioridad que las cadenas de ``if any(...)``
+originales), no la palabra que aparece primero en el texto.
+
+Para categorizar una columna completa, cada nombre distinto se evalúa una
+sola vez con un único .str.extract sobre todos los nombres.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Palabras clave por categoría, en orden de prioridad
+PALABRAS_CLAVE = [
+    ('Bebidas con Alcohol', ['cerveza', 'fernet', 'gin', 'ron', 'vodka', 'whisky', 'vino', 'sidra', 'licor']),
+    ('Bebidas sin Alcohol', ['coca cola', 'pepsi', 'sprite', 'fanta', 'agua mineral', 'jugo', 'energética', 'yerba mate', 'café', 'té']),
+    ('Lácteos y Derivados', ['leche', 'yogur', 'queso', 'manteca']),
+    ('Congelados y Precocinados', ['congelado', 'hamburguesa', 'empanada', 'pizza', 'precocido']),
+    ('Panadería y Repostería', ['pan lactal', 'medialuna', 'bizcocho', 'galletita']),
+    ('Untables, Mermeladas y Dulces', ['mermelada', 'dulce de leche', 'miel']),
+    ('Golosinas, Snacks y Panificados', ['papas fritas', 'maní', 'mix de frutos secos', 'chocolate', 'barrita', 'caramelo', 'chicle', 'chupetín', 'alfajor', 'turrón']),
+    ('Limpieza del Hogar', ['detergente', 'lavandina', 'desengrasante', 'limpiavidrios', 'suavizante', 'esponja', 'trapo', 'servilleta', 'papel higiénico']),
+    ('Higiene Personal', ['shampoo', 'jabón', 'crema dental', 'cepillo', 'hilo dental', 'desodorante', 'toallas húmedas', 'mascarilla']),
+    ('Almacén y Despensa', ['arroz', 'fideo', 'lenteja', 'garbanzo', 'poroto', 'harina', 'azúcar', 'sal', 'aceite', 'vinagre', 'salsa de tomate', 'caldo', 'sopa instantánea', 'avena', 'granola', 'aceituna', 'stevia']),
+    ('Otros Alimentos', ['helado']),
+]
+
+CATEGORIA_POR_DEFECTO = 'Otros Alimentos'
+
+# Todas las categorías posibles, en orden de prioridad
+CATEGORIAS = list(dict.fromkeys([categoria for categoria, _ in PALABRAS_CLAVE] + [CATEGORIA_POR_DEFECTO]))
+
+
+# Grupo con nombre de cada categoría (c0, c1, ...), en el orden de PALABRAS_CLAVE
+_GRUPOS = {f'c{i}': categoria for i, (categoria, _) in enumerate(PALABRAS_CLAVE)}
+
+# Un solo patrón: la primera alternativa (categoría) cuyas palabras aparecen en el nombre
+_PATRON = re.compile('^(?:' + '|'.join(
+    f"(?=.*?(?:{'|'.join(re.escape(p) for p in palabras)}))(?P<{grupo}>)"
+    for grupo, (_, palabras) in zip(_GRUPOS, PALABRAS_CLAVE)) + ')', re.DOTALL)
+
+
+@lru_cache(maxsize=None)
+def categorizar_producto(nombre):
+    """Categoría de un producto según su nombre (memoizada por nombre)"""
+    coincidencia = _PATRON.match(str(nombre).lower())
+    return _GRUPOS[coincidencia.lastgroup] if coincidencia else CATEGORIA_POR_DEFECTO
+
+
+def _categorizar_unicos(nombres):
+    """Categorías de un arreglo de nombres distintos, con una sola pasada del patrón"""
+    # Cada fila tiene a lo sumo un grupo no nulo: el de la categoría que coincidió
+    grupos = pd.Series(nombres).astype(str).str.lower().str.extract(_PATRON).notna().to_numpy()
+    categorias = np.array(list(_GRUPOS.values()) + [CATEGORIA_POR_DEFECTO], dtype=object)
+    indices = np.where(grupos.any(axis=1), grupos.argmax(axis=1), len(_GRUPOS))
+    return categorias[indices]
+
+
+def categorizar_productos(nombres):
+    """Categoriza una columna completa de nombres de producto
+
+    Cada nombre distinto se evalúa una sola vez; el resultado se expande a
+    todas las filas con los códigos de pd.factorize.
+    """
+    codigos, unicos = pd.factorize(nombres)
+    # Los nombres faltantes tienen código -1: toman la categoría por defecto agregada al final
+    categorias = np.append(_categorizar_unicos(unicos), CATEGORIA_POR_DEFECTO)
+    return pd.Series(categorias[codigos], index=nombres.index, name='categoria')
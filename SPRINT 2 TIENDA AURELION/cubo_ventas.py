@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CUBO DE VENTAS PRE-AGREGADO
+Totales de ventas por mes x categoría x cliente x producto
+Proyecto Tienda Aurelion - Demo 2
+
+El cubo es disperso: solo guarda las celdas con ventas, cada una con sus
+cuatro coordenadas como códigos enteros (int32) más el importe total y la
+cantidad de líneas de venta. Las etiquetas de cada dimensión (meses,
+categorías, clientes, productos) se guardan una sola vez.
+
+Los heatmaps, rankings por categoría y totales por cliente se obtienen del
+cubo con un bincount sobre sus celdas, sin volver a unir ni agrupar las
+líneas de venta. Al agregar ventas nuevas solo se codifican esas filas y se
+combinan con las celdas existentes.
+
+obtener_cubo mantiene una copia en .cache_datos (y en memoria): si el
+detalle de ventas solo creció se agregan las filas nuevas; si cambió otra
+cosa se reconstruye. La validación usa el hash de todas las filas de las
+columnas que alimentan el cubo (pd.util.hash_pandas_object, vectorizado),
+así cualquier venta modificada invalida la copia.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache_graficos import huella
+from datos import CARPETA_CACHE
+
+VERSION_CUBO = 3
+
+DIMENSIONES = ('mes', 'categoria', 'cliente', 'producto')
+
+# Columnas de detalle de ventas que alimentan el cubo
+COLUMNAS_VENTAS = ['fecha', 'client_id', 'id_producto', 'importe']
+
+
+def _etiqueta_json(etiqueta):
+    """Etiqueta como valor JSON (los enteros de numpy pasan a int)"""
+    if pd.isna(etiqueta):
+        return None
+    return etiqueta.item() if hasattr(etiqueta, 'item') else etiqueta
+
+
+class CuboVentas:
+    """Cubo disperso de ventas con dimensiones codificadas como enteros"""
+
+    def __init__(self):
+        self.etiquetas = {dim: [] for dim in DIMENSIONES}
+        self._codigos = {dim: {} for dim in DIMENSIONES}
+        self.celdas = np.empty((0, len(DIMENSIONES)), dtype=np.int32)
+        self.importe = np.empty(0, dtype=np.int64)
+        self.lineas = np.empty(0, dtype=np.int64)
+        self.filas = 0
+
+    def _codificar(self, dimension, valores):
+        """Códigos enteros de los valores, agregando a la dimensión los nuevos"""
+        codigos, unicos = pd.factorize(valores, use_na_sentinel=False)
+        etiquetas, indice = self.etiquetas[dimension], self._codigos[dimension]
+        mapa = np.empty(len(unicos), dtype=np.int32)
+        for i, etiqueta in enumerate(unicos):
+            etiqueta = _etiqueta_json(etiqueta)
+            if etiqueta not in indice:
+                indice[etiqueta] = len(etiquetas)
+                etiquetas.append(etiqueta)
+            mapa[i] = indice[etiqueta]
+        return mapa[codigos]
+
+    def agregar(self, ventas, productos):
+        """Sumar al cubo nuevas líneas de venta
+
+        ventas necesita las columnas fecha, client_id, id_producto e
+        importe; la categoría de cada venta se toma de productos.
+        """
+        if ventas.empty:
+            return self
+        categorias = productos.set_index('id_producto')['categoria'].reindex(ventas['id_producto'])
+        nuevas = np.column_stack([
+            self._codificar('mes', ventas['fecha'].dt.to_period('M').array.asi8),
+            self._codificar('categoria', categorias.to_numpy()),
+            self._codificar('cliente', ventas['client_id'].to_numpy()),
+            self._codificar('producto', ventas['id_producto'].to_numpy()),
+        ])
+        importe = ventas['importe'].to_numpy()
+        if self.filas == 0:
+            self.importe = self.importe.astype(np.int64 if np.issubdtype(importe.dtype, np.integer) else np.float64)
+
+        celdas = np.concatenate([self.celdas, nuevas])
+        tamanos = [len(self.etiquetas[dim]) for dim in DIMENSIONES]
+        unicas, inversa = np.unique(np.ravel_multi_index(celdas.T, tamanos), return_inverse=True)
+        suma = np.bincount(inversa, weights=np.concatenate([self.importe, importe]), minlength=len(unicas))
+        self.importe = suma.round().astype(np.int64) if self.importe.dtype.kind == 'i' else suma
+        self.lineas = np.bincount(inversa, weights=np.concatenate([self.lineas, np.ones(len(nuevas), np.int64)]),
+                                  minlength=len(unicas)).astype(np.int64)
+        self.celdas = np.column_stack(np.unravel_index(unicas, tamanos)).astype(np.int32)
+        self.filas += len(ventas)
+        return self
+
+    def _indice(self, dimension):
+        etiquetas = self.etiquetas[dimension]
+        if dimension == 'mes':
+            return pd.PeriodIndex.from_ordinals(etiquetas, freq='M', name='mes')
+        return pd.Index(etiquetas, name=dimension)
+
+    def totales(self, *dimensiones, medida='importe'):
+        """Total de una medida ('importe' o 'lineas') por una o dos dimensiones
+
+        Con una dimensión devuelve una Series; con dos, un DataFrame con la
+        primera en las filas y la segunda en las columnas (0 donde no hay
+        ventas). Las etiquetas quedan ordenadas y, como en groupby, se
+        omiten las faltantes y las combinaciones sin ventas.
+        """
+        ejes = [DIMENSIONES.index(dim) for dim in dimensiones]
+        tamanos = [len(self.etiquetas[dim]) for dim in dimensiones]
+        plano = np.ravel_multi_index(self.celdas[:, ejes].T, tamanos)
+        valores = getattr(self, medida)
+        suma = np.bincount(plano, weights=valores, minlength=int(np.prod(tamanos)))
+        if valores.dtype.kind == 'i':
+            suma = suma.round().astype(np.int64)
+        observadas = np.bincount(plano, minlength=int(np.prod(tamanos))) > 0
+        suma, observadas = suma.reshape(tamanos), observadas.reshape(tamanos)
+
+        # Ordenar cada eje por etiqueta y descartar faltantes y etiquetas sin ventas
+        indices, posiciones = [], []
+        for eje, dim in enumerate(dimensiones):
+            indice = self._indice(dim)
+            otros = tuple(e for e in range(len(dimensiones)) if e != eje)
+            con_ventas = observadas.any(axis=otros) & ~indice.isna()
+            ordenado, orden = indice[con_ventas].sort_values(return_indexer=True)
+            indices.append(ordenado)
+            posiciones.append(np.flatnonzero(con_ventas)[orden])
+        suma = suma[np.ix_(*posiciones)]
+
+        if len(dimensiones) == 1:
+            return pd.Series(suma, index=indices[0], name=medida)
+        return pd.DataFrame(suma, index=indices[0], columns=indices[1])
+
+    def guardar(self, ruta, **meta):
+        """Guardar el cubo (arreglos en .npz y etiquetas en un .json al lado)
+
+        Cada archivo se escribe en un .tmp y se reemplaza de una vez; los
+        dos llevan la misma marca, así cargar descarta un par mezclado si
+        el proceso se interrumpió entre ambos reemplazos.
+        """
+        os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+        marca = os.urandom(8).hex()
+        with open(ruta + '.tmp', 'wb') as f:
+            np.savez_compressed(f, celdas=self.celdas, importe=self.importe, lineas=self.lineas,
+                                marca=np.array(marca))
+        ruta_meta = os.path.splitext(ruta)[0] + '.json'
+        with open(ruta_meta + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION_CUBO, 'marca': marca, 'filas': self.filas,
+                       'etiquetas': self.etiquetas, **meta}, f)
+        os.replace(ruta + '.tmp', ruta)
+        os.replace(ruta_meta + '.tmp', ruta_meta)
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Cubo guardado y sus metadatos, o (None, {}) si no existe o es de otra versión"""
+        ruta_meta = os.path.splitext(ruta)[0] + '.json'
+        if not (os.path.exists(ruta) and os.path.exists(ruta_meta)):
+            return None, {}
+        with open(ruta_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != VERSION_CUBO:
+            return None, {}
+
+        cubo = cls()
+        with np.load(ruta) as arreglos:
+            if 'marca' not in arreglos or str(arreglos['marca']) != meta.get('marca'):
+                return None, {}
+            cubo.celdas, cubo.importe, cubo.lineas = arreglos['celdas'], arreglos['importe'], arreglos['lineas']
+        cubo.filas = meta['filas']
+        for dim in DIMENSIONES:
+            cubo.etiquetas[dim] = meta['etiquetas'][dim]
+            cubo._codigos[dim] = {etiqueta: i for i, etiqueta in enumerate(cubo.etiquetas[dim])}
+        return cubo, meta
+
+
+# Cubos ya cargados en este proceso: {ruta: (cubo, meta)}. El menú consulta
+# desde el hilo principal y desde el de trabajo: el bloqueo protege el dict
+# y la actualización en el lugar de cada cubo.
+_cubos = {}
+_bloqueo = threading.Lock()
+
+
+def _huella_filas(hashes):
+    """Huella SHA-256 de los hashes por fila de un tramo de ventas"""
+    return hashlib.sha256(np.ascontiguousarray(hashes).tobytes()).hexdigest()
+
+
+def obtener_cubo(productos, ventas, carpeta='.'):
+    """Cubo de ventas actualizado, reutilizando la copia en memoria o en .cache_datos
+
+    Hay una copia por asignación de categorías a productos (el menú y los
+    gráficos categorizan distinto). Si el detalle de ventas solo creció
+    desde la última vez (las filas ya incluidas no cambiaron), se agregan
+    únicamente las filas nuevas.
+    """
+    firma_productos = huella(productos[['id_producto', 'categoria']])
+    ruta = os.path.join(carpeta, CARPETA_CACHE, f"cubo_ventas.{firma_productos[:16]}.npz")
+    ventas = ventas[COLUMNAS_VENTAS]
+    hashes = pd.util.hash_pandas_object(ventas, index=False).to_numpy()
+
+    with _bloqueo:
+        cubo, meta = _cubos.get(ruta) or CuboVentas.cargar(ruta)
+        if (cubo is None or cubo.filas > len(ventas)
+                or meta.get('huella_ventas') != _huella_filas(hashes[:cubo.filas])):
+            cubo, meta = CuboVentas(), {}
+        if cubo.filas < len(ventas):
+            # Se actualiza una copia: otro hilo puede estar consultando el cubo anterior
+            if cubo.filas:
+                cubo = copy.deepcopy(cubo)
+            cubo.agregar(ventas.iloc[cubo.filas:], productos)
+            meta = {'huella_ventas': _huella_filas(hashes)}
+            cubo.guardar(ruta, **meta)
+        _cubos[ruta] = (cubo, meta)
+        return cubo
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CARGA DE DATOS CON CACHÉ COLUMNAR
+Lectura tipada de los CSV del proyecto Tienda Aurelion - Demo 2
+
+La primera lectura de cada CSV lo convierte a Parquet (columnar y tipado)
+dentro de la carpeta .cache_datos; las siguientes leen directamente esa
+copia. La caché se valida contra el CSV de origen: si cambian la fecha de
+modificación o el tamaño se recalcula el hash del contenido y, si también
+cambió, se regenera el Parquet.
+
+Los textos repetidos (nombres de producto, ciudades, categorías) se guardan
+como columnas categóricas y los identificadores como enteros de 32 bits, lo
+que reduce el tiempo de carga y la memoria de detalle_ventas.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+CARPETA_CACHE = '.cache_datos'
+VERSION_CACHE = 1
+
+# Tipos de cada tabla: las columnas de texto repetido son categóricas (los
+# importes se dejan a la inferencia de pandas: pueden ser enteros o decimales)
+ESQUEMAS = {
+    'productos_demo2.csv': {
+        'dtype': {'id_producto': 'int32', 'nombre_producto': 'category', 'categoria': 'category'},
+    },
+    'clientes_demo2.csv': {
+        'dtype': {'id_cliente': 'int32', 'nombre_cliente': 'category',
+                  'email': 'string', 'ciudad': 'category'},
+        'fechas': ['fecha_alta'],
+    },
+    'detalle_ventas_demo2.csv': {
+        'dtype': {'id_venta': 'int64', 'id_producto': 'int32', 'nombre_producto': 'category', 'cantidad': 'int32'},
+    },
+}
+
+
+def _hash_archivo(ruta, bloque=1 << 20):
+    """Hash SHA-256 del contenido del archivo, leído por bloques"""
+    h = hashlib.sha256()
+    with open(ruta, 'rb') as f:
+        for parte in iter(lambda: f.read(bloque), b''):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def _leer_csv(ruta, esquema):
+    """Leer el CSV de origen aplicando los tipos del esquema"""
+    encabezado = pd.read_csv(ruta, nrows=0).columns
+    dtype = {col: tipo for col, tipo in esquema.get('dtype', {}).items() if col in encabezado}
+    fechas = [col for col in esquema.get('fechas', []) if col in encabezado]
+    return pd.read_csv(ruta, dtype=dtype, parse_dates=fechas)
+
+
+def leer_csv_cacheado(ruta, esquema=None, carpeta_cache=None):
+    """Leer un CSV usando (y manteniendo) su copia Parquet en caché"""
+    esquema = esquema if esquema is not None else ESQUEMAS.get(os.path.basename(ruta), {})
+    try:
+        import pyarrow  # noqa: F401  (motor de Parquet)
+    except ImportError:
+        return _leer_csv(ruta, esquema)
+
+    carpeta = carpeta_cache or os.path.join(os.path.dirname(os.path.abspath(ruta)), CARPETA_CACHE)
+    base = os.path.splitext(os.path.basename(ruta))[0]
+    ruta_parquet = os.path.join(carpeta, base + '.parquet')
+    ruta_meta = os.path.join(carpeta, base + '.json')
+
+    estado = os.stat(ruta)
+    firma = {'version': VERSION_CACHE, 'esquema': json.dumps(esquema, sort_keys=True)}
+    meta = {}
+    if os.path.exists(ruta_parquet) and os.path.exists(ruta_meta):
+        with open(ruta_meta, encoding='utf-8') as f:
+            meta = json.load(f)
+
+    vigente = all(meta.get(clave) == valor for clave, valor in firma.items())
+    if vigente and meta.get('mtime_ns') == estado.st_mtime_ns and meta.get('tamano') == estado.st_size:
+        return pd.read_parquet(ruta_parquet)
+
+    # La fecha cambió (copia, checkout...): solo se regenera si cambió el contenido
+    hash_origen = _hash_archivo(ruta)
+    if vigente and meta.get('sha256') == hash_origen:
+        df = pd.read_parquet(ruta_parquet)
+    else:
+        df = _leer_csv(ruta, esquema)
+        os.makedirs(carpeta, exist_ok=True)
+        df.to_parquet(ruta_parquet, index=False)
+
+    meta = {**firma, 'mtime_ns': estado.st_mtime_ns, 'tamano': estado.st_size, 'sha256': hash_origen}
+    with open(ruta_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return df
+
+
+def cargar_tablas(carpeta='.'):
+    """Cargar productos, clientes y detalle de ventas (desde la caché si es válida)"""
+    return tuple(leer_csv_cacheado(os.path.join(carpeta, nombre))
+                 for nombre in ('productos_demo2.csv', 'clientes_demo2.csv', 'detalle_ventas_demo2.csv'))
@@ -1,398 +1,539 @@
 #!/usr/bin/env python3
 # Script para ejecutar el código del notebook y generar los gráficos
+#
+# Pipeline en dos etapas:
+#   1. calcular_agregados: a partir de las tablas se calculan, una sola vez,
+#      los datos (pequeños) que necesita cada gráfico.
+#   2. Cada gráfico se rasteriza y se guarda como PNG de forma independiente,
+#      repartidos en un pool de procesos (dibujar sobre figuras Agg propias,
+#      sin el estado global de pyplot).
+#
+# Los gráficos cuyos agregados no cambiaron se toman de la caché de
+# renderizado (cache_graficos) en lugar de volver a dibujarse.
+#
+# También se puede importar: generar_graficos(productos, clientes, ventas)
+# recibe las tablas ya cargadas (por ejemplo, desde el menú).
+#
+# Uso:
+#   python ejecutar_graficos.py
+#   python ejecutar_graficos.py --charts heatmap clientes --procesos 2
+#   python ejecutar_graficos.py --forzar
+
+import argparse
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+import matplotlib.style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import seaborn as sns
-from datetime import datetime, timedelta
-import os
 
-# Configuración de estilo (compatible con diferentes versiones)
-try:
-    plt.style.use('seaborn-v0_8-darkgrid')
-except:
-    try:
-        plt.style.use('seaborn-darkgrid')
-    except:
-        plt.style.use('ggplot')
+import cache_graficos
+import pronosticos
+from categorizacion import categorizar_productos
+from cubo_ventas import obtener_cubo
+from datos import cargar_tablas
+
+# Gráficos disponibles (en orden) y archivo de salida de cada uno
+GRAFICOS = {
+    'clientes': 'grafico1_ventas_por_cliente.png',
+    'crecimiento': 'grafico2_ventas_vs_crecimiento.png',
+    'comparacion': 'grafico3_comparacion_tradicional_vs_ia.png',
+    'heatmap': 'grafico4_heatmap_ventas_mes_categoria.png',
+}
+ARCHIVOS_GRAFICOS = list(GRAFICOS.values())
+
+DPI = 300
+
+# matplotlib.style.context cambia rcParams, que es global al proceso: los
+# dibujos que se hacen en este proceso (no en el pool) se serializan con este
+# bloqueo, compartido con los gráficos del menú
+BLOQUEO_MATPLOTLIB = threading.Lock()
+# Incrementar al cambiar el código de dibujo: invalida los PNG en caché
+VERSION_DIBUJO = 1
+
+
+def _estilo():
+    """Estilo de los gráficos (compatible con diferentes versiones)"""
+    disponibles = matplotlib.style.available
+    nombre = next((e for e in ('seaborn-v0_8-darkgrid', 'seaborn-darkgrid') if e in disponibles), 'ggplot')
+    return [nombre, {
+        'figure.figsize': (12, 6),
+        'font.size': 10,
+        'axes.prop_cycle': matplotlib.cycler(color=sns.color_palette("husl")),
+    }]
+
 
-sns.set_palette("husl")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
+def _figura(figsize):
+    """Figura Agg propia (no usa el estado global de pyplot)"""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def preparar_datos(productos, clientes, ventas):
+    """Copias de las tablas con categoría por nombre, client_id y fecha"""
+    productos = productos.copy()
+    ventas = ventas.copy()
+
+    # Aplicar categorización a los productos
+    productos['categoria'] = categorizar_productos(productos['nombre_producto'])
+
+    # Preparar datos de ventas con client_id
+    np.random.seed(42)
+    if 'client_id' not in ventas.columns:
+        ventas['client_id'] = np.random.choice(clientes['id_cliente'].values, size=len(ventas))
+
+    # Agregar fecha a las ventas
+    if 'fecha' not in ventas.columns:
+        ventas['fecha'] = pd.date_range(start='2023-01-01', periods=len(ventas), freq='D')
+    return productos, ventas
 
-print("=" * 60)
-print("ANÁLISIS DE VENTAS Y PROYECCIONES - TIENDA AURELION")
-print("=" * 60)
-print("\n✓ Librerías importadas correctamente\n")
 
 # ============================================================
-# CELDA 1: Cargar datos
+# ETAPA 1: Agregados de cada gráfico
 # ============================================================
-print("📊 Cargando datos...")
-productos = pd.read_csv('productos_demo2.csv')
-clientes = pd.read_csv('clientes_demo2.csv')
-ventas = pd.read_csv('detalle_ventas_demo2.csv')
-
-# Función para categorizar productos según su nombre
-def categorizar_producto(nombre):
-    nombre_lower = nombre.lower()
-    
-    # Bebidas con Alcohol
-    if any(palabra in nombre_lower for palabra in ['cerveza', 'fernet', 'gin', 'ron', 'vodka', 'whisky', 'vino', 'sidra', 'licor']):
-        return 'Bebidas con Alcohol'
-    
-    # Bebidas sin Alcohol
-    if any(palabra in nombre_lower for palabra in ['coca cola', 'pepsi', 'sprite', 'fanta', 'agua mineral', 'jugo', 'energética', 'yerba mate', 'café', 'té']):
-        return 'Bebidas sin Alcohol'
-    
-    # Lácteos y Derivados
-    if any(palabra in nombre_lower for palabra in ['leche', 'yogur', 'queso', 'manteca']):
-        return 'Lácteos y Derivados'
-    
-    # Congelados y Precocinados
-    if any(palabra in nombre_lower for palabra in ['congelado', 'hamburguesa', 'empanada', 'pizza', 'precocido']):
-        return 'Congelados y Precocinados'
-    
-    # Panadería y Repostería
-    if any(palabra in nombre_lower for palabra in ['pan lactal', 'medialuna', 'bizcocho', 'galletita']):
-        return 'Panadería y Repostería'
-    
-    # Untables, Mermeladas y Dulces
-    if any(palabra in nombre_lower for palabra in ['mermelada', 'dulce de leche', 'miel']):
-        return 'Untables, Mermeladas y Dulces'
-    
-    # Golosinas, Snacks y Panificados
-    if any(palabra in nombre_lower for palabra in ['papas fritas', 'maní', 'mix de frutos secos', 'chocolate', 'barrita', 'caramelo', 'chicle', 'chupetín', 'alfajor', 'turrón']):
-        return 'Golosinas, Snacks y Panificados'
-    
-    # Limpieza del Hogar
-    if any(palabra in nombre_lower for palabra in ['detergente', 'lavandina', 'desengrasante', 'limpiavidrios', 'suavizante', 'esponja', 'trapo', 'servilleta', 'papel higiénico']):
-        return 'Limpieza del Hogar'
-    
-    # Higiene Personal
-    if any(palabra in nombre_lower for palabra in ['shampoo', 'jabón', 'crema dental', 'cepillo', 'hilo dental', 'desodorante', 'toallas húmedas', 'mascarilla']):
-        return 'Higiene Personal'
-    
-    # Almacén y Despensa
-    if any(palabra in nombre_lower for palabra in ['arroz', 'fideo', 'lenteja', 'garbanzo', 'poroto', 'harina', 'azúcar', 'sal', 'aceite', 'vinagre', 'salsa de tomate', 'caldo', 'sopa instantánea', 'avena', 'granola', 'aceituna', 'stevia']):
-        return 'Almacén y Despensa'
-    
-    # Otros Alimentos (por defecto para helados y otros)
-    if any(palabra in nombre_lower for palabra in ['helado']):
-        return 'Otros Alimentos'
-    
-    # Por defecto
-    return 'Otros Alimentos'
-
-# Aplicar categorización a los productos
-productos['categoria'] = productos['nombre_producto'].apply(categorizar_producto)
-
-# Preparar datos de ventas con client_id
-np.random.seed(42)
-ventas['client_id'] = np.random.choice(clientes['id_cliente'].values, size=len(ventas))
-
-# Agregar fecha a las ventas
-ventas['fecha'] = pd.date_range(start='2023-01-01', periods=len(ventas), freq='D')
-
-print(f"  ✓ Productos cargados: {len(productos)}")
-print(f"  ✓ Clientes cargados: {len(clientes)}")
-print(f"  ✓ Ventas cargadas: {len(ventas)}")
-print(f"  ✓ Clientes únicos en ventas: {ventas['client_id'].nunique()}")
-print(f"  ✓ Categorías disponibles: {', '.join(sorted(productos['categoria'].unique()))}\n")
+
+def agregar_ventas_por_cliente(cubo):
+    """Top 20 de clientes por importe total"""
+    ventas_por_cliente = cubo.totales('cliente').rename_axis('client_id').reset_index()
+    return {'ventas_por_cliente': ventas_por_cliente.sort_values('importe', ascending=False).head(20)}
+
+
+def agregar_ventas_mensuales(cubo):
+    """Ventas por mes con el número de mes correlativo"""
+    ventas_mensuales = cubo.totales('mes').reset_index()
+    ventas_mensuales['mes_num'] = range(len(ventas_mensuales))
+    return ventas_mensuales
+
+
+def agregar_crecimiento(ventas_mensuales, horizonte=6):
+    """Crecimiento mensual real y proyectado (regresión lineal a 6 meses)"""
+    y = ventas_mensuales['importe'].to_numpy()
+
+    m, b = pronosticos.tendencia_lineal(y)
+    proyeccion_futura = pronosticos.proyectar_tendencia(m, b, len(y), horizonte)
+
+    return {
+        'ventas': y,
+        'proyeccion_futura': proyeccion_futura,
+        'crecimiento_proyectado': pronosticos.crecimiento_mensual(y).tolist(),
+        'crecimiento_futuro': pronosticos.crecimiento_proyeccion(y[-1], proyeccion_futura).tolist(),
+    }
+
+
+def agregar_comparacion(ventas_mensuales, meses_proyeccion=12):
+    """Ventas históricas extendidas con crecimiento tradicional (3%) y con IA (5% y luego 8%)"""
+    historico = ventas_mensuales['importe'].to_numpy()
+
+    crecimiento_tradicional = 0.03  # 3% mensual
+    crecimiento_ia_inicial = 0.05  # 5% los primeros 3 meses
+    crecimiento_ia_acelerado = 0.08  # 8% después
+
+    tasas_ia = pronosticos.tasas_escalonadas(meses_proyeccion, [(3, crecimiento_ia_inicial),
+                                                                (meses_proyeccion, crecimiento_ia_acelerado)])
+    tasas = np.vstack([np.full(meses_proyeccion, crecimiento_tradicional), tasas_ia])
+    ventas_tradicional, ventas_ia = pronosticos.proyectar_compuesto(np.repeat(historico[-1], 2), tasas)
+
+    return {
+        'meses_historicos': len(historico),
+        'ventas_tradicional': historico.tolist() + ventas_tradicional.tolist(),
+        'ventas_ia': historico.tolist() + ventas_ia.tolist(),
+    }
+
+
+def agregar_heatmap(cubo):
+    """Matriz de ventas: meses (filas) x categorías (columnas, de mayor a menor)"""
+    heatmap_data = cubo.totales('mes', 'categoria')
+    heatmap_data.index = heatmap_data.index.astype(str).rename('mes_str')
+
+    # Ordenar categorías por ventas totales (de mayor a menor) para mejor visualización
+    categorias_ordenadas = heatmap_data.sum().sort_values(ascending=False).index
+    return {'heatmap_data': heatmap_data[categorias_ordenadas]}
+
+
+def calcular_agregados(productos, ventas, graficos=None):
+    """Calcular una sola vez los datos de entrada de los gráficos pedidos
+
+    Recibe las tablas ya preparadas con preparar_datos. Todos los agregados
+    salen del cubo de ventas (mes x categoría x cliente x producto), que se
+    mantiene en caché entre ejecuciones.
+    """
+    graficos = list(GRAFICOS) if graficos is None else graficos
+    cubo = obtener_cubo(productos, ventas)
+
+    agregados = {}
+    if 'clientes' in graficos:
+        agregados['clientes'] = agregar_ventas_por_cliente(cubo)
+    if 'crecimiento' in graficos or 'comparacion' in graficos:
+        ventas_mensuales = agregar_ventas_mensuales(cubo)
+        if 'crecimiento' in graficos:
+            agregados['crecimiento'] = agregar_crecimiento(ventas_mensuales)
+        if 'comparacion' in graficos:
+            agregados['comparacion'] = agregar_comparacion(ventas_mensuales)
+    if 'heatmap' in graficos:
+        agregados['heatmap'] = agregar_heatmap(cubo)
+    return {nombre: agregados[nombre] for nombre in graficos}
+
 
 # ============================================================
-# GRÁFICO 1: Ventas por Cliente (Barras)
+# ETAPA 2: Dibujo de cada gráfico
 # ============================================================
-print("📈 Generando Gráfico 1: Ventas por Cliente (Barras)...")
 
-ventas_por_cliente = ventas.groupby('client_id')['importe'].sum().reset_index()
-ventas_por_cliente = ventas_por_cliente.sort_values('importe', ascending=False).head(20)
+# GRÁFICO 1: Ventas por Cliente (Barras)
+def dibujar_ventas_por_cliente(datos, archivo):
+    ventas_por_cliente = datos['ventas_por_cliente']
 
-plt.figure(figsize=(14, 7))
-bars = plt.bar(range(len(ventas_por_cliente)), ventas_por_cliente['importe'], 
-               color='steelblue', edgecolor='navy', alpha=0.7)
+    fig, ax = _figura((14, 7))
+    bars = ax.bar(range(len(ventas_por_cliente)), ventas_por_cliente['importe'],
+                  color='steelblue', edgecolor='navy', alpha=0.7)
 
-plt.xlabel('ID de Cliente', fontsize=12, fontweight='bold')
-plt.ylabel('Ventas Totales ($)', fontsize=12, fontweight='bold')
-plt.title('Ventas por Cliente - Top 20 Clientes', fontsize=14, fontweight='bold', pad=20)
-plt.xticks(range(len(ventas_por_cliente)), ventas_por_cliente['client_id'], rotation=45, ha='right')
-plt.grid(axis='y', alpha=0.3, linestyle='--')
+    ax.set_xlabel('ID de Cliente', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Ventas Totales ($)', fontsize=12, fontweight='bold')
+    ax.set_title('Ventas por Cliente - Top 20 Clientes', fontsize=14, fontweight='bold', pad=20)
+    ax.set_xticks(range(len(ventas_por_cliente)))
+    ax.set_xticklabels(ventas_por_cliente['client_id'], rotation=45, ha='right')
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
 
-for i, bar in enumerate(bars):
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2., height,
-             f'${int(height):,}',
-             ha='center', va='bottom', fontsize=8)
+    for i, bar in enumerate(bars):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'${int(height):,}',
+                ha='center', va='bottom', fontsize=8)
 
-plt.tight_layout()
-plt.savefig('grafico1_ventas_por_cliente.png', dpi=300, bbox_inches='tight')
-print("  ✓ Gráfico 1 guardado: grafico1_ventas_por_cliente.png")
-plt.close()
+    fig.tight_layout()
+    fig.savefig(archivo, dpi=DPI, bbox_inches='tight')
 
-print(f"  - Total de ventas del top cliente: ${ventas_por_cliente['importe'].max():,.2f}")
-print(f"  - Promedio de ventas por cliente: ${ventas_por_cliente['importe'].mean():,.2f}\n")
 
-# ============================================================
 # GRÁFICO 2: Ventas vs Crecimiento Proyectado (Dispersión)
-# ============================================================
-print("📈 Generando Gráfico 2: Ventas vs Crecimiento Proyectado (Dispersión)...")
-
-ventas['mes'] = ventas['fecha'].dt.to_period('M')
-ventas_mensuales = ventas.groupby('mes')['importe'].sum().reset_index()
-ventas_mensuales['mes_num'] = range(len(ventas_mensuales))
-
-# Regresión lineal manual
-X = ventas_mensuales['mes_num'].values
-y = ventas_mensuales['importe'].values
-
-n = len(X)
-m = (n * np.sum(X * y) - np.sum(X) * np.sum(y)) / (n * np.sum(X**2) - np.sum(X)**2)
-b = (np.sum(y) - m * np.sum(X)) / n
-
-def predecir(x):
-    return m * x + b
-
-meses_futuros = np.array(range(len(ventas_mensuales), len(ventas_mensuales) + 6))
-proyeccion_futura = np.array([predecir(mes) for mes in meses_futuros])
-
-# Calcular crecimiento
-crecimiento_proyectado = []
-for i in range(len(ventas_mensuales)):
-    if i > 0:
-        crecimiento = ((ventas_mensuales.iloc[i]['importe'] - ventas_mensuales.iloc[i-1]['importe']) / 
-                      ventas_mensuales.iloc[i-1]['importe']) * 100
-    else:
-        crecimiento = 0
-    crecimiento_proyectado.append(crecimiento)
-
-crecimiento_futuro = []
-for i, proy in enumerate(proyeccion_futura):
-    if i == 0:
-        base = ventas_mensuales.iloc[-1]['importe']
-    else:
-        base = proyeccion_futura[i-1]
-    crecimiento = ((proy - base) / base) * 100 if base > 0 else 0
-    crecimiento_futuro.append(crecimiento)
-
-ventas_totales = list(ventas_mensuales['importe']) + list(proyeccion_futura)
-crecimiento_total = crecimiento_proyectado + crecimiento_futuro
-
-plt.figure(figsize=(14, 8))
-
-plt.scatter(ventas_mensuales['importe'], crecimiento_proyectado, 
-           s=150, alpha=0.7, color='steelblue', edgecolors='navy', linewidth=2,
-           label='Datos Reales', zorder=3)
-
-plt.scatter(proyeccion_futura, crecimiento_futuro, 
-           s=150, alpha=0.7, color='coral', edgecolors='darkred', linewidth=2,
-           marker='s', label='Proyecciones Futuras', zorder=3)
-
-z = np.polyfit(ventas_totales, crecimiento_total, 1)
-p = np.poly1d(z)
-plt.plot(sorted(ventas_totales), p(sorted(ventas_totales)), 
-         "r--", alpha=0.5, linewidth=2, label='Tendencia')
-
-plt.xlabel('Ventas Totales ($)', fontsize=12, fontweight='bold')
-plt.ylabel('Crecimiento Proyectado (%)', fontsize=12, fontweight='bold')
-plt.title('Ventas vs Crecimiento Proyectado a Futuro', fontsize=14, fontweight='bold', pad=20)
-plt.legend(loc='best', fontsize=10, framealpha=0.9)
-plt.grid(True, alpha=0.3, linestyle='--')
-
-for i, (venta, crec) in enumerate(zip(ventas_mensuales['importe'], crecimiento_proyectado)):
-    if i % 2 == 0:
-        plt.annotate(f'M{i+1}', (venta, crec), fontsize=8, alpha=0.7)
-
-plt.tight_layout()
-plt.savefig('grafico2_ventas_vs_crecimiento.png', dpi=300, bbox_inches='tight')
-print("  ✓ Gráfico 2 guardado: grafico2_ventas_vs_crecimiento.png")
-plt.close()
-
-print(f"  - Ventas promedio mensuales: ${ventas_mensuales['importe'].mean():,.2f}")
-print(f"  - Crecimiento promedio proyectado: {np.mean(crecimiento_proyectado):.2f}%")
-print(f"  - Proyección para el próximo mes: ${proyeccion_futura[0]:,.2f}\n")
+def dibujar_ventas_vs_crecimiento(datos, archivo):
+    ventas_reales = datos['ventas']
+    proyeccion_futura = datos['proyeccion_futura']
+    crecimiento_proyectado = datos['crecimiento_proyectado']
+    crecimiento_futuro = datos['crecimiento_futuro']
+
+    ventas_totales = list(ventas_reales) + list(proyeccion_futura)
+    crecimiento_total = crecimiento_proyectado + crecimiento_futuro
+
+    fig, ax = _figura((14, 8))
+
+    ax.scatter(ventas_reales, crecimiento_proyectado,
+               s=150, alpha=0.7, color='steelblue', edgecolors='navy', linewidth=2,
+               label='Datos Reales', zorder=3)
+
+    ax.scatter(proyeccion_futura, crecimiento_futuro,
+               s=150, alpha=0.7, color='coral', edgecolors='darkred', linewidth=2,
+               marker='s', label='Proyecciones Futuras', zorder=3)
+
+    z = np.polyfit(ventas_totales, crecimiento_total, 1)
+    p = np.poly1d(z)
+    ax.plot(sorted(ventas_totales), p(sorted(ventas_totales)),
+            "r--", alpha=0.5, linewidth=2, label='Tendencia')
+
+    ax.set_xlabel('Ventas Totales ($)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Crecimiento Proyectado (%)', fontsize=12, fontweight='bold')
+    ax.set_title('Ventas vs Crecimiento Proyectado a Futuro', fontsize=14, fontweight='bold', pad=20)
+    ax.legend(loc='best', fontsize=10, framealpha=0.9)
+    ax.grid(True, alpha=0.3, linestyle='--')
+
+    for i, (venta, crec) in enumerate(zip(ventas_reales, crecimiento_proyectado)):
+        if i % 2 == 0:
+            ax.annotate(f'M{i+1}', (venta, crec), fontsize=8, alpha=0.7)
+
+    fig.tight_layout()
+    fig.savefig(archivo, dpi=DPI, bbox_inches='tight')
+
 
-# ============================================================
 # GRÁFICO 3: Comparación Tradicional vs IA (Lineal)
-# ============================================================
-print("📈 Generando Gráfico 3: Comparación Sistema Tradicional vs IA (Lineal)...")
-
-meses_historicos = len(ventas_mensuales)
-meses_proyeccion = 12
-
-crecimiento_tradicional = 0.03  # 3% mensual
-
-ventas_tradicional = []
-for i in range(meses_historicos + meses_proyeccion):
-    if i < meses_historicos:
-        ventas_tradicional.append(ventas_mensuales.iloc[i]['importe'])
-    else:
-        venta_anterior = ventas_tradicional[i-1]
-        ventas_tradicional.append(venta_anterior * (1 + crecimiento_tradicional))
-
-crecimiento_ia_inicial = 0.05  # 5% inicial
-crecimiento_ia_acelerado = 0.08  # 8% después
-
-ventas_ia = []
-for i in range(meses_historicos + meses_proyeccion):
-    if i < meses_historicos:
-        ventas_ia.append(ventas_mensuales.iloc[i]['importe'])
-    elif i < meses_historicos + 3:
-        venta_anterior = ventas_ia[i-1]
-        ventas_ia.append(venta_anterior * (1 + crecimiento_ia_inicial))
-    else:
-        venta_anterior = ventas_ia[i-1]
-        ventas_ia.append(venta_anterior * (1 + crecimiento_ia_acelerado))
-
-meses_totales = range(1, meses_historicos + meses_proyeccion + 1)
-mes_implementacion_ia = meses_historicos + 1
-
-plt.figure(figsize=(16, 8))
-
-plt.plot(meses_totales, ventas_tradicional, 
-        marker='o', linewidth=2.5, markersize=6,
-        color='#e74c3c', label='Sistema Tradicional de Marketing',
-        alpha=0.8)
-
-plt.plot(meses_totales, ventas_ia, 
-        marker='s', linewidth=2.5, markersize=6,
-        color='#3498db', label='Sistema con Inteligencia Artificial',
-        alpha=0.8)
-
-plt.axvline(x=mes_implementacion_ia, color='green', linestyle='--', 
-           linewidth=2, alpha=0.7, label='Implementación de IA')
-
-diferencia = np.array(ventas_ia) - np.array(ventas_tradicional)
-plt.fill_between(meses_totales, ventas_tradicional, ventas_ia, 
-                where=(np.array(ventas_ia) >= np.array(ventas_tradicional)),
-                alpha=0.3, color='green', label='Ventaja del Sistema con IA')
-
-plt.xlabel('Mes', fontsize=12, fontweight='bold')
-plt.ylabel('Ventas Totales ($)', fontsize=12, fontweight='bold')
-plt.title('Comparación de Crecimiento: Sistema Tradicional vs Sistema con IA', 
-         fontsize=14, fontweight='bold', pad=20)
-plt.legend(loc='upper left', fontsize=11, framealpha=0.9, shadow=True)
-plt.grid(True, alpha=0.3, linestyle='--')
-
-diferencia_final = ventas_ia[-1] - ventas_tradicional[-1]
-porcentaje_mejora = (diferencia_final / ventas_tradicional[-1]) * 100
-
-plt.annotate(f'Mejora con IA: +${diferencia_final:,.0f}\n({porcentaje_mejora:.1f}% más)', 
-            xy=(meses_totales[-1], ventas_ia[-1]),
-            xytext=(meses_totales[-1] - 3, ventas_ia[-1] + max(ventas_ia) * 0.1),
-            fontsize=10, fontweight='bold',
-            bbox=dict(boxstyle='round,pad=0.5', facecolor='yellow', alpha=0.7),
-            arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0.2', color='black'))
-
-plt.tight_layout()
-plt.savefig('grafico3_comparacion_tradicional_vs_ia.png', dpi=300, bbox_inches='tight')
-print("  ✓ Gráfico 3 guardado: grafico3_comparacion_tradicional_vs_ia.png")
-plt.close()
-
-print("\n" + "=" * 60)
-print("COMPARACIÓN DE SISTEMAS")
-print("=" * 60)
-print(f"\nSistema Tradicional:")
-print(f"  - Ventas finales: ${ventas_tradicional[-1]:,.2f}")
-print(f"  - Crecimiento acumulado: {((ventas_tradicional[-1] / ventas_tradicional[0]) - 1) * 100:.2f}%")
-
-print(f"\nSistema con IA:")
-print(f"  - Ventas finales: ${ventas_ia[-1]:,.2f}")
-print(f"  - Crecimiento acumulado: {((ventas_ia[-1] / ventas_ia[0]) - 1) * 100:.2f}%")
-
-print(f"\nVentaja del Sistema con IA:")
-print(f"  - Diferencia absoluta: ${diferencia_final:,.2f}")
-print(f"  - Mejora porcentual: {porcentaje_mejora:.2f}%")
+def dibujar_comparacion_tradicional_vs_ia(datos, archivo):
+    ventas_tradicional = datos['ventas_tradicional']
+    ventas_ia = datos['ventas_ia']
+
+    meses_totales = range(1, len(ventas_ia) + 1)
+    mes_implementacion_ia = datos['meses_historicos'] + 1
+
+    fig, ax = _figura((16, 8))
+
+    ax.plot(meses_totales, ventas_tradicional,
+            marker='o', linewidth=2.5, markersize=6,
+            color='#e74c3c', label='Sistema Tradicional de Marketing',
+            alpha=0.8)
+
+    ax.plot(meses_totales, ventas_ia,
+            marker='s', linewidth=2.5, markersize=6,
+            color='#3498db', label='Sistema con Inteligencia Artificial',
+            alpha=0.8)
+
+    ax.axvline(x=mes_implementacion_ia, color='green', linestyle='--',
+               linewidth=2, alpha=0.7, label='Implementación de IA')
+
+    ax.fill_between(meses_totales, ventas_tradicional, ventas_ia,
+                    where=(np.array(ventas_ia) >= np.array(ventas_tradicional)),
+                    alpha=0.3, color='green', label='Ventaja del Sistema con IA')
+
+    ax.set_xlabel('Mes', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Ventas Totales ($)', fontsize=12, fontweight='bold')
+    ax.set_title('Comparación de Crecimiento: Sistema Tradicional vs Sistema con IA',
+                 fontsize=14, fontweight='bold', pad=20)
+    ax.legend(loc='upper left', fontsize=11, framealpha=0.9, shadow=True)
+    ax.grid(True, alpha=0.3, linestyle='--')
+
+    diferencia_final = ventas_ia[-1] - ventas_tradicional[-1]
+    porcentaje_mejora = (diferencia_final / ventas_tradicional[-1]) * 100
+
+    ax.annotate(f'Mejora con IA: +${diferencia_final:,.0f}\n({porcentaje_mejora:.1f}% más)',
+                xy=(meses_totales[-1], ventas_ia[-1]),
+                xytext=(meses_totales[-1] - 3, ventas_ia[-1] + max(ventas_ia) * 0.1),
+                fontsize=10, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.5', facecolor='yellow', alpha=0.7),
+                arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0.2', color='black'))
+
+    fig.tight_layout()
+    fig.savefig(archivo, dpi=DPI, bbox_inches='tight')
+
 
-# ============================================================
 # GRÁFICO 4: HeatMap de Ventas por Mes y Categoría de Producto
+def dibujar_heatmap_ventas_mes_categoria(datos, archivo):
+    heatmap_data = datos['heatmap_data']
+
+    # Crear el HeatMap con mejor tamaño para las etiquetas
+    fig, ax = _figura((18, 10))
+
+    # Usar seaborn para crear el heatmap con mejor visualización
+    sns.heatmap(
+        heatmap_data,
+        annot=True,
+        fmt='.0f',
+        cmap='YlOrRd',  # Colores cálidos: amarillo-naranja-rojo
+        cbar_kws={'label': 'Ventas ($)', 'shrink': 0.8, 'pad': 0.02},
+        linewidths=0.8,
+        linecolor='white',
+        square=False,
+        annot_kws={'size': 9, 'weight': 'bold'},
+        xticklabels=True,
+        yticklabels=True,
+        ax=ax
+    )
+
+    # Personalizar etiquetas de categorías (eje X) - rotar y ajustar tamaño
+    categorias_labels = [cat.replace(' y ', '\ny ') for cat in heatmap_data.columns]
+    ax.set_xticklabels(categorias_labels, rotation=45, ha='right', fontsize=11, fontweight='bold')
+    ax.set_yticklabels(heatmap_data.index, rotation=0, fontsize=11, fontweight='bold')
+
+    # Personalizar gráfico
+    ax.set_xlabel('Categorías de Productos', fontsize=14, fontweight='bold', labelpad=15)
+    ax.set_ylabel('Mes', fontsize=14, fontweight='bold', labelpad=10)
+    ax.set_title('HeatMap de Ventas: Ventas por Mes y Categoría de Producto - Tienda Aurelion',
+                 fontsize=16, fontweight='bold', pad=25)
+
+    fig.tight_layout()
+    fig.savefig(archivo, dpi=DPI, bbox_inches='tight')
+
+
+DIBUJOS = {
+    'clientes': dibujar_ventas_por_cliente,
+    'crecimiento': dibujar_ventas_vs_crecimiento,
+    'comparacion': dibujar_comparacion_tradicional_vs_ia,
+    'heatmap': dibujar_heatmap_ventas_mes_categoria,
+}
+
+
+def renderizar(nombre, datos, archivo):
+    """Dibujar y guardar un gráfico (en un proceso del pool o en el hilo actual)"""
+    with BLOQUEO_MATPLOTLIB, matplotlib.style.context(_estilo()):
+        DIBUJOS[nombre](datos, archivo)
+    return nombre, archivo
+
+
+# ============================================================
+# Resúmenes por consola
 # ============================================================
-print("📈 Generando Gráfico 4: HeatMap de Ventas por Mes y Categoría de Producto...")
-
-# Preparar datos para el HeatMap: unir ventas con productos para obtener categorías
-ventas_con_categorias = ventas.merge(
-    productos[['id_producto', 'categoria']],
-    on='id_producto',
-    how='left'
-)
-
-# Preparar datos para el HeatMap
-ventas_con_categorias['mes'] = ventas_con_categorias['fecha'].dt.to_period('M')
-ventas_con_categorias['mes_str'] = ventas_con_categorias['mes'].astype(str)
-
-# Crear matriz de ventas: Meses (filas) x Categorías (columnas)
-heatmap_data = ventas_con_categorias.pivot_table(
-    values='importe',
-    index='mes_str',
-    columns='categoria',
-    aggfunc='sum',
-    fill_value=0
-)
-
-# Ordenar por mes cronológicamente
-heatmap_data = heatmap_data.sort_index()
-
-# Ordenar categorías por ventas totales (de mayor a menor) para mejor visualización
-categorias_ordenadas = heatmap_data.sum().sort_values(ascending=False).index
-heatmap_data = heatmap_data[categorias_ordenadas]
-
-# Crear el HeatMap con mejor tamaño para las etiquetas
-plt.figure(figsize=(18, 10))
-
-# Usar seaborn para crear el heatmap con mejor visualización
-ax = sns.heatmap(
-    heatmap_data,
-    annot=True,
-    fmt='.0f',
-    cmap='YlOrRd',  # Colores cálidos: amarillo-naranja-rojo
-    cbar_kws={'label': 'Ventas ($)', 'shrink': 0.8, 'pad': 0.02},
-    linewidths=0.8,
-    linecolor='white',
-    square=False,
-    annot_kws={'size': 9, 'weight': 'bold'},
-    xticklabels=True,
-    yticklabels=True
-)
-
-# Personalizar etiquetas de categorías (eje X) - rotar y ajustar tamaño
-categorias_labels = [cat.replace(' y ', '\ny ') for cat in heatmap_data.columns]
-ax.set_xticklabels(categorias_labels, rotation=45, ha='right', fontsize=11, fontweight='bold')
-ax.set_yticklabels(heatmap_data.index, rotation=0, fontsize=11, fontweight='bold')
-
-# Personalizar gráfico
-plt.xlabel('Categorías de Productos', fontsize=14, fontweight='bold', labelpad=15)
-plt.ylabel('Mes', fontsize=14, fontweight='bold', labelpad=10)
-plt.title('HeatMap de Ventas: Ventas por Mes y Categoría de Producto - Tienda Aurelion', 
-         fontsize=16, fontweight='bold', pad=25)
-
-plt.tight_layout()
-plt.savefig('grafico4_heatmap_ventas_mes_categoria.png', dpi=300, bbox_inches='tight')
-print("  ✓ Gráfico 4 guardado: grafico4_heatmap_ventas_mes_categoria.png")
-plt.close()
-
-# Estadísticas del HeatMap
-print("\n=== ANÁLISIS DEL HEATMAP POR CATEGORÍAS ===")
-print(f"  - Total de meses analizados: {len(heatmap_data)}")
-print(f"  - Total de categorías: {len(heatmap_data.columns)}")
-print(f"  - Categorías disponibles: {', '.join(heatmap_data.columns.tolist())}")
-print(f"\n  - Categoría con mayor venta total: {heatmap_data.sum().idxmax()}")
-print(f"  - Ventas totales de la categoría top: ${heatmap_data.sum().max():,.2f}")
-print(f"  - Mes con mayor venta total: {heatmap_data.sum(axis=1).idxmax()}")
-print(f"  - Ventas totales del mes top: ${heatmap_data.sum(axis=1).max():,.2f}")
-print(f"  - Promedio de ventas por celda: ${heatmap_data.values.mean():,.2f}")
-print(f"\n  - Desglose por categoría:")
-for categoria in categorias_ordenadas:
-    total_categoria = heatmap_data[categoria].sum()
-    porcentaje = (total_categoria / heatmap_data.sum().sum()) * 100
-    print(f"    • {categoria}: ${total_categoria:,.2f} ({porcentaje:.1f}% del total)\n")
-
-print("\n" + "=" * 60)
-print("✅ TODOS LOS GRÁFICOS GENERADOS EXITOSAMENTE")
-print("=" * 60)
-print("\nArchivos generados:")
-print("  📊 grafico1_ventas_por_cliente.png")
-print("  📊 grafico2_ventas_vs_crecimiento.png")
-print("  📊 grafico3_comparacion_tradicional_vs_ia.png")
-print("  📊 grafico4_heatmap_ventas_mes_categoria.png")
-print("\n")
 
+def _resumen_clientes(datos):
+    ventas_por_cliente = datos['ventas_por_cliente']
+    print(f"  - Total de ventas del top cliente: ${ventas_por_cliente['importe'].max():,.2f}")
+    print(f"  - Promedio de ventas por cliente: ${ventas_por_cliente['importe'].mean():,.2f}\n")
+
+
+def _resumen_crecimiento(datos):
+    print(f"  - Ventas promedio mensuales: ${datos['ventas'].mean():,.2f}")
+    print(f"  - Crecimiento promedio proyectado: {np.mean(datos['crecimiento_proyectado']):.2f}%")
+    print(f"  - Proyección para el próximo mes: ${datos['proyeccion_futura'][0]:,.2f}\n")
+
+
+def _resumen_comparacion(datos):
+    ventas_tradicional = datos['ventas_tradicional']
+    ventas_ia = datos['ventas_ia']
+    diferencia_final = ventas_ia[-1] - ventas_tradicional[-1]
+    porcentaje_mejora = (diferencia_final / ventas_tradicional[-1]) * 100
+
+    print("\n" + "=" * 60)
+    print("COMPARACIÓN DE SISTEMAS")
+    print("=" * 60)
+    print(f"\nSistema Tradicional:")
+    print(f"  - Ventas finales: ${ventas_tradicional[-1]:,.2f}")
+    print(f"  - Crecimiento acumulado: {((ventas_tradicional[-1] / ventas_tradicional[0]) - 1) * 100:.2f}%")
+
+    print(f"\nSistema con IA:")
+    print(f"  - Ventas finales: ${ventas_ia[-1]:,.2f}")
+    print(f"  - Crecimiento acumulado: {((ventas_ia[-1] / ventas_ia[0]) - 1) * 100:.2f}%")
+
+    print(f"\nVentaja del Sistema con IA:")
+    print(f"  - Diferencia absoluta: ${diferencia_final:,.2f}")
+    print(f"  - Mejora porcentual: {porcentaje_mejora:.2f}%")
+
+
+def _resumen_heatmap(datos):
+    heatmap_data = datos['heatmap_data']
+    print("\n=== ANÁLISIS DEL HEATMAP POR CATEGORÍAS ===")
+    print(f"  - Total de meses analizados: {len(heatmap_data)}")
+    print(f"  - Total de categorías: {len(heatmap_data.columns)}")
+    print(f"  - Categorías disponibles: {', '.join(heatmap_data.columns.tolist())}")
+    print(f"\n  - Categoría con mayor venta total: {heatmap_data.sum().idxmax()}")
+    print(f"  - Ventas totales de la categoría top: ${heatmap_data.sum().max():,.2f}")
+    print(f"  - Mes con mayor venta total: {heatmap_data.sum(axis=1).idxmax()}")
+    print(f"  - Ventas totales del mes top: ${heatmap_data.sum(axis=1).max():,.2f}")
+    print(f"  - Promedio de ventas por celda: ${heatmap_data.values.mean():,.2f}")
+    print(f"\n  - Desglose por categoría:")
+    for categoria in heatmap_data.columns:
+        total_categoria = heatmap_data[categoria].sum()
+        porcentaje = (total_categoria / heatmap_data.sum().sum()) * 100
+        print(f"    • {categoria}: ${total_categoria:,.2f} ({porcentaje:.1f}% del total)\n")
+
+
+RESUMENES = {
+    'clientes': _resumen_clientes,
+    'crecimiento': _resumen_crecimiento,
+    'comparacion': _resumen_comparacion,
+    'heatmap': _resumen_heatmap,
+}
+
+TITULOS = {
+    'clientes': "Gráfico 1: Ventas por Cliente (Barras)",
+    'crecimiento': "Gráfico 2: Ventas vs Crecimiento Proyectado (Dispersión)",
+    'comparacion': "Gráfico 3: Comparación Sistema Tradicional vs IA (Lineal)",
+    'heatmap': "Gráfico 4: HeatMap de Ventas por Mes y Categoría de Producto",
+}
+
+
+def generar_graficos(productos, clientes, ventas, graficos=None, procesos=None, forzar=False, mostrar_progreso=True,
+                     progreso=None):
+    """Generar los gráficos pedidos a partir de las tablas ya cargadas
+
+    Los agregados se calculan una vez y los gráficos se rasterizan en
+    paralelo en `procesos` procesos (por defecto, uno por gráfico hasta el
+    número de CPU; con un solo proceso se dibujan en el proceso actual).
+    Los gráficos cuyos agregados y parámetros no cambiaron desde la última
+    vez no se vuelven a dibujar (forzar=True los regenera igual).
+    No modifica las tablas recibidas. Devuelve la lista de archivos.
+
+    progreso(hechos, total, mensaje), si se indica, se llama después de
+    calcular los agregados y de guardar cada gráfico; si lanza una excepción
+    (por ejemplo, al cancelar la tarea desde el menú) se dejan de dibujar
+    los gráficos que faltan.
+    """
+    avanzar = progreso or (lambda hechos, total, mensaje='': None)
+    graficos = list(GRAFICOS) if graficos is None else [g for g in GRAFICOS if g in graficos]
+    productos, ventas = preparar_datos(productos, clientes, ventas)
+
+    if mostrar_progreso:
+        print(f"  ✓ Productos cargados: {len(productos)}")
+        print(f"  ✓ Clientes cargados: {len(clientes)}")
+        print(f"  ✓ Ventas cargadas: {len(ventas)}")
+        print(f"  ✓ Clientes únicos en ventas: {ventas['client_id'].nunique()}")
+        print(f"  ✓ Categorías disponibles: {', '.join(sorted(productos['categoria'].unique()))}\n")
+
+    agregados = calcular_agregados(productos, ventas, graficos)
+    if mostrar_progreso:
+        for nombre in graficos:
+            print(f"📈 Generando {TITULOS[nombre]}...")
+            RESUMENES[nombre](agregados[nombre])
+        print()
+
+    # Saltar los gráficos cuyo PNG ya se generó con los mismos agregados y parámetros
+    parametros = (VERSION_DIBUJO, DPI, repr(_estilo()), matplotlib.__version__, sns.__version__)
+    huellas = {nombre: cache_graficos.huella(nombre, agregados[nombre], parametros) for nombre in graficos}
+    manifiesto = cache_graficos.cargar_manifiesto(GRAFICOS[graficos[0]]) if graficos else {}
+    pendientes = [nombre for nombre in graficos
+                  if forzar or not cache_graficos.vigente(manifiesto, GRAFICOS[nombre], huellas[nombre])]
+    if mostrar_progreso:
+        for nombre in graficos:
+            if nombre not in pendientes:
+                print(f"  • {TITULOS[nombre].split(':')[0]} sin cambios (caché): {GRAFICOS[nombre]}")
+
+    def _guardado(nombre, archivo):
+        cache_graficos.registrar(manifiesto, archivo, huellas[nombre])
+        if mostrar_progreso:
+            print(f"  ✓ {TITULOS[nombre].split(':')[0]} guardado: {archivo}")
+
+    hechos = len(graficos) - len(pendientes)
+    avanzar(hechos, len(graficos), 'agregados calculados')
+
+    procesos = procesos or min(len(pendientes), os.cpu_count() or 1)
+    try:
+        if procesos <= 1:
+            for nombre in pendientes:
+                _guardado(*renderizar(nombre, agregados[nombre], GRAFICOS[nombre]))
+                hechos += 1
+                avanzar(hechos, len(graficos), GRAFICOS[nombre])
+        else:
+            # 'spawn': el pool puede crearse desde un hilo (el menú lo usa en segundo plano)
+            with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn')) as pool:
+                futuros = [pool.submit(renderizar, nombre, agregados[nombre], GRAFICOS[nombre]) for nombre in pendientes]
+                try:
+                    for futuro in as_completed(futuros):
+                        nombre, archivo = futuro.result()
+                        _guardado(nombre, archivo)
+                        hechos += 1
+                        avanzar(hechos, len(graficos), archivo)
+                except BaseException:
+                    # No empezar los gráficos que aún esperan en el pool
+                    pool.shutdown(cancel_futures=True)
+                    raise
+    finally:
+        # Registrar los gráficos ya guardados aunque el resto se haya cancelado
+        if pendientes:
+            cache_graficos.guardar_manifiesto(GRAFICOS[pendientes[0]], manifiesto)
+
+    archivos = [GRAFICOS[nombre] for nombre in graficos]
+    if mostrar_progreso:
+        print("\n" + "=" * 60)
+        print("✅ TODOS LOS GRÁFICOS GENERADOS EXITOSAMENTE")
+        print("=" * 60)
+        print("\nArchivos generados:")
+        for archivo in archivos:
+            print(f"  📊 {archivo}")
+        print("\n")
+    return archivos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera los gráficos de ventas y proyecciones de Tienda Aurelion")
+    parser.add_argument('--charts', nargs='+', choices=list(GRAFICOS), default=list(GRAFICOS),
+                        help="Gráficos a generar (por defecto, todos)")
+    parser.add_argument('--procesos', type=int, default=None,
+                        help="Procesos para rasterizar (por defecto, uno por gráfico hasta el número de CPU)")
+    parser.add_argument('--forzar', action='store_true',
+                        help="Volver a dibujar aunque el gráfico no haya cambiado")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("ANÁLISIS DE VENTAS Y PROYECCIONES - TIENDA AURELION")
+    print("=" * 60)
+    print("\n✓ Librerías importadas correctamente\n")
+
+    # ============================================================
+    # CELDA 1: Cargar datos
+    # ============================================================
+    print("📊 Cargando datos...")
+    productos, clientes, ventas = cargar_tablas()
+    generar_graficos(productos, clientes, ventas, graficos=args.charts, procesos=args.procesos, forzar=args.forzar)
+
+
+if __name__ == "__main__":
+    main()
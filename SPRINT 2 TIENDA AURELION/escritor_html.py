@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ESCRITOR DE HTML POR SECCIONES
+Escritura en streaming de la presentación del proyecto Tienda Aurelion
+
+Cada sección de HTML se escribe en el archivo en cuanto se genera, en lugar
+de armar todo el documento en memoria. Las imágenes se marcan dentro del
+texto con imagen() y se vuelcan en su lugar al escribir la sección:
+
+- modo 'incrustadas': data URI base64 copiada por bloques desde la caché
+  de gráficos (la imagen nunca está completa en memoria);
+- modo 'enlazadas': la imagen se referencia desde una carpeta junto al
+  HTML, así el HTML solo contiene texto. Si antes se llamó a
+  preparar_imagenes(), se usan las variantes optimizadas (recursos_graficos)
+  con <picture>/srcset y carga diferida; si no, se copia el PNG original.
+
+El documento se escribe en un archivo temporal que reemplaza al anterior
+solo cuando se completó sin errores.
+"""
+
+import os
+import re
+import shutil
+
+from cache_graficos import escribir_data_uri
+from recursos_graficos import TAMANOS, optimizar_graficos
+
+MODOS_IMAGENES = ('incrustadas', 'enlazadas')
+
+# Marca de posición de una imagen dentro del texto de una sección
+_MARCA = re.compile('\x00img(\\d+)\x00')
+
+NO_DISPONIBLE = "<p style='color: red;'>Gráfico no disponible</p>"
+
+
+class EscritorHTML:
+    """Archivo HTML que se escribe sección por sección"""
+
+    def __init__(self, ruta, modo_imagenes='incrustadas', carpeta_recursos=None):
+        if modo_imagenes not in MODOS_IMAGENES:
+            raise ValueError(f"Modo de imágenes desconocido: {modo_imagenes} (opciones: {', '.join(MODOS_IMAGENES)})")
+        self.ruta = ruta
+        self.modo_imagenes = modo_imagenes
+        self.carpeta_recursos = carpeta_recursos or os.path.splitext(ruta)[0] + '_archivos'
+        self._imagenes = []
+        self._archivo = None
+        self.variantes = {}
+
+    def __enter__(self):
+        self._archivo = open(self.ruta + '.tmp', 'w', encoding='utf-8')
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self._archivo.close()
+        if tipo is None:
+            os.replace(self.ruta + '.tmp', self.ruta)
+        else:
+            os.remove(self.ruta + '.tmp')
+        return False
+
+    def preparar_imagenes(self, archivos, procesos=None):
+        """Generar en paralelo las variantes optimizadas de las imágenes a enlazar"""
+        if self.modo_imagenes == 'enlazadas':
+            self.variantes = optimizar_graficos(archivos, self.carpeta_recursos, procesos=procesos)
+        return self.variantes
+
+    def imagen(self, archivo, alt):
+        """Marca de posición de una imagen; escribir() la reemplaza por el <img>"""
+        self._imagenes.append((archivo, alt))
+        return f"\x00img{len(self._imagenes) - 1}\x00"
+
+    def escribir(self, texto):
+        """Escribir una sección, volcando las imágenes marcadas en su lugar"""
+        for i, parte in enumerate(_MARCA.split(texto)):
+            if i % 2 == 0:
+                self._archivo.write(parte)
+            else:
+                self._escribir_imagen(*self._imagenes[int(parte)])
+
+    def _escribir_imagen(self, archivo, alt):
+        if not os.path.exists(archivo):
+            self._archivo.write(NO_DISPONIBLE)
+            return
+        if archivo in self.variantes:
+            self._archivo.write(self._imagen_responsiva(self.variantes[archivo], alt))
+            return
+        self._archivo.write("<img src='")
+        if self.modo_imagenes == 'enlazadas':
+            self._archivo.write(self._enlazar(archivo))
+        else:
+            escribir_data_uri(archivo, self._archivo)
+        self._archivo.write(f"' alt='{alt}'>")
+
+    def _relativa(self, ruta):
+        relativa = os.path.relpath(ruta, os.path.dirname(os.path.abspath(self.ruta)))
+        return relativa.replace(os.sep, '/')
+
+    def _imagen_responsiva(self, variantes, alt):
+        """<picture> con un srcset por formato; el navegador elige formato y ancho"""
+        por_formato = {}
+        for variante in variantes:
+            por_formato.setdefault(variante['formato'], []).append(variante)
+        srcset = {formato: ', '.join(f"{self._relativa(v['ruta'])} {v['ancho']}w" for v in lista)
+                  for formato, lista in por_formato.items()}
+        # La variante PNG más ancha es la de respaldo (y da las proporciones)
+        respaldo = por_formato['png'][-1]
+        fuentes = ''.join(f"<source type='image/{formato}' srcset='{srcset[formato]}' sizes='{TAMANOS}'>"
+                          for formato in por_formato if formato != 'png')
+        return (f"<picture>{fuentes}<img src='{self._relativa(respaldo['ruta'])}' srcset='{srcset['png']}' "
+                f"sizes='{TAMANOS}' width='{respaldo['ancho']}' height='{respaldo['alto']}' loading='lazy' decoding='async' "
+                f"alt='{alt}'></picture>")
+
+    def _enlazar(self, archivo):
+        """Copiar la imagen a la carpeta de recursos (si cambió) y devolver su ruta relativa"""
+        os.makedirs(self.carpeta_recursos, exist_ok=True)
+        destino = os.path.join(self.carpeta_recursos, os.path.basename(archivo))
+        origen = os.stat(archivo)
+        if not os.path.exists(destino) or (os.stat(destino).st_size, os.stat(destino).st_mtime_ns) != \
+                (origen.st_size, origen.st_mtime_ns):
+            shutil.copy2(archivo, destino)
+        return self._relativa(destino)
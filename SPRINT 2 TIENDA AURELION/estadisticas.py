@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SERVICIO DE ESTADÍSTICAS
+Resultados del análisis estadístico calculados una vez y reutilizados
+Proyecto Tienda Aurelion - Demo 2
+
+Las estadísticas descriptivas de ventas, las de precios de productos, el
+resumen por categoría y los outliers por IQR se calculan juntos en una sola
+pasada al cargar los datos y quedan en memoria. Se vuelven a calcular solo
+si cambia el contenido de las columnas que usan (la firma es un hash
+vectorizado de esas columnas, como la del cubo de ventas, así también se
+detecta una venta editada en el lugar) o si se llama a invalidar().
+
+Los cuantiles de cada columna (mínimo, cuartiles y máximo) salen de una
+única selección con np.partition, en O(n), en lugar de ordenar la columna
+para cada cuantil.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache_graficos import huella
+from cubo_ventas import COLUMNAS_VENTAS as COLUMNAS_CUBO, obtener_cubo
+
+COLUMNAS_VENTAS = ['cantidad', 'precio_unitario', 'importe']
+CUANTILES = (0.25, 0.5, 0.75)
+# Factor del rango intercuartílico para considerar outlier una venta
+FACTOR_IQR = 1.5
+
+# Columnas de las que dependen los resultados (firma de la caché)
+COLUMNAS_PRODUCTOS = ['id_producto', 'categoria', 'precio_unitario']
+COLUMNAS_FIRMA = list(dict.fromkeys(COLUMNAS_VENTAS + COLUMNAS_CUBO))
+
+
+def cuantiles(valores, probabilidades=CUANTILES):
+    """Mínimo, máximo y cuantiles de un arreglo (sin faltantes) con una sola selección
+
+    Usa la interpolación lineal de pandas/numpy: np.partition ubica a la
+    vez los dos vecinos de cada cuantil y los extremos, sin ordenar todo.
+    """
+    n = len(valores)
+    posiciones = np.asarray(probabilidades, dtype=np.float64) * (n - 1)
+    bajo = np.floor(posiciones).astype(np.intp)
+    alto = np.minimum(bajo + 1, n - 1)
+    parcial = np.partition(valores, np.unique(np.concatenate([[0, n - 1], bajo, alto])))
+    a, b, t = parcial[bajo], parcial[alto], posiciones - bajo
+    # Misma fórmula que numpy (_lerp) para obtener exactamente los mismos valores
+    diferencia = b - a
+    valores_cuantiles = np.where(t >= 0.5, b - diferencia * (1 - t), a + diferencia * t)
+    return parcial[0], parcial[n - 1], valores_cuantiles
+
+
+def describir(tabla, columnas=COLUMNAS_VENTAS):
+    """Equivalente a tabla[columnas].describe(), con los cuantiles por selección"""
+    filas = {}
+    for columna in columnas:
+        valores = tabla[columna].to_numpy(dtype=np.float64, na_value=np.nan)
+        valores = valores[~np.isnan(valores)]
+        if len(valores) == 0:
+            filas[columna] = [0.0] + [np.nan] * (4 + len(CUANTILES))
+            continue
+        minimo, maximo, valores_cuantiles = cuantiles(valores)
+        desvio = valores.std(ddof=1) if len(valores) > 1 else np.nan
+        filas[columna] = [len(valores), valores.mean(), desvio, minimo, *valores_cuantiles, maximo]
+    indice = ['count', 'mean', 'std', 'min'] + [f"{p:.0%}" for p in CUANTILES] + ['max']
+    return pd.DataFrame(filas, index=indice, dtype=np.float64)
+
+
+def calcular_estadisticas(productos, ventas, progreso=None):
+    """Todos los resultados del análisis estadístico en un dict
+
+    Claves: descriptivas (DataFrame como describe()), precios (promedio,
+    minimo, maximo), categorias (Total, Promedio y Cantidad_Ventas por
+    categoría, de mayor a menor total), outliers y ventas (cantidad de
+    líneas).
+    """
+    avanzar = progreso or (lambda hechos, total, mensaje='': None)
+    descriptivas = describir(ventas)
+    avanzar(1, 4, 'estadísticas descriptivas')
+
+    precio = productos['precio_unitario']
+    precios = {'promedio': precio.mean(), 'minimo': precio.min(), 'maximo': precio.max()}
+    avanzar(2, 4, 'productos')
+
+    cubo = obtener_cubo(productos, ventas)
+    total, cantidad = cubo.totales('categoria'), cubo.totales('categoria', medida='lineas')
+    categorias = pd.DataFrame({'Total': total, 'Promedio': total / cantidad, 'Cantidad_Ventas': cantidad})
+    avanzar(3, 4, 'categorías')
+
+    # Outliers por IQR, con los cuartiles de importe ya calculados
+    q1, q3 = descriptivas.at['25%', 'importe'], descriptivas.at['75%', 'importe']
+    iqr = q3 - q1
+    importe = ventas['importe'].to_numpy()
+    outliers = int(np.count_nonzero((importe < q1 - FACTOR_IQR * iqr) | (importe > q3 + FACTOR_IQR * iqr)))
+    avanzar(4, 4, 'outliers')
+
+    return {'descriptivas': descriptivas, 'precios': precios,
+            'categorias': categorias.sort_values('Total', ascending=False),
+            'outliers': outliers, 'ventas': len(ventas)}
+
+
+def firma_datos(productos, ventas):
+    """Huella del contenido de las columnas que usa calcular_estadisticas"""
+    return huella(productos[COLUMNAS_PRODUCTOS], ventas[COLUMNAS_FIRMA])
+
+
+class ServicioEstadisticas:
+    """Caché en memoria de calcular_estadisticas, invalidada al cambiar los datos"""
+
+    def __init__(self):
+        self.version = 0
+        self._firma = None
+        self._resultados = None
+        # El menú puede pedir las estadísticas desde el hilo de trabajo y desde el principal
+        self._bloqueo = threading.Lock()
+
+    def obtener(self, productos, ventas, progreso=None):
+        """Resultados para estas tablas: de la caché si no cambiaron, si no se recalculan"""
+        firma = (firma_datos(productos, ventas), self.version)
+        with self._bloqueo:
+            if firma != self._firma:
+                self._resultados = calcular_estadisticas(productos, ventas, progreso)
+                self._firma = firma
+            return self._resultados
+
+    def invalidar(self):
+        """Forzar el recálculo en el próximo pedido"""
+        with self._bloqueo:
+            self.version += 1
+            self._firma = self._resultados = None
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ESTADÍSTICAS DESCRIPTIVAS EN STREAMING
+Media, varianza, mediana y moda de detalle de ventas en una sola pasada
+Proyecto Tienda Aurelion - Demo 2
+
+Los scripts de la raíz (calculo_de_media_promed.py, valor_central.py,
+moda_valor_precio.py, media_percio.py) calculan cada estadística de cada
+columna sobre el DataFrame completo en memoria. Este módulo lee el archivo
+por bloques y actualiza, para todas las columnas a la vez, resúmenes de
+tamaño acotado que no dependen de la cantidad de filas:
+
+- cantidad, media y varianza: Welford (combinando cada bloque con la
+  fórmula de Chan, que es numéricamente estable);
+- mediana: sketch KLL de cuantiles (error de rango ~1/k);
+- moda: contador Misra-Gries de valores frecuentes (k contadores).
+
+Mientras la columna tenga a lo sumo k valores distintos, el contador
+Misra-Gries es exacto y de él salen la moda y la mediana exactas (como las
+de pandas); si no, la mediana es la aproximada del sketch y la moda la del
+valor con el mayor contador. Los resúmenes se pueden combinar, por ejemplo
+para procesar particiones en paralelo.
+
+Uso:
+    python estadisticas_streaming.py detalle_ventas_demo2.csv --bloque 1000000
+"""
+
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS = ['precio_unitario', 'cantidad', 'importe']
+NOMBRES = {'precio_unitario': 'Precio Unitario', 'cantidad': 'Cantidad', 'importe': 'Importe'}
+
+BLOQUE = 1_000_000
+K_CUANTILES = 200
+K_FRECUENTES = 1024
+
+
+class MomentosWelford:
+    """Cantidad, media, varianza, mínimo y máximo acumulados por bloques"""
+
+    def __init__(self):
+        self.cantidad = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def _combinar(self, cantidad, media, m2, minimo, maximo):
+        """Fórmula de Chan para unir dos resúmenes (n, media, M2)"""
+        total = self.cantidad + cantidad
+        delta = media - self.media
+        self.media += delta * cantidad / total
+        self.m2 += m2 + delta * delta * self.cantidad * cantidad / total
+        self.cantidad = total
+        self.minimo = min(self.minimo, minimo)
+        self.maximo = max(self.maximo, maximo)
+
+    def agregar(self, valores):
+        if len(valores):
+            media = valores.mean()
+            self._combinar(len(valores), media, np.square(valores - media).sum(), valores.min(), valores.max())
+        return self
+
+    def combinar(self, otro):
+        if otro.cantidad:
+            self._combinar(otro.cantidad, otro.media, otro.m2, otro.minimo, otro.maximo)
+        return self
+
+    @property
+    def varianza(self):
+        """Varianza muestral (ddof=1, como pandas)"""
+        return self.m2 / (self.cantidad - 1) if self.cantidad > 1 else math.nan
+
+
+class SketchKLL:
+    """Sketch KLL de cuantiles: niveles de compactadores con pesos 2^nivel
+
+    Cada compactación ordena un nivel y promueve uno de cada dos elementos
+    (empezando al azar en el primero o el segundo) al nivel siguiente. Las
+    capacidades decrecen geométricamente hacia los niveles bajos, así el
+    tamaño total queda en O(k) y el error de rango en O(1/k).
+    """
+
+    def __init__(self, k=K_CUANTILES, semilla=0):
+        self.k = k
+        self.niveles = [np.empty(0)]
+        self.exacto = True
+        self._rng = np.random.default_rng(semilla)
+
+    def _capacidad(self, nivel):
+        return max(2, math.ceil(self.k * (2 / 3) ** (len(self.niveles) - 1 - nivel)))
+
+    def _compactar(self):
+        while True:
+            nivel = next((h for h, elementos in enumerate(self.niveles)
+                          if len(elementos) >= self._capacidad(h)), None)
+            if nivel is None:
+                return
+            elementos = np.sort(self.niveles[nivel])
+            # Con cantidad impar un elemento queda en el nivel
+            impar = len(elementos) % 2
+            self.niveles[nivel] = elementos[:impar]
+            promovidos = elementos[impar + self._rng.integers(2)::2]
+            if nivel + 1 == len(self.niveles):
+                self.niveles.append(promovidos)
+            else:
+                self.niveles[nivel + 1] = np.concatenate([self.niveles[nivel + 1], promovidos])
+            self.exacto = False
+
+    def agregar(self, valores):
+        self.niveles[0] = np.concatenate([self.niveles[0], valores])
+        self._compactar()
+        return self
+
+    def combinar(self, otro):
+        for nivel, elementos in enumerate(otro.niveles):
+            if nivel == len(self.niveles):
+                self.niveles.append(np.empty(0))
+            self.niveles[nivel] = np.concatenate([self.niveles[nivel], elementos])
+        self.exacto = self.exacto and otro.exacto
+        self._compactar()
+        return self
+
+    def cuantil(self, q):
+        """Cuantil q (0..1); exacto (interpolación lineal) si nunca se compactó"""
+        if self.exacto:
+            return float(np.quantile(self.niveles[0], q)) if len(self.niveles[0]) else math.nan
+        elementos = np.concatenate(self.niveles)
+        pesos = np.concatenate([np.full(len(e), 2.0 ** h) for h, e in enumerate(self.niveles)])
+        orden = np.argsort(elementos, kind='stable')
+        acumulado = np.cumsum(pesos[orden])
+        return float(elementos[orden][np.searchsorted(acumulado, q * acumulado[-1])])
+
+
+class ContadorMisraGries:
+    """Valores frecuentes con a lo sumo k contadores (Misra-Gries combinable)
+
+    Cuando hay más de k valores distintos se resta a todos los contadores el
+    (k+1)-ésimo mayor y se descartan los que no quedan positivos. Cada
+    contador subestima la frecuencia real en a lo sumo descontado ≤ N/(k+1);
+    si nunca se descontó, las frecuencias son exactas.
+    """
+
+    def __init__(self, k=K_FRECUENTES):
+        self.k = k
+        self.valores = np.empty(0)
+        self.conteos = np.empty(0, dtype=np.int64)
+        self.descontado = 0
+
+    @property
+    def exacto(self):
+        return self.descontado == 0
+
+    def _combinar(self, valores, conteos):
+        if len(self.valores):
+            valores, conteos = np.concatenate([self.valores, valores]), np.concatenate([self.conteos, conteos])
+        valores, inversa = np.unique(valores, return_inverse=True)
+        conteos = np.bincount(inversa, weights=conteos).astype(np.int64)
+        if len(valores) > self.k:
+            umbral = np.partition(conteos, len(conteos) - self.k - 1)[len(conteos) - self.k - 1]
+            conteos = conteos - umbral
+            valores, conteos = valores[conteos > 0], conteos[conteos > 0]
+            self.descontado += int(umbral)
+        self.valores, self.conteos = valores, conteos
+
+    def agregar(self, valores):
+        if len(valores):
+            self._combinar(*np.unique(valores, return_counts=True))
+        return self
+
+    def combinar(self, otro):
+        self._combinar(otro.valores, otro.conteos)
+        self.descontado += otro.descontado
+        return self
+
+    def moda(self):
+        """Valores con el mayor contador, ordenados (como Series.mode())
+
+        Vacía si no hay datos o si el descuento eliminó todos los contadores
+        (ningún valor supera la frecuencia N/(k+1)).
+        """
+        if not len(self.conteos):
+            return []
+        return self.valores[self.conteos == self.conteos.max()].tolist()
+
+    def cuantil(self, q):
+        """Cuantil exacto con interpolación lineal a partir de las frecuencias (solo si exacto)"""
+        acumulado = np.cumsum(self.conteos)
+        posicion = q * (acumulado[-1] - 1)
+        bajo, alto = np.searchsorted(acumulado, [math.floor(posicion), math.ceil(posicion)], side='right')
+        a, b = self.valores[bajo], self.valores[alto]
+        return float(a + (b - a) * (posicion - math.floor(posicion)))
+
+
+class EstadisticasStreaming:
+    """Resúmenes en streaming de varias columnas numéricas"""
+
+    def __init__(self, columnas=COLUMNAS, k_cuantiles=K_CUANTILES, k_frecuentes=K_FRECUENTES, semilla=0):
+        self.columnas = list(columnas)
+        self.filas = 0
+        self.momentos = {col: MomentosWelford() for col in self.columnas}
+        self.cuantiles = {col: SketchKLL(k_cuantiles, semilla + i) for i, col in enumerate(self.columnas)}
+        self.frecuentes = {col: ContadorMisraGries(k_frecuentes) for col in self.columnas}
+
+    def agregar(self, bloque):
+        """Actualizar todos los resúmenes con un bloque (DataFrame) de filas"""
+        self.filas += len(bloque)
+        for col in self.columnas:
+            # Sin convertir a float: las modas de columnas enteras quedan enteras
+            valores = bloque[col].dropna().to_numpy()
+            self.momentos[col].agregar(valores)
+            self.cuantiles[col].agregar(valores)
+            self.frecuentes[col].agregar(valores)
+        return self
+
+    def combinar(self, otro):
+        """Unir los resúmenes de otra partición de los datos"""
+        self.filas += otro.filas
+        for col in self.columnas:
+            self.momentos[col].combinar(otro.momentos[col])
+            self.cuantiles[col].combinar(otro.cuantiles[col])
+            self.frecuentes[col].combinar(otro.frecuentes[col])
+        return self
+
+    def mediana(self, col):
+        frecuentes = self.frecuentes[col]
+        if frecuentes.exacto and len(frecuentes.conteos):
+            return frecuentes.cuantil(0.5)
+        return self.cuantiles[col].cuantil(0.5)
+
+    def resumen(self):
+        """DataFrame con una columna por variable: count, mean, var, std, min, 50%, max"""
+        filas = {}
+        for col in self.columnas:
+            momentos = self.momentos[col]
+            vacio = momentos.cantidad == 0
+            filas[col] = [momentos.cantidad, momentos.media if not vacio else math.nan, momentos.varianza,
+                          math.sqrt(momentos.varianza) if momentos.cantidad > 1 else math.nan,
+                          momentos.minimo if not vacio else math.nan, self.mediana(col),
+                          momentos.maximo if not vacio else math.nan]
+        return pd.DataFrame(filas, index=['count', 'mean', 'var', 'std', 'min', '50%', 'max'], dtype=np.float64)
+
+    def modas(self):
+        """{columna: lista de valores más frecuentes}"""
+        return {col: self.frecuentes[col].moda() for col in self.columnas}
+
+    def exactas(self):
+        """{columna: (mediana exacta, moda exacta)}"""
+        return {col: (self.frecuentes[col].exacto or self.cuantiles[col].exacto, self.frecuentes[col].exacto)
+                for col in self.columnas}
+
+
+def calcular_en_streaming(ruta, columnas=COLUMNAS, bloque=BLOQUE, **opciones):
+    """Leer el CSV por bloques de filas y devolver sus EstadisticasStreaming"""
+    estadisticas = EstadisticasStreaming(columnas, **opciones)
+    for parte in pd.read_csv(ruta, usecols=columnas, chunksize=bloque):
+        estadisticas.agregar(parte)
+    return estadisticas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Media, mediana y moda de detalle de ventas en una sola pasada")
+    parser.add_argument('ruta', nargs='?', default='detalle_ventas_demo2.csv')
+    parser.add_argument('--bloque', type=int, default=BLOQUE, help="Filas leídas por bloque")
+    parser.add_argument('--k-cuantiles', type=int, default=K_CUANTILES, help="Tamaño del sketch KLL")
+    parser.add_argument('--k-frecuentes', type=int, default=K_FRECUENTES, help="Contadores Misra-Gries")
+    args = parser.parse_args(argv)
+
+    estadisticas = calcular_en_streaming(args.ruta, bloque=args.bloque, k_cuantiles=args.k_cuantiles,
+                                         k_frecuentes=args.k_frecuentes)
+    resumen, modas, exactas = estadisticas.resumen(), estadisticas.modas(), estadisticas.exactas()
+
+    print(f"📊 {estadisticas.filas:,} filas leídas de {args.ruta}")
+    print("\nMedia (Promedio):")
+    for col in estadisticas.columnas:
+        print(f"- {NOMBRES.get(col, col)}: {resumen.at['mean', col]} (desvío: {resumen.at['std', col]:.4f})")
+    print("\nMediana (Valor Central):")
+    for col in estadisticas.columnas:
+        print(f"- {NOMBRES.get(col, col)}: {resumen.at['50%', col]}{'' if exactas[col][0] else ' (aprox.)'}")
+    print("\nModa (Valor Más Frecuente):")
+    for col in estadisticas.columnas:
+        if modas[col] or exactas[col][1]:
+            print(f"- {NOMBRES.get(col, col)}: {modas[col]}{'' if exactas[col][1] else ' (aprox.)'}")
+        else:
+            print(f"- {NOMBRES.get(col, col)}: sin moda dominante (aprox.)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,50 +3,33 @@
 """
 GENERADOR DE PRESENTACIÓN DEL PROYECTO AURELION
 Crea una presentación HTML interactiva con toda la información y gráficos del proyecto
+
+El HTML se escribe sección por sección (escritor_html): las imágenes se
+incrustan en base64 por bloques o, con --imagenes enlazadas, se enlazan
+desde una carpeta junto a la presentación en versiones optimizadas WebP/PNG
+de varios anchos (recursos_graficos), con srcset y carga diferida. Al
+terminar se informa el tamaño de la presentación frente al presupuesto.
 """
 
+import argparse
 import pandas as pd
 import numpy as np
-import os
 from datetime import datetime
-import base64
+
+from categorizacion import categorizar_productos
+from cubo_ventas import obtener_cubo
+from datos import cargar_tablas
+from escritor_html import EscritorHTML, MODOS_IMAGENES
+from pronosticos import tabla_pronosticos
+from recursos_graficos import PRESUPUESTO_KB, imprimir_informe, informe_tamano
 
 def cargar_datos():
     """Carga los datos desde los archivos CSV"""
     try:
-        productos = pd.read_csv('productos_demo2.csv')
-        clientes = pd.read_csv('clientes_demo2.csv')
-        ventas = pd.read_csv('detalle_ventas_demo2.csv')
-        
-        # Función para categorizar productos
-        def categorizar_producto(nombre):
-            nombre_lower = nombre.lower()
-            if any(palabra in nombre_lower for palabra in ['cerveza', 'fernet', 'gin', 'ron', 'vodka', 'whisky', 'vino', 'sidra', 'licor']):
-                return 'Bebidas con Alcohol'
-            if any(palabra in nombre_lower for palabra in ['coca cola', 'pepsi', 'sprite', 'fanta', 'agua mineral', 'jugo', 'energética', 'yerba mate', 'café', 'té']):
-                return 'Bebidas sin Alcohol'
-            if any(palabra in nombre_lower for palabra in ['leche', 'yogur', 'queso', 'manteca']):
-                return 'Lácteos y Derivados'
-            if any(palabra in nombre_lower for palabra in ['congelado', 'hamburguesa', 'empanada', 'pizza', 'precocido']):
-                return 'Congelados y Precocinados'
-            if any(palabra in nombre_lower for palabra in ['pan lactal', 'medialuna', 'bizcocho', 'galletita']):
-                return 'Panadería y Repostería'
-            if any(palabra in nombre_lower for palabra in ['mermelada', 'dulce de leche', 'miel']):
-                return 'Untables, Mermeladas y Dulces'
-            if any(palabra in nombre_lower for palabra in ['papas fritas', 'maní', 'mix de frutos secos', 'chocolate', 'barrita', 'caramelo', 'chicle', 'chupetín', 'alfajor', 'turrón']):
-                return 'Golosinas, Snacks y Panificados'
-            if any(palabra in nombre_lower for palabra in ['detergente', 'lavandina', 'desengrasante', 'limpiavidrios', 'suavizante', 'esponja', 'trapo', 'servilleta', 'papel higiénico']):
-                return 'Limpieza del Hogar'
-            if any(palabra in nombre_lower for palabra in ['shampoo', 'jabón', 'crema dental', 'cepillo', 'hilo dental', 'desodorante', 'toallas húmedas', 'mascarilla']):
-                return 'Higiene Personal'
-            if any(palabra in nombre_lower for palabra in ['arroz', 'fideo', 'lenteja', 'garbanzo', 'poroto', 'harina', 'azúcar', 'sal', 'aceite', 'vinagre', 'salsa de tomate', 'caldo', 'sopa instantánea', 'avena', 'granola', 'aceituna', 'stevia']):
-                return 'Almacén y Despensa'
-            if any(palabra in nombre_lower for palabra in ['helado']):
-                return 'Otros Alimentos'
-            return 'Otros Alimentos'
+        productos, clientes, ventas = cargar_tablas()
         
         if 'categoria' not in productos.columns or productos['categoria'].isna().any():
-            productos['categoria'] = productos['nombre_producto'].apply(categorizar_producto)
+            productos['categoria'] = categorizar_productos(productos['nombre_producto'])
         
         np.random.seed(42)
         if 'client_id' not in ventas.columns:
@@ -59,21 +42,9 @@ def cargar_datos():
         print(f"Error al cargar datos: {e}")
         return None, None, None
 
-def imagen_a_base64(ruta_imagen):
-    """Convierte una imagen a base64 para incrustarla en HTML"""
-    try:
-        with open(ruta_imagen, 'rb') as img_file:
-            img_data = img_file.read()
-            img_base64 = base64.b64encode(img_data).decode('utf-8')
-            ext = os.path.splitext(ruta_imagen)[1][1:].lower()
-            return f"data:image/{ext};base64,{img_base64}"
-    except:
-        return None
-
 def obtener_estadisticas(productos, clientes, ventas):
     """Obtiene estadísticas del proyecto"""
-    ventas_con_cat = ventas.merge(productos[['id_producto', 'categoria']], on='id_producto', how='left')
-    ventas_por_categoria = ventas_con_cat.groupby('categoria')['importe'].sum().sort_values(ascending=False)
+    ventas_por_categoria = obtener_cubo(productos, ventas).totales('categoria').sort_values(ascending=False)
     
     stats = {
         'total_productos': len(productos),
@@ -90,19 +61,45 @@ def obtener_estadisticas(productos, clientes, ventas):
     }
     return stats, ventas_por_categoria
 
-def generar_html_presentacion():
-    """Genera la presentación HTML completa"""
-    print("📊 Cargando datos...")
-    productos, clientes, ventas = cargar_datos()
+def obtener_pronosticos(productos, ventas, horizonte=3):
+    """Pronóstico mensual de ventas de cada categoría (una fila por categoría)
+
+    Sale de la misma tabla de pronósticos que genera pronosticos.py.
+    """
+    tabla = tabla_pronosticos(productos, ventas, horizonte=horizonte)
+    tabla = tabla[tabla['nivel'] == 'categoria']
+    pronosticos = tabla.pivot(index='serie', columns='mes', values='pronostico')
+    return pronosticos.sort_values(pronosticos.columns[0], ascending=False), tabla['modelo'].iloc[0]
+
+def generar_html_presentacion(productos=None, clientes=None, ventas=None,
+                              nombre_archivo='presentacion_aurelion.html', mostrar_progreso=True,
+                              modo_imagenes='incrustadas', presupuesto_kb=PRESUPUESTO_KB, progreso=None):
+    """Genera la presentación HTML completa
+
+    Si no se reciben las tablas (por ejemplo, las que ya tiene cargadas el
+    menú), se cargan desde los CSV. modo_imagenes es 'incrustadas' (base64
+    dentro del HTML) o 'enlazadas' (versiones optimizadas en una carpeta
+    junto al HTML).
+
+    progreso(hechos, total, mensaje), si se indica, se llama al terminar
+    cada etapa; si lanza una excepción (tarea cancelada) la presentación
+    anterior queda intacta.
+    """
+    avanzar = progreso or (lambda hechos, total, mensaje='': None)
+    if productos is None:
+        if mostrar_progreso:
+            print("📊 Cargando datos...")
+        productos, clientes, ventas = cargar_datos()
     
     if productos is None:
         print("Error: No se pudieron cargar los datos")
         return
     
-    print("📈 Calculando estadísticas...")
+    if mostrar_progreso:
+        print("📈 Calculando estadísticas...")
     stats, ventas_por_categoria = obtener_estadisticas(productos, clientes, ventas)
+    avanzar(1, 5, 'estadísticas')
     
-    print("🖼️  Cargando gráficos...")
     graficos = {
         'grafico1': 'grafico1_ventas_por_cliente.png',
         'grafico2': 'grafico2_ventas_vs_crecimiento.png',
@@ -110,13 +107,6 @@ def generar_html_presentacion():
         'grafico4': 'grafico4_heatmap_ventas_mes_categoria.png'
     }
     
-    graficos_base64 = {}
-    for nombre, archivo in graficos.items():
-        if os.path.exists(archivo):
-            graficos_base64[nombre] = imagen_a_base64(archivo)
-        else:
-            graficos_base64[nombre] = None
-    
     # Generar tabla de categorías
     tabla_categorias = ""
     for i, (categoria, total) in enumerate(ventas_por_categoria.items(), 1):
@@ -130,9 +120,32 @@ def generar_html_presentacion():
         </tr>
         """
     
+    # Generar tabla de proyecciones por categoría
+    pronosticos, modelo = obtener_pronosticos(productos, ventas)
+    avanzar(2, 5, 'proyecciones')
+    encabezado_pronosticos = "".join(f"<th>{mes}</th>" for mes in pronosticos.columns)
+    tabla_pronosticos = ""
+    for categoria, fila in pronosticos.iterrows():
+        celdas = "".join(f"<td>${valor:,.2f}</td>" for valor in fila)
+        tabla_pronosticos += f"""
+        <tr>
+            <td>{categoria}</td>
+            {celdas}
+        </tr>
+        """
+    
     fecha_actual = datetime.now().strftime("%d/%m/%Y %H:%M")
     
-    html = f"""
+    if mostrar_progreso:
+        print("📝 Escribiendo presentación...")
+    with EscritorHTML(nombre_archivo, modo_imagenes) as html:
+        if modo_imagenes == 'enlazadas':
+            if mostrar_progreso:
+                print("🖼️  Optimizando gráficos...")
+            html.preparar_imagenes(graficos.values())
+
+        # Encabezado y estilos
+        html.escribir(f"""
 <!DOCTYPE html>
 <html lang="es">
 <head>
@@ -318,7 +331,9 @@ def generar_html_presentacion():
         }}
     </style>
 </head>
-<body>
+""")
+        # Diapositivas de datos
+        html.escribir(f"""<body>
     <div class="container">
         <!-- Slide 1: Portada -->
         <div class="slide">
@@ -411,12 +426,35 @@ def generar_html_presentacion():
             </div>
         </div>
         
-        <!-- Slide 5: Gráfico 1 - Ventas por Cliente -->
+        <!-- Slide 5: Proyecciones por Categoría -->
+        <div class="slide">
+            <h2>🔮 Proyecciones por Categoría</h2>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Categoría</th>
+                        {encabezado_pronosticos}
+                    </tr>
+                </thead>
+                <tbody>
+                    {tabla_pronosticos}
+                </tbody>
+            </table>
+            <div class="info-box" style="margin-top: 20px;">
+                <p>Pronóstico de ventas de los próximos meses para todas las categorías, calculado en un 
+                solo lote (modelo: {modelo}). La tendencia equivale a la medida FORECAST.LINEAR del tablero de Power BI.</p>
+            </div>
+        </div>
+        
+""")
+        avanzar(3, 5, 'diapositivas de datos')
+        # Diapositivas de gráficos (cada imagen se vuelca al archivo por bloques)
+        html.escribir(f"""        <!-- Slide 6: Gráfico 1 - Ventas por Cliente -->
         <div class="slide">
             <h2>📈 Gráfico 1: Ventas por Cliente</h2>
             <div class="grafico-container">
                 <h3>Top 20 Clientes por Ventas Totales</h3>
-                {"<img src='" + graficos_base64['grafico1'] + "' alt='Ventas por Cliente'>" if graficos_base64['grafico1'] else "<p style='color: red;'>Gráfico no disponible</p>"}
+                {html.imagen(graficos['grafico1'], 'Ventas por Cliente')}
             </div>
             <div class="info-box">
                 <p>Este gráfico muestra los 20 clientes con mayores ventas, permitiendo identificar 
@@ -424,12 +462,12 @@ def generar_html_presentacion():
             </div>
         </div>
         
-        <!-- Slide 6: Gráfico 2 - Ventas vs Crecimiento -->
+        <!-- Slide 7: Gráfico 2 - Ventas vs Crecimiento -->
         <div class="slide">
             <h2>📈 Gráfico 2: Ventas vs Crecimiento Proyectado</h2>
             <div class="grafico-container">
                 <h3>Relación entre Ventas Actuales y Crecimiento Futuro</h3>
-                {"<img src='" + graficos_base64['grafico2'] + "' alt='Ventas vs Crecimiento'>" if graficos_base64['grafico2'] else "<p style='color: red;'>Gráfico no disponible</p>"}
+                {html.imagen(graficos['grafico2'], 'Ventas vs Crecimiento')}
             </div>
             <div class="info-box">
                 <p>Visualiza la relación entre el volumen de ventas actual y el potencial de crecimiento futuro, 
@@ -437,12 +475,12 @@ def generar_html_presentacion():
             </div>
         </div>
         
-        <!-- Slide 7: Gráfico 3 - Comparación Tradicional vs IA -->
+        <!-- Slide 8: Gráfico 3 - Comparación Tradicional vs IA -->
         <div class="slide">
             <h2>🤖 Gráfico 3: Sistema Tradicional vs Sistema con IA</h2>
             <div class="grafico-container">
                 <h3>Comparación de Crecimiento Proyectado</h3>
-                {"<img src='" + graficos_base64['grafico3'] + "' alt='Comparación Tradicional vs IA'>" if graficos_base64['grafico3'] else "<p style='color: red;'>Gráfico no disponible</p>"}
+                {html.imagen(graficos['grafico3'], 'Comparación Tradicional vs IA')}
             </div>
             <div class="info-box">
                 <p>Demuestra el crecimiento histórico y proyectado comparando un sistema tradicional de marketing/ventas 
@@ -450,12 +488,12 @@ def generar_html_presentacion():
             </div>
         </div>
         
-        <!-- Slide 8: Gráfico 4 - HeatMap -->
+        <!-- Slide 9: Gráfico 4 - HeatMap -->
         <div class="slide">
             <h2>🔥 Gráfico 4: HeatMap de Ventas por Mes y Categoría</h2>
             <div class="grafico-container">
                 <h3>Análisis Temporal de Ventas por Categoría</h3>
-                {"<img src='" + graficos_base64['grafico4'] + "' alt='HeatMap Ventas'>" if graficos_base64['grafico4'] else "<p style='color: red;'>Gráfico no disponible</p>"}
+                {html.imagen(graficos['grafico4'], 'HeatMap Ventas')}
             </div>
             <div class="info-box">
                 <p>Visualiza las ventas por mes y categoría de producto, permitiendo identificar qué categorías de productos 
@@ -463,7 +501,10 @@ def generar_html_presentacion():
             </div>
         </div>
         
-        <!-- Slide 9: Análisis de Precios -->
+""")
+        avanzar(4, 5, 'gráficos')
+        # Análisis de precios, conclusiones y pie
+        html.escribir(f"""        <!-- Slide 10: Análisis de Precios -->
         <div class="slide">
             <h2>💰 Análisis de Precios</h2>
             <div class="stats-grid">
@@ -482,7 +523,7 @@ def generar_html_presentacion():
             </div>
         </div>
         
-        <!-- Slide 10: Conclusiones -->
+        <!-- Slide 11: Conclusiones -->
         <div class="slide">
             <h2>🎯 Conclusiones y Mejoras Futuras</h2>
             <div class="info-box">
@@ -519,22 +560,29 @@ def generar_html_presentacion():
     </div>
 </body>
 </html>
-    """
+    """)
     
-    # Guardar el archivo HTML
-    nombre_archivo = 'presentacion_aurelion.html'
-    with open(nombre_archivo, 'w', encoding='utf-8') as f:
-        f.write(html)
+    informe = informe_tamano(nombre_archivo, html.variantes, presupuesto_kb)
+    avanzar(5, 5, nombre_archivo)
     
-    print(f"\n✅ Presentación generada exitosamente: {nombre_archivo}")
-    print(f"📂 Abre el archivo en tu navegador para ver la presentación")
+    if mostrar_progreso:
+        print(f"\n✅ Presentación generada exitosamente: {nombre_archivo}")
+        print(f"📂 Abre el archivo en tu navegador para ver la presentación")
+        imprimir_informe(informe)
     return nombre_archivo
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera la presentación HTML del proyecto Aurelion")
+    parser.add_argument('--imagenes', choices=MODOS_IMAGENES, default='incrustadas',
+                        help="Incrustar las imágenes en base64 o enlazarlas (optimizadas) desde una carpeta junto al HTML")
+    parser.add_argument('--presupuesto', type=int, default=PRESUPUESTO_KB,
+                        help="Tamaño máximo esperado de la presentación, en KB")
+    args = parser.parse_args()
+
     print("="*60)
     print("GENERADOR DE PRESENTACIÓN - PROYECTO AURELION")
     print("="*60)
-    archivo = generar_html_presentacion()
+    archivo = generar_html_presentacion(modo_imagenes=args.imagenes, presupuesto_kb=args.presupuesto)
     if archivo:
         print(f"\n💡 Para abrir la presentación, ejecuta:")
         print(f"   - En Linux/Mac: xdg-open {archivo} o open {archivo}")
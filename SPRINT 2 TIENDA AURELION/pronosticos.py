@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PRONÓSTICOS VECTORIZADOS
+Crecimiento, tendencia lineal y proyecciones compuestas sobre arreglos
+Proyecto Tienda Aurelion - Demo 2
+
+Todas las funciones reciben una serie (arreglo 1D, un valor por mes) o
+muchas series apiladas (arreglo 2D: una fila por tienda, producto o
+categoría y una columna por mes) y operan sobre el último eje, sin bucles
+de Python por mes ni por serie.
+
+El motor por lotes (pronosticar_por) apila todas las series de un nivel
+(categorías, provincias, productos), ajusta tendencia lineal y, si hay al
+menos dos años de historia, estacionalidad mensual con una sola resolución
+de mínimos cuadrados para todas las series, y devuelve los pronósticos como
+una tabla larga. La tendencia equivale a la medida FORECAST.LINEAR
+"Proyección Ventas" del tablero de Power BI.
+
+Uso:
+    python pronosticos.py --horizonte 6
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+RUTA_VENTAS_PROVINCIAS = os.path.join(CARPETA, '..', 'POWERBI_ MIO_TIENDA AURELION_SPRINT4', 'Data',
+                                      'ventas_mensuales.csv')
+
+
+def _como_matriz(valores):
+    """Arreglo 2D (series x meses) y si la entrada era una sola serie"""
+    valores = np.asarray(valores)
+    return np.atleast_2d(valores), valores.ndim == 1
+
+
+def _resultado(valores, una_serie):
+    return valores[0] if una_serie else valores
+
+
+def crecimiento_mensual(valores):
+    """Crecimiento mes a mes en % (como pct_change), con 0 en el primer mes"""
+    valores, una_serie = _como_matriz(valores)
+    crecimiento = np.zeros(valores.shape, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crecimiento[:, 1:] = ((valores[:, 1:] - valores[:, :-1]) / valores[:, :-1]) * 100
+    return _resultado(crecimiento, una_serie)
+
+
+def tendencia_lineal(valores):
+    """Pendiente y ordenada de la recta de mínimos cuadrados de cada serie
+
+    Forma cerrada sobre x = 0, 1, ..., n-1:
+        m = (n·Σxy - Σx·Σy) / (n·Σx² - (Σx)²)
+        b = (Σy - m·Σx) / n
+
+    Con menos de dos meses no hay recta: la pendiente es 0 y la ordenada el
+    único valor (pronóstico plano).
+    """
+    valores, una_serie = _como_matriz(valores)
+    n = valores.shape[1]
+    if n < 2:
+        m = np.zeros(valores.shape[0])
+        b = valores.sum(axis=1, dtype=np.float64)
+        return _resultado(m, una_serie), _resultado(b, una_serie)
+    X = np.arange(n)
+    suma_x, suma_x2 = np.sum(X), np.sum(X**2)
+    suma_y, suma_xy = valores.sum(axis=1), valores @ X
+    m = (n * suma_xy - suma_x * suma_y) / (n * suma_x2 - suma_x**2)
+    b = (suma_y - m * suma_x) / n
+    return _resultado(m, una_serie), _resultado(b, una_serie)
+
+
+def proyectar_tendencia(m, b, inicio, horizonte):
+    """Valores de la recta m·x + b para x = inicio, ..., inicio + horizonte - 1"""
+    x = np.arange(inicio, inicio + horizonte)
+    m, b = np.asarray(m), np.asarray(b)
+    return m[..., None] * x + b[..., None]
+
+
+def crecimiento_proyeccion(ultimo_real, proyeccion):
+    """Crecimiento en % de cada mes proyectado respecto del anterior
+
+    El primer mes proyectado se compara con el último valor real. Si la
+    base no es positiva el crecimiento se toma como 0.
+    """
+    proyeccion, una_serie = _como_matriz(proyeccion)
+    ultimo_real = np.asarray(ultimo_real, dtype=np.float64).reshape(-1, 1)
+    base = np.concatenate([ultimo_real, proyeccion[:, :-1]], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crecimiento = np.where(base > 0, ((proyeccion - base) / base) * 100, 0.0)
+    return _resultado(crecimiento, una_serie)
+
+
+def proyectar_compuesto(ultimo_real, tasas):
+    """Proyección con crecimiento compuesto: cada mes = anterior · (1 + tasa)
+
+    tasas puede ser un arreglo por mes (común a todas las series) o una
+    matriz series x meses. Se usa un producto acumulado que arranca en el
+    último valor real, en el mismo orden de multiplicación que el cálculo
+    mes a mes.
+    """
+    tasas = np.asarray(tasas, dtype=np.float64)
+    ultimo_real = np.asarray(ultimo_real, dtype=np.float64)
+    una_serie = ultimo_real.ndim == 0 and tasas.ndim == 1
+    ultimo_real = ultimo_real.reshape(-1, 1)
+    factores = np.broadcast_to(1 + tasas, (len(ultimo_real), tasas.shape[-1]))
+    return _resultado(np.cumprod(np.concatenate([ultimo_real, factores], axis=1), axis=1)[:, 1:], una_serie)
+
+
+def tasas_escalonadas(horizonte, tramos):
+    """Tasas por mes a partir de tramos [(meses, tasa), ...]; la última tasa completa el horizonte"""
+    tasas = np.full(horizonte, tramos[-1][1], dtype=np.float64)
+    inicio = 0
+    for meses, tasa in tramos:
+        tasas[inicio:inicio + meses] = tasa
+        inicio += meses
+    return tasas[:horizonte]
+
+
+# ============================================================
+# Motor por lotes: muchas series a la vez
+# ============================================================
+
+def apilar_series(claves, fechas, valores):
+    """Apilar series mensuales en una matriz series x meses
+
+    Suma los valores por (serie, mes) con un único bincount; los meses sin
+    ventas quedan en 0. Devuelve (etiquetas, meses, matriz).
+    """
+    codigos, etiquetas = pd.factorize(np.asarray(claves), sort=True)
+    ordinales = pd.PeriodIndex(pd.DatetimeIndex(fechas), freq='M').asi8
+    primero = ordinales.min()
+    n_meses = int(ordinales.max() - primero) + 1
+    matriz = np.bincount(codigos * n_meses + (ordinales - primero),
+                         weights=np.asarray(valores, dtype=np.float64),
+                         minlength=len(etiquetas) * n_meses).reshape(len(etiquetas), n_meses)
+    meses = pd.period_range(start=pd.Period(ordinal=primero, freq='M'), periods=n_meses, freq='M')
+    return etiquetas, meses, matriz
+
+
+def ajustar_estacional(Y, mes_inicial=0, periodo=12):
+    """Tendencia lineal + estacionalidad mensual aditiva para todas las series
+
+    Modelo y_t = a + b·t + s[(mes_inicial + t) % periodo], con Σs = 0. La
+    matriz de diseño es la misma para todas las series, así que los
+    coeficientes salen de una sola llamada a lstsq (una columna por serie).
+    Devuelve (a, b, s) con s de forma series x periodo.
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    t = np.arange(Y.shape[1])
+    estacion = (mes_inicial + t) % periodo
+    # Variables indicadoras de cada mes salvo el primero (referencia)
+    indicadoras = (estacion[:, None] == np.arange(1, periodo)).astype(np.float64)
+    X = np.column_stack([np.ones_like(t, dtype=np.float64), t, indicadoras])
+    coef, *_ = np.linalg.lstsq(X, Y.T, rcond=None)
+    a, b = coef[0], coef[1]
+    s = np.column_stack([np.zeros(Y.shape[0]), coef[2:].T])
+    # Centrar la estacionalidad y pasar su media al nivel
+    media = s.mean(axis=1)
+    return a + media, b, s - media[:, None]
+
+
+def pronosticar(Y, horizonte, mes_inicial=0, periodo=12):
+    """Pronóstico de todas las series de Y (series x meses)
+
+    Siempre se calcula la tendencia lineal; con al menos dos ciclos
+    completos de historia se suma la estacionalidad mensual. Las ventas
+    proyectadas no pueden ser negativas: pronóstico y tendencia se recortan
+    en 0. Devuelve (pronostico, tendencia, modelo), ambos de forma series x
+    horizonte.
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    n = Y.shape[1]
+    m, b = tendencia_lineal(Y)
+    tendencia = np.maximum(proyectar_tendencia(m, b, n, horizonte), 0)
+    if n < 2 * periodo:
+        return tendencia, tendencia, 'tendencia'
+
+    a, pendiente, s = ajustar_estacional(Y, mes_inicial, periodo)
+    t = np.arange(n, n + horizonte)
+    pronostico = a[:, None] + pendiente[:, None] * t + s[:, (mes_inicial + t) % periodo]
+    return np.maximum(pronostico, 0), tendencia, 'tendencia+estacionalidad'
+
+
+def pronosticar_por(claves, fechas, valores, nivel, horizonte=6, periodo=12):
+    """Pronosticar todas las series de un nivel y devolverlas como tabla larga
+
+    Columnas: nivel, serie, mes ('AAAA-MM'), paso (1..horizonte),
+    pronostico, tendencia, modelo. Las filas sin clave (por ejemplo, ventas
+    de productos sin categoría) se descartan en lugar de formar una serie
+    'nan'.
+    """
+    claves = np.asarray(claves, dtype=object)
+    presentes = ~pd.isna(claves)
+    if not presentes.all():
+        claves, fechas, valores = claves[presentes], np.asarray(fechas)[presentes], np.asarray(valores)[presentes]
+    etiquetas, meses, Y = apilar_series(claves.astype(str), fechas, valores)
+    pronostico, tendencia, modelo = pronosticar(Y, horizonte, meses[0].month - 1, periodo)
+    futuros = pd.period_range(start=meses[-1] + 1, periods=horizonte, freq='M').astype(str)
+    n_series = len(etiquetas)
+    return pd.DataFrame({
+        'nivel': nivel,
+        'serie': np.repeat(np.asarray(etiquetas, dtype=object), horizonte),
+        'mes': np.tile(np.asarray(futuros), n_series),
+        'paso': np.tile(np.arange(1, horizonte + 1), n_series),
+        'pronostico': pronostico.ravel(),
+        'tendencia': tendencia.ravel(),
+        'modelo': modelo,
+    })
+
+
+def cargar_ventas_provincias(ruta=RUTA_VENTAS_PROVINCIAS):
+    """Ventas mensuales por provincia del tablero de Power BI
+
+    La copia en caché queda en .cache_datos de esta carpeta, con las demás,
+    y no dentro de la carpeta Data del tablero.
+    """
+    from datos import CARPETA_CACHE, leer_csv_cacheado
+    return leer_csv_cacheado(ruta, {'dtype': {'Provincia': 'category'}, 'fechas': ['Fecha']},
+                             carpeta_cache=os.path.join(CARPETA, CARPETA_CACHE))
+
+
+def tabla_pronosticos(productos, ventas, ventas_provincias=None, horizonte=6):
+    """Pronósticos por categoría, por producto y (si hay datos) por provincia
+
+    ventas debe tener las columnas fecha, id_producto, nombre_producto e
+    importe; la categoría de cada venta se toma de productos por
+    id_producto. Es la tabla que consumen el CLI y la presentación.
+    """
+    categorias = productos.set_index('id_producto')['categoria']
+    categoria_venta = categorias.reindex(ventas['id_producto']).to_numpy()
+    tablas = [
+        pronosticar_por(categoria_venta, ventas['fecha'], ventas['importe'], 'categoria', horizonte),
+        pronosticar_por(ventas['nombre_producto'], ventas['fecha'], ventas['importe'], 'producto', horizonte),
+    ]
+    if ventas_provincias is not None:
+        tablas.append(pronosticar_por(ventas_provincias['Provincia'], ventas_provincias['Fecha'],
+                                      ventas_provincias['Ventas'], 'provincia', horizonte))
+    return pd.concat(tablas, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pronósticos por categoría, producto y provincia")
+    parser.add_argument('--horizonte', type=int, default=6, help="Meses a pronosticar")
+    parser.add_argument('--salida', default='pronosticos_aurelion.csv')
+    args = parser.parse_args(argv)
+
+    from datos import cargar_tablas
+    from ejecutar_graficos import preparar_datos
+
+    productos, clientes, ventas = cargar_tablas()
+    productos, ventas = preparar_datos(productos, clientes, ventas)
+    ventas_provincias = cargar_ventas_provincias() if os.path.exists(RUTA_VENTAS_PROVINCIAS) else None
+
+    tabla = tabla_pronosticos(productos, ventas, ventas_provincias, args.horizonte)
+    tabla.to_csv(args.salida, index=False)
+    resumen = tabla.groupby(['nivel', 'modelo']).agg(series=('serie', 'nunique'))
+    print(f"📈 Pronósticos a {args.horizonte} meses guardados en {args.salida}")
+    for (nivel, modelo), fila in resumen.iterrows():
+        print(f"   • {nivel}: {fila['series']} series ({modelo})")
+
+
+if __name__ == "__main__":
+    main()
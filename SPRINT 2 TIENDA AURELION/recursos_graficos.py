@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RECURSOS OPTIMIZADOS PARA LA PRESENTACIÓN
+Versiones livianas y responsivas de los gráficos del proyecto Tienda Aurelion
+
+Los gráficos se generan a 300 dpi (hasta ~5000 px de ancho), mucho más de
+lo que muestra una tablet. Esta etapa vuelve a codificar cada gráfico, en
+paralelo, en WebP y PNG (paleta de 256 colores) a varios anchos. La
+presentación en modo 'enlazadas' los usa con <picture>/srcset y carga
+diferida, así cada dispositivo descarga solo el ancho que necesita.
+
+Cada variante lleva en el nombre el hash del PNG de origen: si el gráfico no
+cambió no se vuelve a codificar. Si Pillow no tiene soporte WebP se generan
+solo las variantes PNG.
+"""
+
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, features
+
+from cache_graficos import hash_imagen
+
+# Anchos (px) de las variantes; los mayores que el original se omiten
+ANCHOS = (480, 960, 1600)
+CALIDAD_WEBP = 80
+# Ancho con el que se muestra el gráfico en la presentación (el contenedor mide 1200px)
+TAMANOS = "(max-width: 1200px) 90vw, 1100px"
+# Presupuesto de tamaño de la presentación: HTML + la mayor variante de cada imagen
+PRESUPUESTO_KB = 1024
+
+
+def formatos_disponibles():
+    """Formatos de salida en orden de preferencia (WebP solo si Pillow lo soporta)"""
+    return ('webp', 'png') if features.check('webp') else ('png',)
+
+
+def _optimizar(archivo, carpeta, huella, anchos, formatos):
+    """Variantes de una imagen: [{'ruta', 'formato', 'ancho', 'alto', 'tamano'}, ...]"""
+    base = os.path.splitext(os.path.basename(archivo))[0]
+    variantes = []
+    with Image.open(archivo) as original:
+        imagen = original.convert('RGB')
+    anchos = sorted({min(ancho, imagen.width) for ancho in anchos})
+    for ancho in anchos:
+        alto = round(imagen.height * ancho / imagen.width)
+        reducida = None
+        for formato in formatos:
+            ruta = os.path.join(carpeta, f"{base}.{huella}.{ancho}.{formato}")
+            if not os.path.exists(ruta):
+                if reducida is None:
+                    reducida = imagen.resize((ancho, alto), Image.LANCZOS)
+                temporal = ruta + '.tmp'
+                if formato == 'webp':
+                    reducida.save(temporal, 'WEBP', quality=CALIDAD_WEBP, method=6)
+                else:
+                    reducida.quantize(256).save(temporal, 'PNG', optimize=True)
+                os.replace(temporal, ruta)
+            variantes.append({'ruta': ruta, 'formato': formato, 'ancho': ancho, 'alto': alto,
+                              'tamano': os.path.getsize(ruta)})
+    return variantes
+
+
+def optimizar_graficos(archivos, carpeta, anchos=ANCHOS, procesos=None):
+    """Generar (o reutilizar) las variantes de cada imagen, una imagen por proceso
+
+    Devuelve {archivo: variantes}; las imágenes inexistentes se omiten. Se
+    borran de la carpeta las variantes de versiones anteriores.
+    """
+    archivos = [archivo for archivo in archivos if os.path.exists(archivo)]
+    os.makedirs(carpeta, exist_ok=True)
+    formatos = formatos_disponibles()
+    huellas = {archivo: hash_imagen(archivo)[:12] for archivo in archivos}
+
+    procesos = procesos or min(len(archivos), os.cpu_count() or 1)
+    if procesos <= 1:
+        resultados = [_optimizar(archivo, carpeta, huellas[archivo], anchos, formatos) for archivo in archivos]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn')) as pool:
+            resultados = list(pool.map(_optimizar, archivos, [carpeta] * len(archivos),
+                                       [huellas[archivo] for archivo in archivos],
+                                       [anchos] * len(archivos), [formatos] * len(archivos)))
+    variantes = dict(zip(archivos, resultados))
+
+    # Descartar las variantes de versiones anteriores de cada imagen
+    vigentes = {v['ruta'] for lista in variantes.values() for v in lista}
+    for archivo in archivos:
+        base = os.path.splitext(os.path.basename(archivo))[0]
+        for ruta in glob.glob(os.path.join(glob.escape(carpeta), glob.escape(base) + '.*.*.*')):
+            if ruta not in vigentes:
+                os.remove(ruta)
+    return variantes
+
+
+def informe_tamano(ruta_html, variantes=None, presupuesto_kb=PRESUPUESTO_KB):
+    """Tamaño de la presentación frente al presupuesto
+
+    Cuenta el HTML (con las imágenes incrustadas, si las tiene) más, por cada
+    imagen enlazada, su mayor variante en el formato preferido: lo máximo que
+    descarga un dispositivo.
+    """
+    detalle = {'HTML': os.path.getsize(ruta_html)}
+    for archivo, lista in (variantes or {}).items():
+        preferido = lista[0]['formato']
+        detalle[os.path.basename(archivo)] = max(v['tamano'] for v in lista if v['formato'] == preferido)
+    total = sum(detalle.values())
+    return {'detalle': detalle, 'total': total, 'presupuesto': presupuesto_kb * 1024,
+            'dentro': total <= presupuesto_kb * 1024}
+
+
+def imprimir_informe(informe):
+    print("\n📦 Tamaño de la presentación:")
+    for nombre, tamano in informe['detalle'].items():
+        print(f"   • {nombre}: {tamano / 1024:,.1f} KB")
+    estado = "✅ dentro del presupuesto" if informe['dentro'] else "⚠️  excede el presupuesto"
+    print(f"   Total: {informe['total'] / 1024:,.1f} KB de {informe['presupuesto'] / 1024:,.0f} KB ({estado})")
@@ -0,0 +1,67 @@
+# test_estadisticas.py: Tests del servicio de estadísticas y su caché.
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cubo_ventas
+from estadisticas import ServicioEstadisticas
+
+
+def tablas(filas=500, semilla=0):
+    """Productos y detalle de ventas sintéticos con las columnas del menú"""
+    rng = np.random.default_rng(semilla)
+    productos = pd.DataFrame({'id_producto': np.arange(1, 11),
+                              'categoria': ['Bebidas', 'Limpieza'] * 5,
+                              'precio_unitario': rng.integers(100, 1000, size=10)})
+    id_producto = rng.integers(1, 11, size=filas)
+    cantidad = rng.integers(1, 5, size=filas)
+    precio = productos.set_index('id_producto')['precio_unitario'].reindex(id_producto).to_numpy()
+    ventas = pd.DataFrame({'id_producto': id_producto, 'cantidad': cantidad, 'precio_unitario': precio,
+                           'importe': precio * cantidad, 'client_id': rng.integers(1, 50, size=filas),
+                           'fecha': pd.date_range('2023-01-01', periods=filas, freq='D')})
+    return productos, ventas
+
+
+class TestServicioEstadisticas(unittest.TestCase):
+    def setUp(self):
+        # El cubo de ventas guarda su copia en .cache_datos de la carpeta actual
+        self._carpeta = tempfile.TemporaryDirectory()
+        self._anterior = os.getcwd()
+        os.chdir(self._carpeta.name)
+        cubo_ventas._cubos.clear()
+        self.productos, self.ventas = tablas()
+        self.servicio = ServicioEstadisticas()
+
+    def tearDown(self):
+        os.chdir(self._anterior)
+        self._carpeta.cleanup()
+        cubo_ventas._cubos.clear()
+
+    def test_reutiliza_resultados(self):
+        primero = self.servicio.obtener(self.productos, self.ventas)
+        self.assertIs(self.servicio.obtener(self.productos, self.ventas), primero)
+        self.assertIs(self.servicio.obtener(self.productos.copy(), self.ventas.copy()), primero)
+
+    def test_edicion_en_el_lugar(self):
+        antes = self.servicio.obtener(self.productos, self.ventas)
+        categoria = self.productos.set_index('id_producto').at[self.ventas.at[3, 'id_producto'], 'categoria']
+        total = antes['categorias'].at[categoria, 'Total']
+
+        self.ventas.loc[3, 'importe'] += 1_000_000
+        despues = self.servicio.obtener(self.productos, self.ventas)
+        self.assertEqual(despues['categorias'].at[categoria, 'Total'], total + 1_000_000)
+        self.assertEqual(despues['descriptivas'].at['max', 'importe'], self.ventas['importe'].max())
+        self.assertEqual(despues['categorias']['Total'].sum(), self.ventas['importe'].sum())
+
+    def test_invalidar(self):
+        primero = self.servicio.obtener(self.productos, self.ventas)
+        self.servicio.invalidar()
+        self.assertIsNot(self.servicio.obtener(self.productos, self.ventas), primero)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+# test_estadisticas_streaming.py: Tests de los resúmenes en streaming contra pandas.
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from estadisticas_streaming import EstadisticasStreaming, main
+
+
+def detalle_ventas(filas=20000, semilla=0):
+    """Detalle de ventas sintético: precios con pocos valores e importes continuos"""
+    rng = np.random.default_rng(semilla)
+    precio = rng.choice(np.arange(500, 5000, 250), size=filas)
+    cantidad = rng.integers(1, 6, size=filas)
+    importe = precio * cantidad * rng.uniform(0.9, 1.1, size=filas)
+    return pd.DataFrame({'precio_unitario': precio, 'cantidad': cantidad, 'importe': importe})
+
+
+def por_bloques(tabla, bloque, **opciones):
+    estadisticas = EstadisticasStreaming(**opciones)
+    for inicio in range(0, len(tabla), bloque):
+        estadisticas.agregar(tabla.iloc[inicio:inicio + bloque])
+    return estadisticas
+
+
+class TestEstadisticasStreaming(unittest.TestCase):
+    def setUp(self):
+        self.ventas = detalle_ventas()
+
+    def test_media_y_desvio_combinando_particiones(self):
+        mitad = len(self.ventas) // 2
+        estadisticas = por_bloques(self.ventas.iloc[:mitad], 3000).combinar(
+            por_bloques(self.ventas.iloc[mitad:], 7000))
+        resumen = estadisticas.resumen()
+        for col in estadisticas.columnas:
+            self.assertAlmostEqual(resumen.at['count', col], len(self.ventas))
+            self.assertAlmostEqual(resumen.at['mean', col], self.ventas[col].mean(), places=6)
+            self.assertAlmostEqual(resumen.at['std', col], self.ventas[col].std(), places=6)
+            self.assertEqual(resumen.at['min', col], self.ventas[col].min())
+            self.assertEqual(resumen.at['max', col], self.ventas[col].max())
+
+    def test_moda_y_mediana_exactas_con_pocos_valores(self):
+        mitad = len(self.ventas) // 2
+        estadisticas = por_bloques(self.ventas.iloc[:mitad], 3000).combinar(
+            por_bloques(self.ventas.iloc[mitad:], 4000))
+        exactas, modas = estadisticas.exactas(), estadisticas.modas()
+        for col in ['precio_unitario', 'cantidad']:
+            self.assertEqual(exactas[col], (True, True))
+            self.assertEqual(modas[col], self.ventas[col].mode().tolist())
+            self.assertEqual(estadisticas.mediana(col), self.ventas[col].median())
+
+    def test_mediana_aproximada_kll(self):
+        estadisticas = por_bloques(self.ventas, 2500)
+        self.assertEqual(estadisticas.exactas()['importe'], (False, False))
+        # Error de rango de la mediana aproximada
+        rango = (self.ventas['importe'] < estadisticas.mediana('importe')).mean()
+        self.assertLess(abs(rango - 0.5), 0.02)
+
+    def test_moda_dominante_con_muchos_valores(self):
+        # Más valores distintos que contadores (moda aproximada), pero uno
+        # aparece en la cuarta parte de las filas (> N/(k+1)): sobrevive al descuento
+        ventas = self.ventas.copy()
+        ventas.loc[::4, 'precio_unitario'] = 1234
+        estadisticas = por_bloques(ventas, 5000, k_frecuentes=16)
+        self.assertFalse(estadisticas.frecuentes['precio_unitario'].exacto)
+        self.assertEqual(estadisticas.modas()['precio_unitario'], ventas['precio_unitario'].mode().tolist())
+        self.assertEqual(estadisticas.modas()['precio_unitario'], [1234])
+
+    def test_sin_moda_dominante(self):
+        # Todos los valores igual de frecuentes: el descuento vacía los contadores
+        ventas = pd.DataFrame({'precio_unitario': np.tile(np.arange(100), 50)})
+        estadisticas = por_bloques(ventas, 1000, columnas=['precio_unitario'], k_frecuentes=16)
+        self.assertFalse(estadisticas.frecuentes['precio_unitario'].exacto)
+        self.assertEqual(estadisticas.modas()['precio_unitario'], [])
+
+
+class TestMain(unittest.TestCase):
+    def test_sin_moda_dominante_en_la_salida(self):
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, 'ventas.csv')
+            detalle_ventas(2000).assign(precio_unitario=np.tile(np.arange(100), 20)).to_csv(ruta, index=False)
+            salida = io.StringIO()
+            with contextlib.redirect_stdout(salida):
+                main([ruta, '--bloque', '500', '--k-frecuentes', '16'])
+        self.assertIn("- Precio Unitario: sin moda dominante (aprox.)", salida.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
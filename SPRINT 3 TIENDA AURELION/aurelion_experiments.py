@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Ejecutor de experimentos en paralelo para el pipeline de ML de Tienda Aurelion
+
+Barre combinaciones de semillas de división, valores de k del KNN,
+subconjuntos de features y tamaños de dataset, y reparte cada partición
+(tamaño, features y semilla) en un pool de procesos: la regresión no
+depende de k, así que se ajusta una vez por partición y solo el KNN se
+repite para cada k. El dataset se genera y codifica una sola vez en el
+proceso principal y se publica en memoria compartida
+(multiprocessing.shared_memory): los workers lo leen sin copiarlo. Los
+tamaños menores usan las primeras filas del dataset más grande (las ventas
+sintéticas son independientes entre sí).
+
+Las métricas de cada corrida se agregan por configuración (media, desvío e
+intervalo de confianza del 95% con la t de Student entre semillas,
+acotado al rango válido de cada métrica) y se guardan en JSON y CSV.
+
+Uso:
+    python aurelion_experiments.py --seeds 10 --k 3 5 7 --sizes 1000 10000
+"""
+
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from aurelion_ml_system import AurelionMLSystem, FEATURES, PRODUCT_NUMERIC_COLUMNS, split_indices
+from aurelion_neighbors import NEIGHBOR_BACKENDS
+
+# Subconjuntos de features disponibles para el barrido
+FEATURE_SETS = {
+    'todas': FEATURES,
+    'sin_categoria': [f for f in FEATURES if f != 'category_encoded'],
+    'producto': PRODUCT_NUMERIC_COLUMNS + ['category_encoded'],
+    'venta': ['customer_age', 'discount', 'season_encoded', 'day_encoded'],
+}
+
+METRICS = ('rmse', 'mae', 'r2', 'accuracy')
+# Rango válido de cada métrica, para acotar los intervalos de confianza
+METRIC_BOUNDS = {'rmse': (0, None), 'mae': (0, None), 'r2': (None, 1), 'accuracy': (0, 1)}
+
+# Arreglos compartidos del worker (se asignan en _attach_shared)
+_shared = {}
+
+
+def _share(array):
+    """Copiar un arreglo a un bloque de memoria compartida (una única vez)"""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    return shm, {'name': shm.name, 'shape': array.shape, 'dtype': array.dtype.str}
+
+
+def _attach_shared(specs):
+    """Inicializador del worker: abrir los bloques compartidos como arreglos (sin copia)"""
+    for key, spec in specs.items():
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        _shared[key + '_shm'] = shm  # Mantener la referencia viva mientras dure el worker
+        _shared[key] = np.ndarray(spec['shape'], dtype=np.dtype(spec['dtype']), buffer=shm.buf)
+
+
+def run_experiment(config):
+    """Entrenar y evaluar una partición sobre los datos compartidos, una corrida por k
+
+    config trae la lista k_values; devuelve una corrida (dict de métricas)
+    por cada k, todas con la misma regresión.
+    """
+    from sklearn.linear_model import LinearRegression
+    from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score, accuracy_score
+    from sklearn.preprocessing import StandardScaler
+    from aurelion_neighbors import make_neighbors_classifier
+
+    n = config['n_sales']
+    columns = [FEATURES.index(f) for f in FEATURE_SETS[config['feature_set']]]
+    # Solo un slice de filas (vista sin copia); las columnas se eligen junto con
+    # las filas de cada partición, así se copia una vez solo lo que se usa
+    X = _shared['X'][:n]
+    y_reg = _shared['y_reg'][:n]
+    y_class = _shared['y_class'][:n]
+
+    train_idx, test_idx = split_indices(n, config['test_size'], config['seed'], config['split_method'],
+                                        labels=y_class, dates=_shared['date'][:n])
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[np.ix_(train_idx, columns)])
+    X_test = scaler.transform(X[np.ix_(test_idx, columns)])
+
+    regression = LinearRegression().fit(X_train, y_reg[train_idx])
+    y_pred = regression.predict(X_test)
+    regression_metrics = {
+        'rmse': float(np.sqrt(mean_squared_error(y_reg[test_idx], y_pred))),
+        'mae': float(mean_absolute_error(y_reg[test_idx], y_pred)),
+        'r2': float(r2_score(y_reg[test_idx], y_pred)),
+    }
+
+    base = {key: value for key, value in config.items() if key != 'k_values'}
+    runs = []
+    for k in config['k_values']:
+        classifier = make_neighbors_classifier(config['knn_backend'], k).fit(X_train, y_class[train_idx])
+        runs.append({**base, 'k': k, **regression_metrics,
+                     'accuracy': float(accuracy_score(y_class[test_idx], classifier.predict(X_test)))})
+    return runs
+
+
+def build_configs(seeds, k_values, feature_sets, sizes, test_size=0.2, split_method='random', knn_backend='sklearn'):
+    """Producto cartesiano de las particiones a evaluar (cada una barre todos los k)"""
+    if knn_backend not in NEIGHBOR_BACKENDS:
+        raise ValueError(f"Motor de vecinos no soportado: {knn_backend} (use {', '.join(NEIGHBOR_BACKENDS)})")
+    return [
+        {'n_sales': n, 'feature_set': fs, 'k_values': list(k_values), 'seed': seed, 'test_size': test_size,
+         'split_method': split_method, 'knn_backend': knn_backend}
+        for n, fs, seed in itertools.product(sizes, feature_sets, seeds)
+    ]
+
+
+def summarize(runs):
+    """Agregar métricas por configuración: media, desvío e IC 95% entre semillas
+
+    El intervalo usa el cuantil t de Student con count-1 grados de libertad
+    (con pocas semillas el 1.96 de la normal lo subestima) y se recorta al
+    rango válido de cada métrica. Con una sola semilla el intervalo es la
+    media.
+    """
+    from scipy.stats import t
+    
+    df = pd.DataFrame(runs)
+    group_cols = ['n_sales', 'feature_set', 'k', 'test_size', 'split_method', 'knn_backend']
+    grouped = df.groupby(group_cols)[list(METRICS)]
+    summary = grouped.agg(['mean', 'std', 'count'])
+    for metric in METRICS:
+        count = summary[(metric, 'count')]
+        t_quantile = np.where(count > 1, t.ppf(0.975, np.maximum(count - 1, 1)), 0.0)
+        half_width = t_quantile * summary[(metric, 'std')].fillna(0) / np.sqrt(count)
+        low, high = METRIC_BOUNDS[metric]
+        summary[(metric, 'ci95_low')] = (summary[(metric, 'mean')] - half_width).clip(low, high)
+        summary[(metric, 'ci95_high')] = (summary[(metric, 'mean')] + half_width).clip(low, high)
+    summary.columns = [f"{metric}_{stat}" for metric, stat in summary.columns]
+    return summary.reset_index()
+
+
+def run_experiments(configs, data_seed=42, max_workers=None, output_prefix='aurelion_experiments'):
+    """Generar el dataset una vez, ejecutar las configuraciones en paralelo y guardar el resumen"""
+    ml_system = AurelionMLSystem(n_sales=max(c['n_sales'] for c in configs), seed=data_seed)
+    X, y_reg, y_class = ml_system.prepare_ml_data()
+    arrays = {
+        'X': X.to_numpy(dtype=np.float64),
+        'y_reg': y_reg.to_numpy(dtype=np.float64),
+        'y_class': y_class.cat.codes.to_numpy(),
+        'date': ml_system.ml_data['date'].to_numpy().astype('datetime64[D]').astype(np.int64),
+    }
+    categories = list(y_class.cat.categories)
+    del ml_system, X, y_reg, y_class
+
+    blocks, specs = {}, {}
+    try:
+        for key, array in arrays.items():
+            blocks[key], specs[key] = _share(array)
+        del arrays
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_shared, initargs=(specs,)) as pool:
+            runs = [run for runs_k in pool.map(run_experiment, configs) for run in runs_k]
+    finally:
+        for shm in blocks.values():
+            shm.close()
+            shm.unlink()
+
+    summary = summarize(runs)
+    pd.DataFrame(runs).to_csv(f'{output_prefix}_runs.csv', index=False)
+    summary.to_csv(f'{output_prefix}_summary.csv', index=False)
+    with open(f'{output_prefix}_summary.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(),
+            'data_seed': data_seed,
+            'categories': categories,
+            'total_runs': len(runs),
+            'summary': summary.to_dict('records'),
+        }, f, indent=2, ensure_ascii=False)
+    return runs, summary
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Barrido de experimentos de ML en paralelo")
+    parser.add_argument('--seeds', type=int, default=5, help="Cantidad de semillas de división por configuración")
+    parser.add_argument('--k', type=int, nargs='+', default=[5], help="Valores de k del KNN")
+    parser.add_argument('--feature-sets', nargs='+', default=['todas'], choices=list(FEATURE_SETS))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000], help="Tamaños de dataset")
+    parser.add_argument('--test-size', type=float, default=0.2)
+    parser.add_argument('--split-method', default='random', choices=['random', 'stratified', 'time'])
+    parser.add_argument('--knn-backend', default='sklearn', choices=NEIGHBOR_BACKENDS)
+    parser.add_argument('--workers', type=int, default=None, help="Procesos del pool (por defecto, todos los CPU)")
+    parser.add_argument('--data-seed', type=int, default=42)
+    args = parser.parse_args()
+
+    configs = build_configs(range(args.seeds), args.k, args.feature_sets, args.sizes,
+                            args.test_size, args.split_method, args.knn_backend)
+    workers = args.workers or os.cpu_count()
+    print(f"🧪 Ejecutando {len(configs) * len(args.k)} experimentos ({len(configs)} particiones) "
+          f"en {workers} procesos...")
+    _, summary = run_experiments(configs, args.data_seed, workers)
+
+    for row in summary.to_dict('records'):
+        print(f"   • n={row['n_sales']:>8} features={row['feature_set']:<14} k={row['k']:<3} "
+              f"RMSE={row['rmse_mean']:.2f}±{row['rmse_std']:.2f}  R²={row['r2_mean']:.3f}  "
+              f"precisión={row['accuracy_mean']:.3f} [{row['accuracy_ci95_low']:.3f}, {row['accuracy_ci95_high']:.3f}]")
+    print("📄 Resumen guardado en aurelion_experiments_summary.json / .csv")
+
+
+if __name__ == "__main__":
+    main()
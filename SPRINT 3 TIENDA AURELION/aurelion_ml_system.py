@@ -9,34 +9,93 @@ pero utilizando las librerías estándar de Python para ML.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score, accuracy_score, confusion_matrix
 import json
-from datetime import datetime, timedelta
-import random
+import os
+from datetime import datetime
 
-# Configurar estilo de gráficos
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+from aurelion_neighbors import make_neighbors_classifier
+from aurelion_scoring import save_model_artifact
+
+# matplotlib, seaborn y los submódulos de scikit-learn se importan dentro de
+# los métodos que los usan, para que importar este módulo (o pedir solo
+# métricas y el reporte JSON) no pague su tiempo de carga.
+
+# Valores posibles de las variables categóricas de las ventas
+SEASONS = ['Primavera', 'Verano', 'Otoño', 'Invierno']
+DAYS_OF_WEEK = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+GENDERS = ['M', 'F']
+CATEGORIES = ['Electrónicos', 'Ropa', 'Hogar', 'Libros', 'Salud']
+
+# Atributos numéricos del producto usados como features
+PRODUCT_NUMERIC_COLUMNS = ['price', 'stock', 'rating', 'reviews']
+FEATURES = PRODUCT_NUMERIC_COLUMNS + ['customer_age', 'discount',
+                                      'season_encoded', 'day_encoded', 'category_encoded']
+
+# Formatos de salida del gráfico de resultados
+PLOT_FORMATS = ('png', 'webp', 'svg')
+
+# Formatos de partición y tipos de columnas para releer las ventas desde disco
+SALES_FORMATS = ('csv', 'parquet')
+SALES_DTYPES = {
+    'date': 'datetime64[ns]',
+    'customer_gender': pd.CategoricalDtype(GENDERS),
+    'season': pd.CategoricalDtype(SEASONS),
+    'day_of_week': pd.CategoricalDtype(DAYS_OF_WEEK),
+}
+
+def category_codes(values, categories):
+    """Códigos enteros (int8) de una columna según un orden fijo de categorías"""
+    if isinstance(values.dtype, pd.CategoricalDtype) and list(values.cat.categories) == categories:
+        return values.cat.codes.to_numpy()
+    return pd.Categorical(values, categories=categories).codes
+
+def split_indices(n, test_size=0.2, seed=42, method='random', labels=None, dates=None):
+    """Índices de entrenamiento y prueba a partir de una sola permutación"""
+    rng = np.random.default_rng(seed)
+    n_test = int(np.ceil(test_size * n))
+    if method == 'random':
+        perm = rng.permutation(n)
+        return perm[n_test:], perm[:n_test]
+    if method == 'stratified':
+        # Permutar y agrupar por clase; las primeras posiciones de cada clase van a prueba
+        _, codes = np.unique(labels, return_inverse=True)
+        perm = rng.permutation(n)
+        perm = perm[np.argsort(codes[perm], kind='stable')]
+        counts = np.bincount(codes[perm])
+        starts = np.repeat(np.cumsum(counts) - counts, counts)
+        rank = np.arange(n) - starts
+        is_test = rank < np.repeat(np.round(counts * test_size).astype(int), counts)
+        return rng.permutation(perm[~is_test]), rng.permutation(perm[is_test])
+    if method == 'time':
+        order = np.argsort(dates, kind='stable')
+        return order[:n - n_test], order[n - n_test:]
+    raise ValueError(f"Método de división no soportado: {method}")
 
 class AurelionMLSystem:
-    def __init__(self):
+    def __init__(self, n_sales=1000, seed=42, sales_path=None, knn_backend='sklearn'):
+        self.seed = seed
+        self.knn_backend = knn_backend
         self.products_data = self.generate_products_data()
-        self.sales_data = self.generate_sales_data()
+        self.product_lookup = self.build_product_lookup()
+        # Con sales_path las ventas se leen por particiones desde disco
+        # (ver write_sales_partitions) en lugar de generarse en memoria
+        self.sales_path = sales_path
+        self.sales_data = self.generate_sales_data(n_sales, seed) if sales_path is None else None
         self.ml_data = None
+        # Versión de ml_data y agregados en caché para visualizaciones y reporte
+        self.data_version = 0
+        self._aggregates = None
+        self._aggregates_version = None
+        self._best_rated = None
         self.X_train = None
         self.X_test = None
         self.y_train_reg = None
         self.y_test_reg = None
         self.y_train_class = None
         self.y_test_class = None
-        self.scaler = StandardScaler()
-        self.label_encoder = LabelEncoder()
+        self.scaler = None
+        # Archivo del gráfico de resultados de la última corrida (None si no se generó)
+        self.plot_path = None
         
     def generate_products_data(self):
         """Generar datos sintéticos de productos"""
@@ -54,79 +113,271 @@ class AurelionMLSystem:
         ]
         return pd.DataFrame(products)
     
-    def generate_sales_data(self):
-        """Generar datos sintéticos de ventas"""
-        np.random.seed(42)  # Para reproducibilidad
-        sales = []
-        seasons = ['Primavera', 'Verano', 'Otoño', 'Invierno']
-        days_of_week = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-        genders = ['M', 'F']
-        
-        for i in range(1, 1001):
-            product = self.products_data.sample(1).iloc[0]
-            quantity = np.random.randint(1, 6)
-            discount = np.random.random() * 0.2 if np.random.random() < 0.3 else 0
-            total_amount = product['price'] * quantity * (1 - discount)
-            
-            sale = {
-                'id': i,
-                'product_id': product['id'],
-                'quantity': quantity,
-                'date': (datetime(2024, 1, 1) + timedelta(days=np.random.randint(0, 365))).strftime('%Y-%m-%d'),
-                'customer_age': np.random.randint(18, 69),
-                'customer_gender': np.random.choice(genders),
-                'season': np.random.choice(seasons),
-                'day_of_week': np.random.choice(days_of_week),
-                'total_amount': total_amount,
-                'discount': discount
-            }
-            sales.append(sale)
-        
-        return pd.DataFrame(sales)
+    def build_product_lookup(self):
+        """Construir arreglos de atributos de producto indexados por product_id
+
+        Reemplaza el merge de ventas con productos: cada atributo se obtiene
+        con un único gather ``lookup[columna][product_id]``. Los ids sin
+        producto quedan con ``row = -1``.
+        """
+        ids = self.products_data['id'].to_numpy()
+        size = ids.max() + 1
+        lookup = {'row': np.full(size, -1, dtype=np.int64)}
+        lookup['row'][ids] = np.arange(len(ids))
+        for column in PRODUCT_NUMERIC_COLUMNS:
+            lookup[column] = np.full(size, np.nan)
+            lookup[column][ids] = self.products_data[column].to_numpy()
+        lookup['category_code'] = np.full(size, -1, dtype=np.int8)
+        lookup['category_code'][ids] = category_codes(self.products_data['category'], CATEGORIES)
+        return lookup
+    
+    def generate_sales_data(self, n_sales=1000, seed=42, start_id=1):
+        """Generar datos sintéticos de ventas (vectorizado con NumPy)
+
+        Todas las columnas se sortean como arreglos completos en lugar de fila
+        por fila, con las mismas distribuciones que el generador original.
+        Con ``seed=None`` cada llamada produce un dataset distinto.
+        """
+        rng = np.random.default_rng(seed)  # Para reproducibilidad
+        
+        # Producto uniforme sobre el catálogo (equivale a products_data.sample(1))
+        product_idx = rng.integers(0, len(self.products_data), size=n_sales)
+        product_ids = self.products_data['id'].to_numpy()[product_idx]
+        prices = self.products_data['price'].to_numpy()[product_idx]
+        
+        quantity = rng.integers(1, 6, size=n_sales)
+        # 30% de las ventas tienen un descuento uniforme entre 0% y 20%
+        has_discount = rng.random(n_sales) < 0.3
+        discount = np.where(has_discount, rng.random(n_sales) * 0.2, 0.0)
+        total_amount = prices * quantity * (1 - discount)
+        
+        dates = np.datetime64('2024-01-01') + rng.integers(0, 365, size=n_sales).astype('timedelta64[D]')
+        
+        return pd.DataFrame({
+            'id': np.arange(start_id, start_id + n_sales),
+            'product_id': product_ids,
+            'quantity': quantity,
+            'date': pd.to_datetime(dates),
+            'customer_age': rng.integers(18, 69, size=n_sales),
+            'customer_gender': pd.Categorical.from_codes(rng.integers(0, len(GENDERS), size=n_sales), GENDERS),
+            'season': pd.Categorical.from_codes(rng.integers(0, len(SEASONS), size=n_sales), SEASONS),
+            'day_of_week': pd.Categorical.from_codes(rng.integers(0, len(DAYS_OF_WEEK), size=n_sales), DAYS_OF_WEEK),
+            'total_amount': total_amount,
+            'discount': discount
+        })
+    
+    def iter_sales_chunks(self, n_sales, chunk_size=1_000_000, seed=42):
+        """Generar ventas sintéticas en bloques de tamaño fijo
+
+        Cada bloque usa su propia semilla derivada de ``seed``, de modo que el
+        resultado es reproducible y la memoria queda acotada por chunk_size.
+        """
+        n_chunks = -(-n_sales // chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+        for i, chunk_seed in enumerate(seeds):
+            start = i * chunk_size
+            size = min(chunk_size, n_sales - start)
+            yield self.generate_sales_data(size, chunk_seed, start_id=start + 1)
+    
+    def write_sales_partitions(self, path, n_sales, chunk_size=1_000_000, seed=42, file_format='csv'):
+        """Escribir ventas sintéticas a disco como particiones CSV o Parquet
+
+        Los bloques se escriben a medida que se generan, por lo que nunca hay
+        más de un bloque en memoria. Parquet requiere pyarrow. Las
+        particiones de una escritura anterior en la misma carpeta se borran.
+        """
+        if file_format not in SALES_FORMATS:
+            raise ValueError(f"Formato no soportado: {file_format} (use 'csv' o 'parquet')")
+        os.makedirs(path, exist_ok=True)
+        for file_name in self._partition_files(path):
+            os.remove(os.path.join(path, file_name))
+        files = []
+        for i, chunk in enumerate(self.iter_sales_chunks(n_sales, chunk_size, seed)):
+            file_path = os.path.join(path, f"part-{i:05d}.{file_format}")
+            if file_format == 'parquet':
+                chunk.to_parquet(file_path, index=False)
+            else:
+                chunk.to_csv(file_path, index=False)
+            files.append(file_path)
+        self.sales_path = path
+        return files
+    
+    @staticmethod
+    def _partition_files(path):
+        """Nombres de las particiones de ventas de una carpeta, en orden"""
+        return sorted(f for f in os.listdir(path) if f.startswith('part-') and f.endswith(tuple(SALES_FORMATS)))
+    
+    def iter_sales_partitions(self, path=None, columns=None):
+        """Leer de a una las particiones de ventas escritas en disco"""
+        path = path or self.sales_path
+        for file_name in self._partition_files(path):
+            file_path = os.path.join(path, file_name)
+            if file_name.endswith('.parquet'):
+                yield pd.read_parquet(file_path, columns=columns)
+            else:
+                chunk = pd.read_csv(file_path, usecols=columns)
+                yield chunk.astype({c: t for c, t in SALES_DTYPES.items() if c in chunk.columns})
+    
+    def iter_ml_data(self, path=None):
+        """Preparar los datos de ML partición por partición
+
+        Devuelve (X, y_regression, y_classification) por cada partición en
+        disco, para entrenar sin cargar todas las ventas a la vez. No
+        modifica ml_data ni los agregados del sistema.
+        """
+        for chunk in self.iter_sales_partitions(path):
+            yield self._ml_arrays(self.build_ml_data(chunk))
     
-    def prepare_ml_data(self):
+    def build_ml_data(self, sales_data):
+        """Agregar a las ventas los atributos del producto y las columnas codificadas"""
+        # Atributos del producto: un gather por columna sobre la tabla de búsqueda
+        product_ids = sales_data['product_id'].to_numpy()
+        known = (product_ids >= 0) & (product_ids < len(self.product_lookup['row']))
+        known[known] = self.product_lookup['row'][product_ids[known]] >= 0
+        if not known.all():
+            # Igual que el merge interno original: se descartan productos desconocidos
+            sales_data = sales_data[known]
+            product_ids = product_ids[known]
+        
+        ml_data = sales_data.assign(**{
+            column: self.product_lookup[column][product_ids]
+            for column in PRODUCT_NUMERIC_COLUMNS
+        })
+        rows = self.product_lookup['row'][product_ids]
+        ml_data['name'] = pd.Categorical.from_codes(rows, self.products_data['name'])
+        ml_data['category'] = pd.Categorical.from_codes(self.product_lookup['category_code'][product_ids], CATEGORIES)
+        
+        # Codificar variables categóricas (códigos enteros, sin mapear strings)
+        ml_data['season_encoded'] = category_codes(ml_data['season'], SEASONS)
+        ml_data['day_encoded'] = category_codes(ml_data['day_of_week'], DAYS_OF_WEEK)
+        ml_data['category_encoded'] = ml_data['category'].cat.codes
+        return ml_data
+    
+    @staticmethod
+    def _ml_arrays(ml_data):
+        """Features y objetivos (X, y_regression, y_classification) de ml_data"""
+        return ml_data[FEATURES], ml_data['total_amount'], ml_data['category']
+    
+    def prepare_ml_data(self, sales_data=None):
         """Preparar datos para machine learning"""
-        # Unir datos de productos y ventas
-        ml_data = self.sales_data.merge(self.products_data, left_on='product_id', right_on='id', suffixes=('_sale', '_product'))
-        
-        # Codificar variables categóricas
-        season_encoder = {'Primavera': 0, 'Verano': 1, 'Otoño': 2, 'Invierno': 3}
-        day_encoder = {'Lunes': 0, 'Martes': 1, 'Miércoles': 2, 'Jueves': 3, 'Viernes': 4, 'Sábado': 5, 'Domingo': 6}
-        category_encoder = {'Electrónicos': 0, 'Ropa': 1, 'Hogar': 2, 'Libros': 3, 'Salud': 4}
-        
-        ml_data['season_encoded'] = ml_data['season'].map(season_encoder)
-        ml_data['day_encoded'] = ml_data['day_of_week'].map(day_encoder)
-        ml_data['category_encoded'] = ml_data['category'].map(category_encoder)
-        
-        # Seleccionar features
-        features = ['price', 'stock', 'rating', 'reviews', 'customer_age', 'discount', 
-                   'season_encoded', 'day_encoded', 'category_encoded']
-        
-        X = ml_data[features]
-        y_regression = ml_data['total_amount']
-        y_classification = ml_data['category']
-        
+        if sales_data is None:
+            sales_data = self.sales_data
+            if sales_data is None:
+                # Cargar todas las particiones juntas anularía el límite de memoria
+                raise ValueError("Las ventas están particionadas en disco (sales_path): use iter_ml_data() "
+                                 "o train_regression_incremental(), o pase las ventas a prepare_ml_data()")
+        
+        ml_data = self.build_ml_data(sales_data)
         self.ml_data = ml_data
-        return X, y_regression, y_classification
+        self.data_version += 1
+        return self._ml_arrays(ml_data)
     
-    def split_data(self, X, y_reg, y_class):
-        """Dividir datos en entrenamiento y prueba"""
-        # División para regresión
-        self.X_train, self.X_test, self.y_train_reg, self.y_test_reg = train_test_split(
-            X, y_reg, test_size=0.2, random_state=42
-        )
-        
-        # División para clasificación (mismos índices)
-        _, _, self.y_train_class, self.y_test_class = train_test_split(
-            X, y_class, test_size=0.2, random_state=42
-        )
+    def append_sales(self, new_sales):
+        """Agregar ventas nuevas a ml_data actualizando los agregados en forma incremental
+
+        Solo se agregan las filas nuevas a los totales en caché; no se vuelve
+        a recorrer ml_data completo.
+        """
+        new_ml_data = self.build_ml_data(new_sales)
+        aggregates = self.get_aggregates() if self.ml_data is not None else None
+        
+        if self.sales_data is not None:
+            self.sales_data = pd.concat([self.sales_data, new_sales], ignore_index=True)
+        self.ml_data = new_ml_data if self.ml_data is None else pd.concat([self.ml_data, new_ml_data], ignore_index=True)
+        self.data_version += 1
+        
+        if aggregates is None:
+            self._aggregates = self.compute_aggregates(new_ml_data)
+        else:
+            delta = self.compute_aggregates(new_ml_data)
+            for key in ('n_sales', 'total_revenue', 'product_totals', 'product_counts'):
+                aggregates[key] = aggregates[key] + delta[key]
+            self._aggregates = aggregates
+        self._aggregates_version = self.data_version
+        return new_ml_data
+    
+    def compute_aggregates(self, ml_data):
+        """Totales por producto en una sola pasada sobre ml_data
+
+        Las ventas por categoría, el valor promedio de orden y los ingresos
+        totales se derivan de estos totales (cada producto pertenece a una
+        sola categoría), sin más recorridos de los datos.
+        """
+        product_rows = ml_data['name'].cat.codes.to_numpy()
+        n_products = len(self.products_data)
+        product_totals = np.bincount(product_rows, weights=ml_data['total_amount'].to_numpy(), minlength=n_products)
+        product_counts = np.bincount(product_rows, minlength=n_products)
+        return {
+            'n_sales': int(product_counts.sum()),
+            'total_revenue': float(product_totals.sum()),
+            'product_totals': product_totals,
+            'product_counts': product_counts,
+        }
+    
+    def get_aggregates(self):
+        """Agregados de ml_data en caché, recalculados solo si cambió la versión de los datos"""
+        if self._aggregates is None or self._aggregates_version != self.data_version:
+            self._aggregates = self.compute_aggregates(self.ml_data)
+            self._aggregates_version = self.data_version
+        return self._aggregates
+    
+    def best_rated_products(self, n=3):
+        """Productos mejor calificados (no dependen de las ventas: se calculan una vez)"""
+        if self._best_rated is None or len(self._best_rated) != n:
+            self._best_rated = self.products_data.nlargest(n, 'rating')[['name', 'rating']].to_dict('records')
+        return self._best_rated
+    
+    def category_sales(self):
+        """Ventas totales por categoría (de mayor a menor), desde los agregados en caché"""
+        aggregates = self.get_aggregates()
+        product_categories = self.product_lookup['category_code'][self.products_data['id'].to_numpy()]
+        totals = np.bincount(product_categories, weights=aggregates['product_totals'], minlength=len(CATEGORIES))
+        counts = np.bincount(product_categories, weights=aggregates['product_counts'], minlength=len(CATEGORIES))
+        return pd.Series(totals, index=CATEGORIES)[counts > 0].sort_values(ascending=False)
+    
+    def product_sales(self):
+        """Ventas totales por producto (con su rating), desde los agregados en caché"""
+        aggregates = self.get_aggregates()
+        sold = aggregates['product_counts'] > 0
+        return pd.DataFrame({
+            'name': self.products_data['name'].to_numpy()[sold],
+            'rating': self.products_data['rating'].to_numpy()[sold],
+            'total_amount': aggregates['product_totals'][sold],
+        })
+    
+    def split_data(self, X, y_reg, y_class, test_size=0.2, random_state=42, method='random'):
+        """Dividir datos en entrenamiento y prueba
+
+        Se calcula una única permutación de índices y se aplica una sola vez a
+        X y a ambos objetivos; entrenamiento y prueba son vistas (slices) de
+        esos datos reordenados. method: 'random', 'stratified' (por
+        categoría) o 'time' (las ventas más recientes quedan para prueba).
+        """
+        labels = dates = None
+        if method == 'stratified':
+            labels = y_class.cat.codes.to_numpy() if isinstance(y_class.dtype, pd.CategoricalDtype) else y_class.to_numpy()
+        elif method == 'time':
+            dates = self.ml_data['date'].to_numpy()
+        self.train_idx, self.test_idx = split_indices(len(X), test_size, random_state, method, labels, dates)
+        order = np.concatenate([self.train_idx, self.test_idx])
+        n_train = len(self.train_idx)
+        
+        X, y_reg, y_class = X.iloc[order], y_reg.iloc[order], y_class.iloc[order]
+        self.X_train, self.X_test = X.iloc[:n_train], X.iloc[n_train:]
+        self.y_train_reg, self.y_test_reg = y_reg.iloc[:n_train], y_reg.iloc[n_train:]
+        self.y_train_class, self.y_test_class = y_class.iloc[:n_train], y_class.iloc[n_train:]
         
         # Normalizar features
+        from sklearn.preprocessing import StandardScaler
+        self.scaler = StandardScaler()
         self.X_train_scaled = self.scaler.fit_transform(self.X_train)
         self.X_test_scaled = self.scaler.transform(self.X_test)
     
     def train_regression_model(self):
         """Entrenar modelo de regresión lineal"""
+        from sklearn.linear_model import LinearRegression
+        from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+        
         self.regression_model = LinearRegression()
         self.regression_model.fit(self.X_train_scaled, self.y_train_reg)
         
@@ -148,9 +399,100 @@ class AurelionMLSystem:
             'r2': r2
         }
     
-    def train_classification_model(self):
-        """Entrenar modelo de clasificación KNN"""
-        self.classification_model = KNeighborsClassifier(n_neighbors=5)
+    def train_regression_incremental(self, chunks=None, test_size=0.2, random_state=42):
+        """Entrenar la regresión lineal por bloques (fuera de memoria)
+
+        Acumula las ecuaciones normales [X 1]^T [X 1] y [X 1]^T y bloque a
+        bloque; de esas mismas sumas salen la media y la varianza del scaler.
+        Los coeficientes son equivalentes a los del modelo por lotes.
+        Una fracción test_size de cada bloque se reserva para prueba y sus
+        métricas (MSE, RMSE, R²) se obtienen en forma cerrada de las sumas
+        de prueba, sin una segunda pasada.
+
+        Por defecto lee las particiones de sales_path si está definido y,
+        si no, usa las ventas en memoria.
+        """
+        from sklearn.linear_model import LinearRegression
+        from sklearn.preprocessing import StandardScaler
+        
+        if not 0 < test_size < 1:
+            raise ValueError(f"test_size debe estar entre 0 y 1 (exclusivo): {test_size}")
+        if chunks is None:
+            chunks = self.iter_ml_data() if self.sales_path is not None else [self.prepare_ml_data()]
+        rng = np.random.default_rng(random_state)
+        
+        shift = None
+        for X, y_reg, _ in chunks:
+            A = X.to_numpy(dtype=np.float64)
+            y = y_reg.to_numpy(dtype=np.float64)
+            if shift is None:
+                # Desplazar por la media del primer bloque mejora la estabilidad numérica
+                shift = A.mean(axis=0)
+                n_features = A.shape[1]
+                gram = {part: np.zeros((n_features + 1, n_features + 1)) for part in ('train', 'test')}
+                xty = {part: np.zeros(n_features + 1) for part in ('train', 'test')}
+                yty = {'train': 0.0, 'test': 0.0}
+            A = np.hstack([A - shift, np.ones((len(A), 1))])
+            is_test = rng.random(len(A)) < test_size
+            for part, mask in (('train', ~is_test), ('test', is_test)):
+                gram[part] += A[mask].T @ A[mask]
+                xty[part] += A[mask].T @ y[mask]
+                yty[part] += y[mask] @ y[mask]
+        
+        if shift is None:
+            raise ValueError("No hay ventas para entrenar: no se recibió ningún bloque de datos")
+        n_train, n_test = gram['train'][-1, -1], gram['test'][-1, -1]
+        if n_train == 0 or n_test == 0:
+            raise ValueError(f"Muy pocas ventas para entrenar y evaluar: {int(n_train)} de entrenamiento, "
+                             f"{int(n_test)} de prueba")
+        
+        # Estadísticas del scaler a partir de la misma acumulación
+        G = gram['train']
+        mean_shifted = G[:-1, -1] / n_train
+        var = np.diag(G)[:-1] / n_train - mean_shifted ** 2
+        self.scaler = StandardScaler()
+        self.scaler.mean_ = mean_shifted + shift
+        self.scaler.var_ = var
+        self.scaler.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+        self.scaler.n_samples_seen_ = int(n_train)
+        self.scaler.n_features_in_ = n_features
+        self.scaler.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        # Los datos escalados de split_data usaban el scaler anterior: reescalarlos con el nuevo
+        if self.X_train is not None:
+            self.X_train_scaled = self.scaler.transform(self.X_train)
+            self.X_test_scaled = self.scaler.transform(self.X_test)
+        
+        # Resolver las ecuaciones normales en el espacio original
+        beta = np.linalg.lstsq(G, xty['train'], rcond=None)[0]
+        self.regression_model = LinearRegression()
+        self.regression_model.coef_ = beta[:-1] * self.scaler.scale_
+        self.regression_model.intercept_ = beta[-1] + beta[:-1] @ mean_shifted
+        self.regression_model.n_features_in_ = n_features
+        
+        # Métricas de prueba: SSE = y'y - 2 beta'A'y + beta'A'A beta
+        G_test = gram['test']
+        sse = yty['test'] - 2 * beta @ xty['test'] + beta @ G_test @ beta
+        sst = yty['test'] - xty['test'][-1] ** 2 / n_test
+        mse = sse / n_test
+        
+        return {
+            'mse': mse,
+            'rmse': np.sqrt(mse),
+            'r2': 1 - sse / sst,
+            'training_samples': int(n_train),
+            'test_samples': int(n_test)
+        }
+    
+    def train_classification_model(self, backend=None, **backend_kwargs):
+        """Entrenar modelo de clasificación KNN
+
+        backend elige el motor de búsqueda de vecinos: 'sklearn'
+        (KNeighborsClassifier), 'exact' (distancias por bloques) o 'ivf'
+        (aproximado). Por defecto se usa el indicado al crear el sistema.
+        """
+        from sklearn.metrics import accuracy_score, confusion_matrix
+        
+        self.classification_model = make_neighbors_classifier(backend or self.knn_backend, 5, **backend_kwargs)
         self.classification_model.fit(self.X_train_scaled, self.y_train_class)
         
         # Predicciones
@@ -167,23 +509,29 @@ class AurelionMLSystem:
             'confusion_matrix': conf_matrix
         }
     
-    def create_visualizations(self, reg_results, class_results):
-        """Crear visualizaciones de los resultados"""
-        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+    def _draw_results(self, fig, axes, reg_results, class_results, max_points):
+        """Dibujar los seis paneles de resultados sobre una figura ya creada"""
+        import seaborn as sns
+        
         fig.suptitle('Tienda Aurelion - Resultados de Machine Learning', fontsize=16, fontweight='bold')
         
+        # Con muchos puntos de prueba, los scatter de regresión usan una muestra
+        actual, predictions = np.asarray(reg_results['actual']), np.asarray(reg_results['predictions'])
+        residuals = actual - predictions
+        sample = np.arange(len(actual))
+        if max_points and len(actual) > max_points:
+            sample = np.sort(np.random.default_rng(0).choice(len(actual), max_points, replace=False))
+        
         # 1. Predicciones vs Valores Reales (Regresión)
-        axes[0, 0].scatter(reg_results['actual'], reg_results['predictions'], alpha=0.6, color='blue')
-        axes[0, 0].plot([reg_results['actual'].min(), reg_results['actual'].max()], 
-                       [reg_results['actual'].min(), reg_results['actual'].max()], 'r--', lw=2)
+        axes[0, 0].scatter(actual[sample], predictions[sample], alpha=0.6, color='blue')
+        axes[0, 0].plot([actual.min(), actual.max()], [actual.min(), actual.max()], 'r--', lw=2)
         axes[0, 0].set_xlabel('Valores Reales')
         axes[0, 0].set_ylabel('Predicciones')
         axes[0, 0].set_title('Regresión: Predicciones vs Reales')
         axes[0, 0].grid(True, alpha=0.3)
         
         # 2. Residuos
-        residuals = reg_results['actual'] - reg_results['predictions']
-        axes[0, 1].scatter(reg_results['predictions'], residuals, alpha=0.6, color='green')
+        axes[0, 1].scatter(predictions[sample], residuals[sample], alpha=0.6, color='green')
         axes[0, 1].axhline(y=0, color='r', linestyle='--')
         axes[0, 1].set_xlabel('Predicciones')
         axes[0, 1].set_ylabel('Residuos')
@@ -207,7 +555,7 @@ class AurelionMLSystem:
         axes[1, 0].set_ylabel('Valores Reales')
         
         # 5. Ventas por Categoría
-        category_sales = self.ml_data.groupby('category')['total_amount'].sum().sort_values(ascending=False)
+        category_sales = self.category_sales()
         axes[1, 1].bar(category_sales.index, category_sales.values, color='skyblue', edgecolor='navy')
         axes[1, 1].set_title('Ventas Totales por Categoría')
         axes[1, 1].set_xlabel('Categoría')
@@ -215,27 +563,72 @@ class AurelionMLSystem:
         axes[1, 1].tick_params(axis='x', rotation=45)
         
         # 6. Distribución de Ratings vs Ventas
-        product_sales = self.ml_data.groupby(['name', 'rating'])['total_amount'].sum().reset_index()
+        product_sales = self.product_sales()
         scatter = axes[1, 2].scatter(product_sales['rating'], product_sales['total_amount'], 
                                    alpha=0.6, s=60, color='purple')
         axes[1, 2].set_xlabel('Rating del Producto')
         axes[1, 2].set_ylabel('Ventas Totales ($)')
         axes[1, 2].set_title('Rating vs Ventas')
         axes[1, 2].grid(True, alpha=0.3)
+    
+    def create_visualizations(self, reg_results, class_results, dpi=300, fmt='png', interactive=True, max_points=5000):
+        """Crear visualizaciones de los resultados
+
+        Con interactive=True se usa pyplot y se muestra la ventana (plt.show).
+        Con interactive=False se renderiza con el backend Agg sin pyplot ni
+        ventana, apto para servidores sin pantalla e hilos en segundo plano.
+        fmt puede ser 'png', 'webp' o 'svg'; max_points limita los puntos de
+        los scatter de regresión. Devuelve la ruta del archivo guardado.
+        """
+        if fmt not in PLOT_FORMATS:
+            raise ValueError(f"Formato de gráfico no soportado: {fmt} (use {', '.join(PLOT_FORMATS)})")
+        from matplotlib import style
+        path = f'aurelion_ml_results.{fmt}'
+        
+        # Configurar estilo de gráficos
+        with style.context('seaborn-v0_8'):
+            if interactive:
+                import matplotlib.pyplot as plt
+                import seaborn as sns
+                sns.set_palette("husl")
+                fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+            else:
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                from matplotlib.figure import Figure
+                fig = Figure(figsize=(18, 12))
+                FigureCanvasAgg(fig)
+                axes = fig.subplots(2, 3)
+            
+            self._draw_results(fig, axes, reg_results, class_results, max_points)
+            fig.tight_layout()
+            fig.savefig(path, dpi=dpi, bbox_inches='tight', format=fmt)
         
-        plt.tight_layout()
-        plt.savefig('aurelion_ml_results.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        if interactive:
+            plt.show()
         
-        return fig
+        return path
+    
+    def create_visualizations_async(self, reg_results, class_results, dpi=300, fmt='png', max_points=5000):
+        """Renderizar las visualizaciones (Agg) en un hilo de fondo
+
+        Devuelve un Future (con la ruta del gráfico); el llamador puede seguir con el reporte y los
+        modelos y esperar el gráfico al final con future.result().
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aurelion-plots')
+        future = executor.submit(self.create_visualizations, reg_results, class_results,
+                                 dpi, fmt, False, max_points)
+        executor.shutdown(wait=False)
+        return future
     
     def generate_report(self, reg_results, class_results):
         """Generar reporte completo de resultados"""
+        aggregates = self.get_aggregates()
         report = {
             'timestamp': datetime.now().isoformat(),
             'dataset_info': {
                 'total_products': len(self.products_data),
-                'total_sales': len(self.sales_data),
+                'total_sales': aggregates['n_sales'],
                 'training_samples': len(self.X_train),
                 'test_samples': len(self.X_test)
             },
@@ -250,10 +643,10 @@ class AurelionMLSystem:
                 'confusion_matrix': class_results['confusion_matrix'].tolist()
             },
             'business_insights': {
-                'top_selling_category': self.ml_data.groupby('category')['total_amount'].sum().idxmax(),
-                'average_order_value': float(self.ml_data['total_amount'].mean()),
-                'total_revenue': float(self.ml_data['total_amount'].sum()),
-                'best_rated_products': self.products_data.nlargest(3, 'rating')[['name', 'rating']].to_dict('records')
+                'top_selling_category': self.category_sales().idxmax(),
+                'average_order_value': aggregates['total_revenue'] / aggregates['n_sales'],
+                'total_revenue': aggregates['total_revenue'],
+                'best_rated_products': self.best_rated_products()
             }
         }
         
@@ -263,8 +656,18 @@ class AurelionMLSystem:
         
         return report
     
-    def run_complete_analysis(self):
-        """Ejecutar análisis completo de ML"""
+    def save_model(self, path='aurelion_model.pkl'):
+        """Guardar scaler, modelos y codificadores (ver aurelion_scoring)"""
+        return save_model_artifact(self, path)
+    
+    def run_complete_analysis(self, plots=True, headless=False, plot_dpi=300, plot_format='png'):
+        """Ejecutar análisis completo de ML
+
+        Con plots=False (modo sin gráficos) no se generan visualizaciones ni
+        se importan matplotlib/seaborn: solo métricas, reporte y modelos.
+        Con headless=True el gráfico se renderiza con Agg en un hilo de fondo
+        (sin plt.show) mientras se escriben el reporte y los modelos.
+        """
         print("🚀 Iniciando análisis de Machine Learning para Tienda Aurelion")
         print("=" * 60)
         
@@ -292,27 +695,62 @@ class AurelionMLSystem:
         print(f"   ✓ Precisión: {class_results['accuracy']:.3f} ({class_results['accuracy']*100:.1f}%)")
         
         # 5. Crear visualizaciones
-        print("📈 Generando visualizaciones...")
-        self.create_visualizations(reg_results, class_results)
-        print("   ✓ Gráficos guardados como 'aurelion_ml_results.png'")
+        self.plot_path = None
+        plot_future = None
+        if not plots:
+            print("📈 Visualizaciones omitidas (--no-plots)")
+        elif headless:
+            print("📈 Generando visualizaciones en segundo plano...")
+            plot_future = self.create_visualizations_async(reg_results, class_results, plot_dpi, plot_format)
+        else:
+            print("📈 Generando visualizaciones...")
+            self.plot_path = self.create_visualizations(reg_results, class_results, plot_dpi, plot_format)
+            print(f"   ✓ Gráficos guardados como '{self.plot_path}'")
         
         # 6. Generar reporte
         print("📋 Generando reporte completo...")
         report = self.generate_report(reg_results, class_results)
         print("   ✓ Reporte guardado como 'aurelion_ml_report.json'")
         
+        # 7. Guardar modelos para scoring
+        print("💾 Guardando modelos entrenados...")
+        self.save_model()
+        print("   ✓ Modelos guardados como 'aurelion_model.pkl'")
+        
+        if plot_future is not None:
+            self.plot_path = plot_future.result()
+            print(f"   ✓ Gráficos guardados como '{self.plot_path}'")
+        
         print("\\n🎉 ¡Análisis completado exitosamente!")
         print("=" * 60)
         
         return reg_results, class_results, report
 
-def main():
+def parse_args(argv=None):
+    """Argumentos de línea de comandos"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Sistema de Machine Learning para Tienda Aurelion")
+    parser.add_argument('--no-plots', action='store_true',
+                        help="Modo sin gráficos: no genera visualizaciones ni importa matplotlib/seaborn")
+    parser.add_argument('--headless', action='store_true',
+                        help="Renderizar los gráficos con Agg en segundo plano, sin abrir ventanas")
+    parser.add_argument('--dpi', type=int, default=300, help="Resolución del gráfico de resultados")
+    parser.add_argument('--plot-format', default='png', choices=PLOT_FORMATS, help="Formato del gráfico de resultados")
+    parser.add_argument('--n-sales', type=int, default=1000, help="Cantidad de ventas sintéticas")
+    parser.add_argument('--seed', type=int, default=42, help="Semilla de generación")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Función principal"""
+    args = parse_args(argv)
+    
     # Crear instancia del sistema ML
-    ml_system = AurelionMLSystem()
+    ml_system = AurelionMLSystem(n_sales=args.n_sales, seed=args.seed)
     
     # Ejecutar análisis completo
-    reg_results, class_results, report = ml_system.run_complete_analysis()
+    reg_results, class_results, report = ml_system.run_complete_analysis(
+        plots=not args.no_plots, headless=args.headless, plot_dpi=args.dpi, plot_format=args.plot_format
+    )
     
     # Mostrar resumen de resultados
     print("\\n📊 RESUMEN DE RESULTADOS:")
@@ -336,5 +774,6 @@ if __name__ == "__main__":
     # Ejecutar análisis
     ml_system, reg_results, class_results, report = main()
     
-    print("\\n🔍 Para ver los gráficos, abra el archivo 'aurelion_ml_results.png'")
+    if ml_system.plot_path:
+        print(f"\\n🔍 Para ver los gráficos, abra el archivo '{ml_system.plot_path}'")
     print("📄 Para ver el reporte completo, abra el archivo 'aurelion_ml_report.json'")
\ No newline at end of file
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Motores de búsqueda de vecinos para el clasificador KNN de Tienda Aurelion
+
+Ofrece dos alternativas a KNeighborsClassifier con la misma interfaz
+(fit / kneighbors / predict):
+
+- BlockedKNNClassifier: KNN exacto con distancias calculadas por bloques
+  vectorizados, con memoria acotada por el tamaño de bloque.
+- IVFKNNClassifier: KNN aproximado con un índice IVF (listas invertidas
+  sobre centroides k-means), que solo compara cada consulta con los puntos
+  de las n_probe listas más cercanas.
+
+benchmark_neighbors compara los motores contra el KNN exacto (recall y
+consultas por segundo).
+"""
+
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+NEIGHBOR_BACKENDS = ('sklearn', 'exact', 'ivf')
+
+
+def squared_distances(Q, X, X_norms=None):
+    """Distancias euclídeas al cuadrado entre las filas de Q y las de X"""
+    if X_norms is None:
+        X_norms = np.einsum('ij,ij->i', X, X)
+    # ||q||² - 2 q·x + ||x||², operando en el lugar para no crear temporales
+    d = Q @ X.T
+    d *= -2
+    d += np.einsum('ij,ij->i', Q, Q)[:, None]
+    d += X_norms[None, :]
+    return np.maximum(d, 0, out=d)
+
+
+def merge_topk(best_d, best_i, d, ids, k):
+    """Combinar los k mejores actuales con un bloque de candidatos
+
+    d tiene una columna por candidato e ids el índice de entrenamiento de cada
+    columna. El bloque se reduce primero a sus k mejores por fila, de modo que
+    la combinación final solo opera sobre 2k columnas.
+    """
+    if d.shape[1] > k:
+        part = np.argpartition(d, k - 1, axis=1)[:, :k]
+        d, cand_i = np.take_along_axis(d, part, 1), ids[part]
+    else:
+        cand_i = np.broadcast_to(ids, d.shape)
+    all_d = np.hstack([best_d, d])
+    all_i = np.hstack([best_i, cand_i])
+    k = min(k, all_d.shape[1])
+    part = np.argpartition(all_d, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(all_d, part, 1), np.take_along_axis(all_i, part, 1)
+
+
+class _NeighborsClassifier(ABC):
+    """Base común: votación por mayoría sobre los k vecinos
+
+    Cada motor implementa kneighbors (y, si necesita un índice,
+    _build_index, que se llama al final de fit).
+    """
+
+    def __init__(self, n_neighbors=5):
+        self.n_neighbors = n_neighbors
+
+    def fit(self, X, y):
+        self._fit_X = np.ascontiguousarray(X, dtype=np.float64)
+        self.classes_, self._y = np.unique(np.asarray(y), return_inverse=True)
+        self._fit_norms = np.einsum('ij,ij->i', self._fit_X, self._fit_X)
+        self._build_index()
+        return self
+
+    def _build_index(self):
+        pass
+
+    @abstractmethod
+    def kneighbors(self, X, n_neighbors=None):
+        """(distancias, índices) de los k vecinos de cada fila de X, de menor a mayor distancia"""
+
+    def predict(self, X):
+        _, idx = self.kneighbors(X)
+        votes = np.zeros((len(idx), len(self.classes_)), dtype=np.int64)
+        rows = np.repeat(np.arange(len(idx)), idx.shape[1])
+        valid = idx.ravel() >= 0
+        np.add.at(votes, (rows[valid], self._y[idx.ravel()[valid]]), 1)
+        # argmax elige la clase menor en caso de empate, igual que scikit-learn
+        return self.classes_[votes.argmax(axis=1)]
+
+    @staticmethod
+    def _sorted(best_d, best_i):
+        order = np.argsort(best_d, axis=1, kind='stable')
+        return np.sqrt(np.take_along_axis(best_d, order, 1)), np.take_along_axis(best_i, order, 1)
+
+
+class BlockedKNNClassifier(_NeighborsClassifier):
+    """KNN exacto con distancias por bloques de consultas y de entrenamiento"""
+
+    def __init__(self, n_neighbors=5, query_block=1024, train_block=8192):
+        super().__init__(n_neighbors)
+        self.query_block = query_block
+        self.train_block = train_block
+
+    def kneighbors(self, X, n_neighbors=None):
+        k = n_neighbors or self.n_neighbors
+        Q = np.ascontiguousarray(X, dtype=np.float64)
+        n_train = len(self._fit_X)
+        dist = np.empty((len(Q), min(k, n_train)))
+        ind = np.empty((len(Q), min(k, n_train)), dtype=np.int64)
+        for qs in range(0, len(Q), self.query_block):
+            q = Q[qs:qs + self.query_block]
+            best_d = np.empty((len(q), 0))
+            best_i = np.empty((len(q), 0), dtype=np.int64)
+            for ts in range(0, n_train, self.train_block):
+                te = min(ts + self.train_block, n_train)
+                d = squared_distances(q, self._fit_X[ts:te], self._fit_norms[ts:te])
+                best_d, best_i = merge_topk(best_d, best_i, d, np.arange(ts, te), k)
+            dist[qs:qs + len(q)], ind[qs:qs + len(q)] = self._sorted(best_d, best_i)
+        return dist, ind
+
+
+class IVFKNNClassifier(_NeighborsClassifier):
+    """KNN aproximado con índice IVF construido con NumPy
+
+    n_lists centroides se entrenan con k-means (Lloyd) sobre una muestra; cada
+    punto de entrenamiento se asigna a su centroide más cercano. En la
+    consulta solo se revisan las n_probe listas más cercanas.
+    """
+
+    def __init__(self, n_neighbors=5, n_lists=None, n_probe=4, n_iter=10, sample_size=100_000, seed=42):
+        super().__init__(n_neighbors)
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.sample_size = sample_size
+        self.seed = seed
+
+    def _build_index(self):
+        rng = np.random.default_rng(self.seed)
+        n = len(self._fit_X)
+        n_lists = self.n_lists or max(1, int(np.sqrt(n)))
+        sample = self._fit_X[rng.choice(n, min(n, self.sample_size), replace=False)]
+        centroids = sample[rng.choice(len(sample), min(n_lists, len(sample)), replace=False)]
+        for _ in range(self.n_iter):
+            labels = nearest_centroids(sample, centroids, 1)[:, 0]
+            counts = np.bincount(labels, minlength=len(centroids))
+            sums = np.column_stack([np.bincount(labels, weights=sample[:, j], minlength=len(centroids))
+                                    for j in range(sample.shape[1])])
+            # Los centroides vacíos se mantienen donde estaban
+            nonempty = counts > 0
+            centroids[nonempty] = sums[nonempty] / counts[nonempty, None]
+        self.centroids_ = centroids
+
+        # Listas invertidas: puntos ordenados por lista y offsets de cada lista
+        labels = nearest_centroids(self._fit_X, centroids, 1)[:, 0]
+        self._order = np.argsort(labels, kind='stable')
+        self._offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=len(centroids)))])
+
+    def kneighbors(self, X, n_neighbors=None):
+        k = n_neighbors or self.n_neighbors
+        Q = np.ascontiguousarray(X, dtype=np.float64)
+        probes = nearest_centroids(Q, self.centroids_, min(self.n_probe, len(self.centroids_)))
+        best_d = np.full((len(Q), k), np.inf)
+        best_i = np.full((len(Q), k), -1, dtype=np.int64)
+        # Agrupar las consultas por lista sondeada
+        flat = probes.ravel()
+        by_list = np.argsort(flat, kind='stable')
+        query_of = by_list // probes.shape[1]
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(flat, minlength=len(self.centroids_)))])
+        # Recorrer las listas: cada una se compara con las consultas que la sondean
+        for lst in np.flatnonzero(np.diff(bounds)):
+            queries = query_of[bounds[lst]:bounds[lst + 1]]
+            members = self._order[self._offsets[lst]:self._offsets[lst + 1]]
+            if len(members) == 0:
+                continue
+            d = squared_distances(Q[queries], self._fit_X[members], self._fit_norms[members])
+            best_d[queries], best_i[queries] = merge_topk(best_d[queries], best_i[queries], d, members, k)
+        return self._sorted(best_d, best_i)
+
+
+def nearest_centroids(X, centroids, n_probe, block=65536):
+    """Índices de los n_probe centroides más cercanos a cada fila de X"""
+    out = np.empty((len(X), n_probe), dtype=np.int64)
+    c_norms = np.einsum('ij,ij->i', centroids, centroids)
+    for s in range(0, len(X), block):
+        d = squared_distances(X[s:s + block], centroids, c_norms)
+        if n_probe == 1:
+            out[s:s + block, 0] = d.argmin(axis=1)
+            continue
+        part = np.argpartition(d, n_probe - 1, axis=1)[:, :n_probe] if n_probe < d.shape[1] else np.argsort(d, axis=1)
+        order = np.argsort(np.take_along_axis(d, part, 1), axis=1)
+        out[s:s + block] = np.take_along_axis(part, order, 1)
+    return out
+
+
+def make_neighbors_classifier(backend='sklearn', n_neighbors=5, **kwargs):
+    """Crear el clasificador KNN para el motor de búsqueda indicado"""
+    if backend == 'sklearn':
+        from sklearn.neighbors import KNeighborsClassifier
+        return KNeighborsClassifier(n_neighbors=n_neighbors, **kwargs)
+    if backend == 'exact':
+        return BlockedKNNClassifier(n_neighbors=n_neighbors, **kwargs)
+    if backend == 'ivf':
+        return IVFKNNClassifier(n_neighbors=n_neighbors, **kwargs)
+    raise ValueError(f"Motor de vecinos no soportado: {backend} (use {', '.join(NEIGHBOR_BACKENDS)})")
+
+
+def benchmark_neighbors(X_train, y_train, X_test, y_test=None, n_neighbors=5, backends=NEIGHBOR_BACKENDS, **ivf_kwargs):
+    """Comparar motores de vecinos: recall@k contra KNN exacto y consultas/segundo"""
+    reference = BlockedKNNClassifier(n_neighbors).fit(X_train, y_train)
+    exact_dist, _ = reference.kneighbors(X_test)
+    # Con empates varios vecinos son igualmente válidos: cuenta como acierto
+    # todo vecino devuelto a distancia <= a la k-ésima distancia exacta
+    kth = exact_dist[:, -1:] * (1 + 1e-9) + 1e-12
+
+    results = {}
+    for backend in backends:
+        model = make_neighbors_classifier(backend, n_neighbors, **(ivf_kwargs if backend == 'ivf' else {}))
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dist, _ = model.kneighbors(X_test, n_neighbors)
+        query_time = time.perf_counter() - start
+
+        results[backend] = {
+            'build_seconds': build_time,
+            'queries_per_second': len(X_test) / query_time if query_time > 0 else float('inf'),
+            'recall_at_k': float(np.mean(dist <= kth)),
+        }
+        if y_test is not None:
+            results[backend]['accuracy'] = float(np.mean(model.predict(X_test) == np.asarray(y_test)))
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    from aurelion_ml_system import AurelionMLSystem
+
+    parser = argparse.ArgumentParser(description="Benchmark de motores de vecinos para el KNN de Aurelion")
+    parser.add_argument('--n-sales', type=int, default=100_000)
+    parser.add_argument('--n-probe', type=int, default=4)
+    parser.add_argument('--max-queries', type=int, default=2000,
+                        help="Consultas de prueba a usar (el KNN exacto de referencia es costoso)")
+    args = parser.parse_args()
+
+    ml_system = AurelionMLSystem(n_sales=args.n_sales)
+    X, y_reg, y_class = ml_system.prepare_ml_data()
+    ml_system.split_data(X, y_reg, y_class)
+
+    X_test = ml_system.X_test_scaled[:args.max_queries]
+    y_test = ml_system.y_test_class.to_numpy()[:args.max_queries]
+
+    print(f"🔎 Benchmark KNN: {len(ml_system.X_train)} entrenamiento, {len(X_test)} consultas")
+    for backend, metrics in benchmark_neighbors(ml_system.X_train_scaled, ml_system.y_train_class.to_numpy(),
+                                                X_test, y_test, n_probe=args.n_probe).items():
+        print(f"   • {backend:8s} recall@k: {metrics['recall_at_k']:.3f}  "
+              f"consultas/s: {metrics['queries_per_second']:,.0f}  "
+              f"precisión: {metrics['accuracy']:.3f}  construcción: {metrics['build_seconds']:.2f}s")
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Persistencia y scoring de baja latencia para los modelos de Tienda Aurelion
+
+save_model_artifact guarda en un único archivo versionado el StandardScaler,
+la LinearRegression, el clasificador KNN y los codificadores de features
+(tabla de productos y órdenes de las categorías). AurelionScorer carga ese
+artefacto una sola vez y responde predicciones individuales o por lotes.
+
+Este módulo solo depende de NumPy (y de scikit-learn al deserializar los
+modelos): no importa aurelion_ml_system, matplotlib ni seaborn, para que el
+arranque de un proceso de scoring sea rápido.
+"""
+
+import json
+import pickle
+import sys
+from datetime import datetime
+
+import numpy as np
+
+MODEL_FORMAT_VERSION = 1
+DEFAULT_MODEL_PATH = 'aurelion_model.pkl'
+
+
+def save_model_artifact(ml_system, path=DEFAULT_MODEL_PATH):
+    """Guardar los modelos entrenados y sus codificadores en un artefacto versionado"""
+    import sklearn
+    from aurelion_ml_system import FEATURES, SEASONS, DAYS_OF_WEEK, CATEGORIES
+
+    artifact = {
+        'format_version': MODEL_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(),
+        'sklearn_version': sklearn.__version__,
+        'features': list(FEATURES),
+        'encoders': {
+            'season': list(SEASONS),
+            'day_of_week': list(DAYS_OF_WEEK),
+            'category': list(CATEGORIES),
+        },
+        'product_lookup': ml_system.product_lookup,
+        'scaler': ml_system.scaler,
+        'regression_model': ml_system.regression_model,
+        'classification_model': ml_system.classification_model,
+    }
+    with open(path, 'wb') as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+class AurelionScorer:
+    """Scoring de ventas a partir de un artefacto de modelos ya entrenados"""
+
+    def __init__(self, artifact):
+        if artifact.get('format_version') != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Versión de artefacto no soportada: {artifact.get('format_version')} "
+                             f"(se esperaba {MODEL_FORMAT_VERSION})")
+        self.artifact = artifact
+        self.features = artifact['features']
+        self.lookup = artifact['product_lookup']
+        self.codes = {name: {value: code for code, value in enumerate(values)}
+                      for name, values in artifact['encoders'].items()}
+        self.classification_model = artifact['classification_model']
+
+        # Escalado y regresión plegados en un solo producto punto:
+        # y = ((x - media) / escala) @ coef + b = x @ w + b0
+        scaler, regression = artifact['scaler'], artifact['regression_model']
+        self._mean = np.asarray(scaler.mean_, dtype=np.float64)
+        self._scale = np.asarray(scaler.scale_, dtype=np.float64)
+        self._weights = regression.coef_ / self._scale
+        self._bias = float(regression.intercept_ - self._weights @ self._mean)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        """Cargar el artefacto desde disco (una vez por proceso)"""
+        with open(path, 'rb') as f:
+            return cls(pickle.load(f))
+
+    def _encode(self, name, values):
+        """Códigos de season/day_of_week a partir de etiquetas o de códigos enteros"""
+        values = np.atleast_1d(values)
+        codes = self.codes[name]
+        if values.dtype.kind in 'iu':
+            valid = (values >= 0) & (values < len(codes))
+        else:
+            valid = np.array([v in codes for v in values], dtype=bool)
+        if not valid.all():
+            raise ValueError(f"Valor de {name} desconocido: {values[~valid].tolist()} "
+                             f"(use {', '.join(map(str, codes))})")
+        if values.dtype.kind in 'iu':
+            return values
+        return np.array([codes[v] for v in values])
+
+    def build_features(self, product_id, customer_age, discount, season, day_of_week):
+        """Matriz de features (n, 9) en el mismo orden que en el entrenamiento"""
+        product_id = np.atleast_1d(product_id)
+        # Validar el rango antes de indexar: un id negativo no debe tomar el último producto
+        known = (product_id >= 0) & (product_id < len(self.lookup['row']))
+        known[known] = self.lookup['row'][product_id[known]] >= 0
+        if not known.all():
+            raise ValueError(f"Producto desconocido: {product_id[~known].tolist()}")
+        return np.column_stack([
+            self.lookup['price'][product_id],
+            self.lookup['stock'][product_id],
+            self.lookup['rating'][product_id],
+            self.lookup['reviews'][product_id],
+            np.atleast_1d(customer_age),
+            np.atleast_1d(discount),
+            self._encode('season', season),
+            self._encode('day_of_week', day_of_week),
+            self.lookup['category_code'][product_id],
+        ]).astype(np.float64)
+
+    def predict_total_amount(self, X):
+        """Monto total predicho para una matriz de features sin escalar"""
+        return X @ self._weights + self._bias
+
+    def predict_category(self, X):
+        """Categoría predicha (KNN) para una matriz de features sin escalar"""
+        return self.classification_model.predict((X - self._mean) / self._scale)
+
+    def predict_batch(self, product_id, customer_age, discount, season, day_of_week):
+        """Predicciones por lotes: arreglos de total_amount y de categoría"""
+        X = self.build_features(product_id, customer_age, discount, season, day_of_week)
+        return self.predict_total_amount(X), self.predict_category(X)
+
+    def predict_one(self, product_id, customer_age, discount=0.0, season='Primavera', day_of_week='Lunes'):
+        """Predicción para una única venta"""
+        total, category = self.predict_batch(product_id, customer_age, discount, season, day_of_week)
+        return {'total_amount': float(total[0]), 'category': str(category[0])}
+
+
+def main():
+    """Scoring por línea de comandos: una venta JSON por línea en stdin"""
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MODEL_PATH
+    scorer = AurelionScorer.load(path)
+    for line in sys.stdin:
+        if line.strip():
+            print(json.dumps(scorer.predict_one(**json.loads(line)), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
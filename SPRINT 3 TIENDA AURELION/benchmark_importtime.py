@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark de tiempo de arranque de los módulos de ML de Tienda Aurelion
+
+Ejecuta ``python -X importtime -c "import <módulo>"`` en un proceso nuevo,
+resume el tiempo acumulado por paquete de primer nivel y falla (código de
+salida 1) si el import carga librerías prohibidas (matplotlib, seaborn,
+scikit-learn) o supera el presupuesto de tiempo. Pensado para ejecutarse en
+CI y detectar regresiones de arranque.
+
+Uso:
+    python benchmark_importtime.py
+    python benchmark_importtime.py --module aurelion_scoring --budget-ms 800
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Módulos que no deben cargarse al importar cada punto de entrada
+FORBIDDEN_IMPORTS = {
+    'aurelion_ml_system': ('matplotlib', 'seaborn', 'sklearn'),
+    'aurelion_scoring': ('matplotlib', 'seaborn', 'sklearn', 'pandas'),
+}
+
+
+def measure_importtime(module, runs=3):
+    """Importar el módulo en procesos nuevos y devolver la mejor medición
+
+    Devuelve (total_us, por_paquete) donde por_paquete suma el tiempo propio
+    (self) de cada paquete de primer nivel importado.
+    """
+    best = None
+    here = os.path.dirname(os.path.abspath(__file__))
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=here, capture_output=True, text=True, check=True,
+        )
+        per_package = {}
+        total = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = [part.strip() for part in line[len('import time:'):].split('|')]
+            package = name.strip().split('.')[0]
+            per_package[package] = per_package.get(package, 0) + int(self_us)
+            if name.strip() == module:
+                total = int(cumulative_us)
+        if best is None or total < best[0]:
+            best = (total, per_package)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tiempo de importación")
+    parser.add_argument('--module', default='aurelion_ml_system')
+    parser.add_argument('--budget-ms', type=float, default=1500.0,
+                        help="Tiempo máximo de importación aceptado (ms)")
+    parser.add_argument('--top', type=int, default=10, help="Paquetes más costosos a mostrar")
+    args = parser.parse_args()
+
+    total_us, per_package = measure_importtime(args.module)
+    print(f"⏱️  import {args.module}: {total_us / 1000:.1f} ms (presupuesto {args.budget_ms:.0f} ms)")
+    for package, self_us in sorted(per_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"   • {package:20s} {self_us / 1000:8.1f} ms")
+
+    errors = []
+    forbidden = [name for name in FORBIDDEN_IMPORTS.get(args.module, ()) if name in per_package]
+    if forbidden:
+        errors.append(f"se importaron librerías prohibidas: {', '.join(forbidden)}")
+    if total_us / 1000 > args.budget_ms:
+        errors.append(f"el import supera el presupuesto de {args.budget_ms:.0f} ms")
+
+    for error in errors:
+        print(f"❌ {error}")
+    if not errors:
+        print("✅ Arranque dentro del presupuesto")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
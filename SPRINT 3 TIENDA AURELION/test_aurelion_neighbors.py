@@ -0,0 +1,68 @@
+# test_aurelion_neighbors.py: Tests de los motores de vecinos contra KNeighborsClassifier.
+
+import unittest
+
+import numpy as np
+from sklearn.neighbors import KNeighborsClassifier
+
+from aurelion_neighbors import (BlockedKNNClassifier, IVFKNNClassifier, _NeighborsClassifier,
+                                benchmark_neighbors)
+
+
+def clustered_data(n_train=3000, n_test=300, n_features=9, n_clusters=5, seed=0):
+    """Datos continuos (sin empates de distancia) agrupados en clusters etiquetados"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=4, size=(n_clusters, n_features))
+    labels = rng.integers(n_clusters, size=n_train + n_test)
+    X = centers[labels] + rng.normal(size=(n_train + n_test, n_features))
+    return X[:n_train], labels[:n_train], X[n_train:], labels[n_train:]
+
+
+class TestBlockedKNN(unittest.TestCase):
+    def setUp(self):
+        self.X_train, self.y_train, self.X_test, self.y_test = clustered_data()
+        self.reference = KNeighborsClassifier(n_neighbors=5).fit(self.X_train, self.y_train)
+
+    def test_misma_respuesta_que_sklearn(self):
+        # Bloques chicos para combinar muchos bloques de consultas y de entrenamiento
+        model = BlockedKNNClassifier(5, query_block=64, train_block=500).fit(self.X_train, self.y_train)
+        dist, ind = model.kneighbors(self.X_test)
+        ref_dist, ref_ind = self.reference.kneighbors(self.X_test)
+        np.testing.assert_allclose(dist, ref_dist, rtol=1e-9, atol=1e-9)
+        np.testing.assert_array_equal(ind, ref_ind)
+        np.testing.assert_array_equal(model.predict(self.X_test), self.reference.predict(self.X_test))
+
+    def test_menos_puntos_que_k(self):
+        model = BlockedKNNClassifier(5).fit(self.X_train[:3], self.y_train[:3])
+        dist, ind = model.kneighbors(self.X_test[:4])
+        self.assertEqual(ind.shape, (4, 3))
+        self.assertTrue((np.diff(dist, axis=1) >= 0).all())
+
+
+class TestIVFKNN(unittest.TestCase):
+    def setUp(self):
+        self.X_train, self.y_train, self.X_test, self.y_test = clustered_data()
+
+    def test_sondear_todas_las_listas_es_exacto(self):
+        model = IVFKNNClassifier(5, n_lists=16, n_probe=16).fit(self.X_train, self.y_train)
+        ref_dist, _ = BlockedKNNClassifier(5).fit(self.X_train, self.y_train).kneighbors(self.X_test)
+        dist, _ = model.kneighbors(self.X_test)
+        np.testing.assert_allclose(dist, ref_dist, rtol=1e-9, atol=1e-9)
+
+    def test_recall_y_precision(self):
+        results = benchmark_neighbors(self.X_train, self.y_train, self.X_test, self.y_test,
+                                      backends=('sklearn', 'exact', 'ivf'), n_lists=32, n_probe=4)
+        self.assertEqual(results['exact']['recall_at_k'], 1.0)
+        self.assertEqual(results['sklearn']['recall_at_k'], 1.0)
+        self.assertGreaterEqual(results['ivf']['recall_at_k'], 0.9)
+        self.assertGreaterEqual(results['ivf']['accuracy'], results['exact']['accuracy'] - 0.02)
+
+
+class TestBase(unittest.TestCase):
+    def test_base_abstracta(self):
+        with self.assertRaises(TypeError):
+            _NeighborsClassifier()
+
+
+if __name__ == "__main__":
+    unittest.main()
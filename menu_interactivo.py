@@ -4,7 +4,15 @@
 # main.py: Visor interactivo asincrónico de la documentación.
 
 import asyncio
-from textos import textos_documentacion, obtener_contenido_completo
+from textos import textos_documentacion
+from busqueda_documentacion import IndiceDocumentacion, imprimir_resultados
+
+# Índice de búsqueda (se arma una sola vez al iniciar)
+indice_documentacion = IndiceDocumentacion(textos_documentacion)
+
+async def leer_entrada(mensaje=""):
+    """input() en un hilo aparte: el bucle de eventos no se bloquea esperando al usuario"""
+    return await asyncio.to_thread(input, mensaje)
 
 async def mostrar_menu():
     print("\n=== Menú de Documentación del Proyecto Tienda ===")
@@ -42,15 +50,9 @@ async def procesar_opcion(opcion, seccion_actual=None):
         print("Saliendo del programa...")
         return None
     elif opcion == 7:  # Búsqueda
-        palabra = input("Ingrese palabra clave para buscar: ").lower()
-        contenido_completo = obtener_contenido_completo().lower()
-        if palabra in contenido_completo:
-            print(f"Palabra '{palabra}' encontrada. Resultados:\n")
-            for num, seccion in textos_documentacion.items():
-                if palabra in seccion["contenido"].lower():
-                    print(f"Sección {num}: {seccion['titulo']}")
-        else:
-            print(f"Palabra '{palabra}' no encontrada.")
+        consulta = (await leer_entrada("Ingrese palabras clave (varias = todas; use OR para alternativas): ")).strip()
+        indice_documentacion.sincronizar(textos_documentacion)  # Reindexa solo secciones nuevas o modificadas
+        imprimir_resultados(consulta, indice_documentacion.buscar(consulta))
         return seccion_actual  # Mantener sección actual
     elif opcion == 8:  # Exportar
         if seccion_actual and seccion_actual in textos_documentacion:
@@ -70,7 +72,7 @@ async def main():
     while True:
         await mostrar_menu()
         try:
-            opcion = int(input("Seleccione una opción: "))
+            opcion = int(await leer_entrada("Seleccione una opción: "))
             seccion_actual = await procesar_opcion(opcion, seccion_actual)
             if seccion_actual is None:
                 break